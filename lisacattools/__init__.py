@@ -3,9 +3,9 @@
 # Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
 # This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
 # SPDX-License-Identifier: Apache-2.0
+import sys
 
 from loguru import logger
-import sys
 
 from ._version import __author__  # noqa: F401
 from ._version import __author_email__  # noqa: F401
@@ -16,22 +16,35 @@ from ._version import __name__  # noqa: F401
 from ._version import __title__  # noqa: F401
 from ._version import __url__  # noqa: F401
 from ._version import __version__  # noqa: F401
+from .aio import AsyncGWCatalog
+from .aio import AsyncGWCatalogs
 from .analyze import CatalogAnalysis
 from .analyze import HistoryAnalysis
 from .analyze import LisaAnalyse
+from .association import associate
 from .catalog import GWCatalog
 from .catalog import GWCatalogs
 from .catalog import GWCatalogType
+from .manifest import MetadataManifest
+from .monitoring import LogLevel
+from .storage import HDFStorePool
+from .storage import STORE_POOL
 from .utils import confidence_ellipse
 from .utils import convert_ecliptic_to_galactic
 from .utils import convert_galactic_to_cartesian
+from .utils import DtypePolicy
 from .utils import ellipse_area
 from .utils import FrameEnum
 from .utils import get_DL
 from .utils import get_Mchirp
 from .utils import getSciRD
 from .utils import HPhist
-from .monitoring import LogLevel
+from .utils import LRUCache
+
+GWCatalogs.register("ARROW", "lisacattools.plugins.arrow", "ArrowCatalogs")
+GWCatalogs.register(
+    "UCB_BUNDLE", "lisacattools.plugins.bundle", "UcbBundleCatalogs"
+)
 
 logger.remove()
 logger.add(sys.stdout, level=LogLevel.INFO)
@@ -51,5 +64,13 @@ __all__ = [
     "convert_ecliptic_to_galactic",
     "convert_galactic_to_cartesian",
     "ellipse_area",
-    "HPhist"
+    "HPhist",
+    "LRUCache",
+    "DtypePolicy",
+    "HDFStorePool",
+    "STORE_POOL",
+    "MetadataManifest",
+    "AsyncGWCatalog",
+    "AsyncGWCatalogs",
+    "associate",
 ]
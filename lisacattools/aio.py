@@ -0,0 +1,588 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""This module exposes the catalogs to asyncio. It is responsible for :
+- running the blocking calls of the plugins in a bounded thread pool, so
+  that the event loop is never blocked by the HDF5 reads
+- collapsing the concurrent requests of the same data into one read
+- limiting the number of reads admitted at the same time (backpressure)
+
+The async catalogs wrap the catalogs of any plugin::
+
+    async with await AsyncGWCatalogs.create(
+        GWCatalogType.MBH, "tutorial/data/mbh", max_workers=4
+    ) as catalogs:
+        catalog = catalogs.get_last_catalog()
+        detections = await catalog.get_detections(["SNR"])
+        async for source, samples in catalog.iter_source_samples():
+            ...
+
+The executor of a set of async catalogs must be used from one event loop.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import pandas as pd
+
+from .catalog import GWCatalog
+from .catalog import GWCatalogs
+from .catalog import GWCatalogType
+
+
+class AsyncExecutor:
+    """Bounded executor of the blocking calls of the catalogs.
+
+    The calls run in a pool of `max_workers` threads. At most `max_pending`
+    distinct calls are admitted (queued or running) at the same time, the
+    next ones wait for a slot, at most `timeout` seconds. The concurrent
+    calls with the same key are collapsed: only the first one runs and the
+    others await its result.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        timeout: Optional[float] = None,
+    ):
+        """Init the executor.
+
+        Args:
+            max_workers (int, optional): number of threads. Defaults to 4.
+            max_pending (int, optional): maximum number of calls queued or
+            running. Defaults to 64.
+            timeout (float, optional): maximum time in seconds waiting for
+            a slot, no limit when None. Defaults to None.
+
+        Raises:
+            ValueError: max_workers or max_pending is lower than 1
+        """
+        if max_workers < 1 or max_pending < 1:
+            raise ValueError(
+                f"max_workers and max_pending must be >= 1, got "
+                f"{max_workers} and {max_pending}"
+            )
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.__executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="lisacattools"
+        )
+        self.__slots = asyncio.Semaphore(max_pending)
+        # future of each running call and whether a request was collapsed
+        # into it
+        self.__inflight: Dict[Hashable, list] = dict()
+        self.__stats = {"calls": 0, "collapsed": 0}
+
+    @property
+    def stats(self) -> dict:
+        """Statistics of the executor.
+
+        :getter: Returns the number of calls run (calls), the number of
+            requests collapsed into a running call (collapsed) and the
+            number of calls queued or running (pending)
+        :type: dict
+        """
+        return dict(self.__stats, pending=len(self.__inflight))
+
+    async def _call(self, func: Callable, *args, **kwargs) -> object:
+        """Runs a blocking call in the pool once a slot is free.
+
+        Args:
+            func (Callable): blocking function
+
+        Raises:
+            asyncio.TimeoutError: no slot was freed within the timeout
+
+        Returns:
+            object: the result of the function
+        """
+        await asyncio.wait_for(self.__slots.acquire(), self.timeout)
+        try:
+            self.__stats["calls"] += 1
+            return await asyncio.get_running_loop().run_in_executor(
+                self.__executor, partial(func, *args, **kwargs)
+            )
+        finally:
+            self.__slots.release()
+
+    async def run(
+        self, key: Optional[Hashable], func: Callable, *args, **kwargs
+    ) -> object:
+        """Runs a blocking call, collapsed with the running call of the
+        same key.
+
+        The requests collapsed into a running call get the same result
+        object, see run_shared.
+
+        Args:
+            key (Hashable, optional): key of the call, the call is never
+            collapsed when None
+            func (Callable): blocking function
+
+        Returns:
+            object: the result of the function
+        """
+        return (await self.run_shared(key, func, *args, **kwargs))[0]
+
+    async def run_shared(
+        self, key: Optional[Hashable], func: Callable, *args, **kwargs
+    ) -> Tuple[object, bool]:
+        """Runs a blocking call as run, and tells if the result object is
+        shared by several requests, so that each of them copies it.
+
+        Args:
+            key (Hashable, optional): key of the call, the call is never
+            collapsed when None
+            func (Callable): blocking function
+
+        Returns:
+            Tuple[object, bool]: the result of the function, and True when
+            requests were collapsed into the call
+        """
+        if key is None:
+            return await self._call(func, *args, **kwargs), False
+        inflight = self.__inflight.get(key)
+        if inflight is not None:
+            self.__stats["collapsed"] += 1
+            inflight[1] = True
+            return await asyncio.shield(inflight[0]), True
+
+        async def call() -> object:
+            try:
+                return await self._call(func, *args, **kwargs)
+            finally:
+                # no request is collapsed into the call once it is done
+                self.__inflight.pop(key, None)
+
+        inflight = [asyncio.ensure_future(call()), False]
+        self.__inflight[key] = inflight
+        result = await asyncio.shield(inflight[0])
+        return result, inflight[1]
+
+    def shutdown(self, wait: bool = True):
+        """Shuts the thread pool down.
+
+        Args:
+            wait (bool, optional): waits for the running calls. Defaults to
+            True.
+        """
+        self.__executor.shutdown(wait=wait)
+
+
+class AsyncGWCatalog:
+    """Async view of a catalog.
+
+    Each method runs the method of the same name of the catalog in the
+    executor. The results are copies (or read-only views, see the
+    `read_only` parameter of the plugins) as with the catalog. A result
+    shared by collapsed requests is copied again for each of them.
+    """
+
+    def __init__(self, catalog: GWCatalog, executor: AsyncExecutor):
+        """Init the async view of a catalog.
+
+        Args:
+            catalog (GWCatalog): the catalog
+            executor (AsyncExecutor): executor of the blocking calls
+        """
+        self.__catalog = catalog
+        self.__executor = executor
+
+    @property
+    def catalog(self) -> GWCatalog:
+        """Wrapped catalog.
+
+        :getter: Returns the wrapped catalog
+        :type: GWCatalog
+        """
+        return self.__catalog
+
+    @property
+    def name(self) -> str:
+        """Name of the catalog.
+
+        :getter: Returns the name of the catalog
+        :type: str
+        """
+        return self.__catalog.name
+
+    @property
+    def location(self) -> str:
+        """Location of the catalog.
+
+        :getter: Returns the location of the catalog
+        :type: str
+        """
+        return self.__catalog.location
+
+    def _share(self, data: object) -> object:
+        """Returns a copy of a data frame shared by collapsed requests,
+        unless the catalog returns read-only views.
+
+        Args:
+            data (object): result of a call
+
+        Returns:
+            object: the result given to one request
+        """
+        if isinstance(data, (pd.DataFrame, pd.Series)) and not getattr(
+            self.__catalog, "read_only", False
+        ):
+            return data.copy()
+        if isinstance(data, list):
+            return list(data)
+        if isinstance(data, dict):
+            return {key: self._share(value) for key, value in data.items()}
+        return data
+
+    async def _run(self, method: str, *args, **kwargs) -> object:
+        """Runs a method of the catalog in the executor.
+
+        Args:
+            method (str): name of the method
+
+        Returns:
+            object: the result of the method
+        """
+        key = (
+            self.location,
+            self.name,
+            method,
+            repr(args),
+            repr(sorted(kwargs.items())),
+        )
+        func = getattr(self.__catalog, method)
+        result, shared = await self.__executor.run_shared(
+            key, func, *args, **kwargs
+        )
+        return self._share(result) if shared else result
+
+    async def get_detections(
+        self, attr: Union[List[str], str] = None
+    ) -> Union[List[str], pd.DataFrame, pd.Series]:
+        """See GWCatalog.get_detections."""
+        return await self._run("get_detections", attr)
+
+    async def get_attr_detections(self) -> List[str]:
+        """See GWCatalog.get_attr_detections."""
+        return await self._run("get_attr_detections")
+
+    async def get_median_source(self, attr: str) -> pd.DataFrame:
+        """See GWCatalog.get_median_source."""
+        return await self._run("get_median_source", attr)
+
+    async def get_quantile_source(self, attr: str, q: float) -> pd.DataFrame:
+        """See GWCatalog.get_quantile_source."""
+        return await self._run("get_quantile_source", attr, q)
+
+    async def get_top_k(
+        self, attr: str, k: int, largest: bool = True
+    ) -> pd.DataFrame:
+        """See GWCatalog.get_top_k."""
+        return await self._run("get_top_k", attr, k, largest)
+
+    async def get_range_sources(
+        self,
+        attr: str,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """See GWCatalog.get_range_sources."""
+        return await self._run("get_range_sources", attr, low, high)
+
+    async def get_source_samples(
+        self, source_name: str, attr: List[str] = None, **kwargs
+    ) -> pd.DataFrame:
+        """See GWCatalog.get_source_samples, with the same keyword
+        arguments selecting the samples."""
+        return await self._run(
+            "get_source_samples", source_name, attr, **kwargs
+        )
+
+    async def get_source_samples_many(
+        self,
+        source_names: List[str],
+        attr: Union[List[str], str] = None,
+        as_frame: bool = False,
+    ) -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+        """See GWCatalog.get_source_samples_many."""
+        return await self._run(
+            "get_source_samples_many", list(source_names), attr, as_frame
+        )
+
+    async def get_attr_source_samples(self, source_name: str) -> List[str]:
+        """See GWCatalog.get_attr_source_samples."""
+        return await self._run("get_attr_source_samples", source_name)
+
+    async def describe_source_samples(self, source_name: str) -> pd.DataFrame:
+        """See GWCatalog.describe_source_samples."""
+        return await self._run("describe_source_samples", source_name)
+
+    async def iter_source_samples(
+        self,
+        sources: Optional[List[str]] = None,
+        attr: Union[List[str], str] = None,
+        prefetch: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[str, pd.DataFrame]]:
+        """Iterates over the posterior samples of the sources.
+
+        The samples of the next `prefetch` sources are read while the
+        current one is consumed, the sources are yielded in order. The
+        pending reads are cancelled when the iteration is stopped.
+
+        Args:
+            sources (List[str], optional): sources to read. All the sources
+            of the catalog are read when None. Defaults to None.
+            attr (Union[List[str], str], optional): attributes to return in
+            the result. Defaults to None.
+            prefetch (int, optional): number of sources read in advance,
+            the number of threads of the executor when None. Defaults to
+            None.
+
+        Raises:
+            ValueError: prefetch is lower than 1
+
+        Yields:
+            Tuple[str, pd.DataFrame]: the name of a source and its samples
+        """
+        size = self.__executor.max_workers if prefetch is None else prefetch
+        if size < 1:
+            raise ValueError(f"prefetch must be >= 1, got {size}")
+        names = await self.get_detections() if sources is None else sources
+        pending: Deque[Tuple[str, asyncio.Future]] = deque()
+        try:
+            for name in names:
+                pending.append(
+                    (
+                        name,
+                        asyncio.ensure_future(
+                            self.get_source_samples(name, attr)
+                        ),
+                    )
+                )
+                if len(pending) >= size:
+                    source, future = pending.popleft()
+                    yield source, await future
+            while pending:
+                source, future = pending.popleft()
+                yield source, await future
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def __repr__(self):
+        return f"AsyncGWCatalog({self.__catalog!r})"
+
+    def __str__(self):
+        return f"AsyncGWCatalog: {self.__catalog}"
+
+
+class AsyncGWCatalogs:
+    """Async view of a set of catalogs.
+
+    The set and its catalogs share one AsyncExecutor. The metadata of the
+    set are in memory and are not read in the executor.
+    """
+
+    def __init__(
+        self,
+        catalogs: GWCatalogs,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        timeout: Optional[float] = None,
+    ):
+        """Init the async view of a set of catalogs.
+
+        Args:
+            catalogs (GWCatalogs): the set of catalogs
+            max_workers (int, optional): number of threads. Defaults to 4.
+            max_pending (int, optional): maximum number of calls queued or
+            running. Defaults to 64.
+            timeout (float, optional): maximum time in seconds waiting for
+            a slot, no limit when None. Defaults to None.
+        """
+        self.__catalogs = catalogs
+        self.__executor = AsyncExecutor(max_workers, max_pending, timeout)
+        self.__views: Dict[str, AsyncGWCatalog] = dict()
+
+    @staticmethod
+    async def create(
+        type: GWCatalogType.GWCatalogPlugin,
+        directory: str,
+        accepted_pattern: Optional[str] = None,
+        rejected_pattern: Optional[str] = None,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> "AsyncGWCatalogs":
+        """Creates a set of catalogs (see GWCatalogs.create) without
+        blocking the event loop.
+
+        Args:
+            type (GWCatalogType.GWCatalogPlugin): Type of catalog
+            directory (str): Directory where the data are located
+            accepted_pattern (str, optional): Pattern to select files in the
+                directory (e.g. '*.h5'). Default is None.
+            rejected_pattern (str, optional): Pattern to reject from the list
+                built using accepted_pattern. Default is None.
+            max_workers (int, optional): number of threads. Defaults to 4.
+            max_pending (int, optional): maximum number of calls queued or
+            running. Defaults to 64.
+            timeout (float, optional): maximum time in seconds waiting for
+            a slot, no limit when None. Defaults to None.
+            kwargs: parameters of the plugin
+
+        Returns:
+            AsyncGWCatalogs: the async view of the set of catalogs
+        """
+        catalogs = await asyncio.get_running_loop().run_in_executor(
+            None,
+            partial(
+                GWCatalogs.create,
+                type,
+                directory,
+                accepted_pattern,
+                rejected_pattern,
+                **kwargs,
+            ),
+        )
+        return AsyncGWCatalogs(catalogs, max_workers, max_pending, timeout)
+
+    @property
+    def catalogs(self) -> GWCatalogs:
+        """Wrapped set of catalogs.
+
+        :getter: Returns the wrapped set of catalogs
+        :type: GWCatalogs
+        """
+        return self.__catalogs
+
+    @property
+    def executor(self) -> AsyncExecutor:
+        """Executor of the blocking calls.
+
+        :getter: Returns the executor
+        :type: AsyncExecutor
+        """
+        return self.__executor
+
+    @property
+    def metadata(self) -> pd.DataFrame:
+        """See GWCatalogs.metadata."""
+        return self.__catalogs.metadata
+
+    @property
+    def count(self) -> int:
+        """See GWCatalogs.count."""
+        return self.__catalogs.count
+
+    @property
+    def files(self) -> List[str]:
+        """See GWCatalogs.files."""
+        return self.__catalogs.files
+
+    def get_catalogs_name(self) -> List[str]:
+        """See GWCatalogs.get_catalogs_name."""
+        return self.__catalogs.get_catalogs_name()
+
+    def _view(self, catalog: GWCatalog) -> AsyncGWCatalog:
+        """Returns the async view of a catalog of the set.
+
+        Args:
+            catalog (GWCatalog): the catalog
+
+        Returns:
+            AsyncGWCatalog: the async view of the catalog
+        """
+        view = self.__views.get(catalog.name)
+        if view is None or view.catalog is not catalog:
+            view = AsyncGWCatalog(catalog, self.__executor)
+            self.__views[catalog.name] = view
+        return view
+
+    def get_first_catalog(self) -> AsyncGWCatalog:
+        """See GWCatalogs.get_first_catalog."""
+        return self._view(self.__catalogs.get_first_catalog())
+
+    def get_last_catalog(self) -> AsyncGWCatalog:
+        """See GWCatalogs.get_last_catalog."""
+        return self._view(self.__catalogs.get_last_catalog())
+
+    def get_catalog(self, idx: int) -> AsyncGWCatalog:
+        """See GWCatalogs.get_catalog."""
+        return self._view(self.__catalogs.get_catalog(idx))
+
+    def get_catalog_by(self, name: str) -> AsyncGWCatalog:
+        """See GWCatalogs.get_catalog_by."""
+        return self._view(self.__catalogs.get_catalog_by(name))
+
+    async def refresh(self) -> List[str]:
+        """See GWCatalogs.refresh."""
+        return await self.__executor.run(None, self.__catalogs.refresh)
+
+    async def get_lineage(self, cat_name: str, src_name: str) -> pd.DataFrame:
+        """See GWCatalogs.get_lineage."""
+        lineage, shared = await self.__executor.run_shared(
+            (id(self.__catalogs), "get_lineage", cat_name, src_name),
+            self.__catalogs.get_lineage,
+            cat_name,
+            src_name,
+        )
+        return lineage.copy() if shared else lineage
+
+    async def get_lineages(
+        self, cat_name: str, sources: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """See GWCatalogs.get_lineages."""
+        key = None if sources is None else tuple(sources)
+        lineages, shared = await self.__executor.run_shared(
+            (id(self.__catalogs), "get_lineages", cat_name, key),
+            self.__catalogs.get_lineages,
+            cat_name,
+            sources,
+        )
+        return lineages.copy() if shared else lineages
+
+    async def get_lineage_data(
+        self, lineage: pd.DataFrame, **kwargs
+    ) -> pd.DataFrame:
+        """See GWCatalogs.get_lineage_data, with the same keyword arguments
+        selecting the samples. The requests are not collapsed."""
+        return await self.__executor.run(
+            None, self.__catalogs.get_lineage_data, lineage, **kwargs
+        )
+
+    async def close(self):
+        """Waits for the running calls and shuts the executor down."""
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.__executor.shutdown
+        )
+
+    async def __aenter__(self) -> "AsyncGWCatalogs":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __repr__(self):
+        return f"AsyncGWCatalogs({self.__catalogs!r})"
+
+    def __str__(self):
+        return f"AsyncGWCatalogs: {self.__catalogs}"
@@ -23,6 +23,14 @@ from .utils import FrameEnum
 from .utils import HPhist
 
 
+def mass_credible_intervals(samples: pd.DataFrame) -> Dict[str, float]:
+    """90% credible interval and median of the component masses, computed in
+    the worker processes of `GWCatalog.map_sources`."""
+    l1, m1, h1 = np.quantile(np.array(samples["Mass 1"]), [0.05, 0.5, 0.95])
+    l2, m2, h2 = np.quantile(np.array(samples["Mass 2"]), [0.05, 0.5, 0.95])
+    return {"l1": l1, "m1": m1, "h1": h1, "l2": l2, "m2": m2, "h2": h2}
+
+
 class LisaAnalyse:
     """Factory to create an analysis for a catalog or a time-evolution of the
     catalog."""
@@ -159,22 +167,25 @@ class CatalogAnalysis(AbstractLisaAnalyze):
         # plt.show()
 
     @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def plot_individual_sources(self) -> NoReturn:
-        """Plot the indivual sources."""
+    def plot_individual_sources(self, workers: int = 1) -> NoReturn:
+        """Plot the indivual sources.
+
+        Args:
+            workers (int, optional): number of processes computing the
+            credible intervals. Defaults to 1.
+        """
 
         fig, ax = plt.subplots(figsize=[8, 6], dpi=100)
         detections = self.catalog.get_detections(["Mass 1", "Mass 2"])
         sources = list(detections.index)
+        intervals = self.catalog.map_sources(
+            mass_credible_intervals,
+            sources,
+            ["Mass 1", "Mass 2"],
+            workers=workers,
+        )
         for idx, source in enumerate(sources):
-            chain = self.catalog.get_source_samples(
-                source, ["Mass 1", "Mass 2"]
-            )
-            l1, m1, h1 = np.quantile(
-                np.array(chain["Mass 1"]), [0.05, 0.5, 0.95]
-            )
-            l2, m2, h2 = np.quantile(
-                np.array(chain["Mass 2"]), [0.05, 0.5, 0.95]
-            )
+            l1, m1, h1, l2, m2, h2 = intervals.loc[source]
             if idx < 10:
                 mkr = "o"
             else:
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""This module associates the sources of two catalogs in the parameter
+space, for the catalogs whose "parent" links are missing or ambiguous. It is
+responsible for :
+- finding the pairs of sources whose point estimates are within the
+  tolerances, with a sweep over the sources of the second catalog sorted by
+  the first parameter
+- refining the pairs with the mean and covariance of the posterior samples
+- keeping the closest pair of each source when the matches are one-to-one
+
+The first parameter drives the sweep and should be the most discriminant
+one, e.g. the frequency for the UCB catalogs::
+
+    matches = associate(
+        previous,
+        latest,
+        ["Frequency", "Frequency Derivative", "Ecliptic Longitude", "coslat"],
+        [1e-7, 1e-16, 0.1, 0.1],
+    )
+"""
+
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+#: Period of the angular parameters, whose differences wrap around
+PERIODS = {"Ecliptic Longitude": 2 * np.pi}
+
+Pairs = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _tolerances(
+    params: List[str], tolerances: Union[Dict[str, float], List[float]]
+) -> np.ndarray:
+    """Returns the tolerance of each parameter.
+
+    Raises:
+        ValueError: missing or non-positive tolerance, or periodic first
+        parameter
+    """
+    values = np.array(
+        (
+            [tolerances[param] for param in params]
+            if isinstance(tolerances, dict)
+            else list(tolerances)
+        ),
+        dtype=np.float64,
+    )
+    if len(values) != len(params):
+        raise ValueError(f"{len(params)} tolerances expected for {params}")
+    if not (values > 0).all():
+        raise ValueError(f"tolerances must be > 0, got {values}")
+    if params[0] in PERIODS:
+        raise ValueError(f"the first parameter {params[0]} is periodic")
+    return values
+
+
+def _wrap(deltas: np.ndarray, params: List[str]) -> np.ndarray:
+    """Wraps the differences of the periodic parameters in
+    [-period / 2, period / 2[."""
+    for idx, param in enumerate(params):
+        if param in PERIODS:
+            period = PERIODS[param]
+            deltas[..., idx] = (deltas[..., idx] + period / 2) % period
+            deltas[..., idx] -= period / 2
+    return deltas
+
+
+def _sweep(
+    values_a: np.ndarray,
+    values_b: np.ndarray,
+    tolerances: np.ndarray,
+    params: List[str],
+    chunksize: int,
+) -> Pairs:
+    """Returns the pairs of sources within the tolerances.
+
+    The sources of the second catalog are sorted by the first parameter once.
+    The candidates of a source are the sources within the tolerance of the
+    first parameter, found by binary search, then filtered on all the
+    parameters. The sources of the first catalog are swept by chunks.
+
+    Returns:
+        Pairs: rows in the first and in the second catalog, and the
+        differences of the parameters (second minus first)
+    """
+    order = np.argsort(values_b[:, 0], kind="stable")
+    keys = values_b[order, 0]
+    pairs = [
+        (
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0, dtype=np.int64),
+            np.zeros((0, len(params))),
+        )
+    ]
+    for start in range(0, len(values_a), chunksize):
+        stop = min(start + chunksize, len(values_a))
+        firsts = values_a[start:stop, 0]
+        low = np.searchsorted(keys, firsts - tolerances[0], side="left")
+        high = np.searchsorted(keys, firsts + tolerances[0], side="right")
+        counts = np.maximum(high - low, 0)
+        rows_a = np.repeat(np.arange(start, stop), counts)
+        # positions low, low + 1, ..., high - 1 of each source, flattened
+        shifts = np.repeat(low - (np.cumsum(counts) - counts), counts)
+        rows_b = order[np.arange(counts.sum()) + shifts]
+        deltas = _wrap(values_b[rows_b] - values_a[rows_a], params)
+        kept = (np.abs(deltas) <= tolerances).all(axis=1)
+        pairs.append((rows_a[kept], rows_b[kept], deltas[kept]))
+    rows_a, rows_b, deltas = zip(*pairs)
+    return (
+        np.concatenate(rows_a),
+        np.concatenate(rows_b),
+        np.concatenate(deltas),
+    )
+
+
+def _moments(
+    catalog, sources: np.ndarray, params: List[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the mean and the covariance of the posterior samples of each
+    source, NaN for the sources without samples.
+
+    The samples are read together by get_source_samples_many. They are read
+    one by one only when a source has no samples.
+    """
+    try:
+        samples = catalog.get_source_samples_many(list(sources), params)
+    except (KeyError, OSError):
+        samples = dict()
+        for source in sources:
+            try:
+                samples[source] = catalog.get_source_samples(source, params)
+            except (KeyError, OSError):
+                continue
+    means = np.full((len(sources), len(params)), np.nan)
+    covariances = np.full((len(sources), len(params), len(params)), np.nan)
+    for idx, source in enumerate(sources):
+        if source not in samples:
+            continue
+        values = samples[source][params].to_numpy(dtype=np.float64)
+        means[idx] = values.mean(axis=0)
+        covariances[idx] = np.cov(values, rowvar=False).reshape(
+            len(params), len(params)
+        )
+    return means, covariances
+
+
+def _posterior_distances(
+    catalog_a, catalog_b, names_a, names_b, params: List[str]
+) -> np.ndarray:
+    """Returns the Mahalanobis distance between the posterior means of each
+    pair, with the sum of the two posterior covariances.
+
+    The samples of each source are read once. The distance is NaN when a
+    source has no samples.
+    """
+    sources_a, pairs_a = np.unique(names_a, return_inverse=True)
+    sources_b, pairs_b = np.unique(names_b, return_inverse=True)
+    means_a, covariances_a = _moments(catalog_a, sources_a, params)
+    means_b, covariances_b = _moments(catalog_b, sources_b, params)
+    deltas = _wrap(means_b[pairs_b] - means_a[pairs_a], params)
+    covariances = covariances_a[pairs_a] + covariances_b[pairs_b]
+    missing = np.isnan(deltas).any(axis=1) | np.isnan(covariances).any(
+        axis=(1, 2)
+    )
+    covariances[missing] = np.eye(len(params))
+    deltas[missing] = 0
+    precisions = np.linalg.pinv(covariances, hermitian=True)
+    distances = np.sqrt(np.einsum("ni,nij,nj->n", deltas, precisions, deltas))
+    distances[missing] = np.nan
+    return distances
+
+
+def _one_to_one(rows_a: np.ndarray, rows_b: np.ndarray) -> np.ndarray:
+    """Returns the pairs kept when each source is matched once, the pairs
+    being given from the closest to the farthest."""
+    used_a, used_b = set(), set()
+    kept = np.zeros(len(rows_a), dtype=bool)
+    for idx, (row_a, row_b) in enumerate(zip(rows_a, rows_b)):
+        if row_a not in used_a and row_b not in used_b:
+            used_a.add(row_a)
+            used_b.add(row_b)
+            kept[idx] = True
+    return kept
+
+
+def associate(
+    catalog_a,
+    catalog_b,
+    params: List[str],
+    tolerances: Union[Dict[str, float], List[float]],
+    one_to_one: bool = True,
+    refine: Optional[float] = None,
+    chunksize: int = 4096,
+) -> pd.DataFrame:
+    """Associates the sources of two catalogs by their point estimates.
+
+    Two sources match when the difference of each parameter is within its
+    tolerance. The differences of the parameters of PERIODS wrap around.
+    The distance of a pair is the norm of the differences divided by the
+    tolerances, so that the matches are within a distance of
+    sqrt(len(params)).
+
+    Args:
+        catalog_a (GWCatalog): first catalog
+        catalog_b (GWCatalog): second catalog
+        params (List[str]): parameters of the detections, the first one
+        driving the sweep
+        tolerances (Union[Dict[str, float], List[float]]): maximum absolute
+        difference of each parameter
+        one_to_one (bool, optional): keeps the closest pairs so that each
+        source is matched once, otherwise all the pairs are kept.
+        Defaults to True.
+        refine (float, optional): maximum Mahalanobis distance between the
+        posterior means of a pair, the posterior samples of the candidate
+        sources being read. The pairs of sources without samples are kept.
+        No refinement when None. Defaults to None.
+        chunksize (int, optional): number of sources of the first catalog
+        swept at once, which bounds the memory used. Defaults to 4096.
+
+    Raises:
+        ValueError: missing or non-positive tolerance, periodic first
+        parameter or chunksize lower than 1
+
+    Returns:
+        pd.DataFrame: the pairs in the order of the first catalog, the
+        closest first: "Source A", "Source B", "Distance", the
+        "<param> Difference" (B - A) of each parameter and, when refined,
+        "Posterior Distance"
+    """
+    params = list(params)
+    tols = _tolerances(params, tolerances)
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be >= 1, got {chunksize}")
+    detections_a = catalog_a.get_detections(params)
+    detections_b = catalog_b.get_detections(params)
+    values_a = detections_a[params].to_numpy(dtype=np.float64)
+    values_b = detections_b[params].to_numpy(dtype=np.float64)
+    rows_a, rows_b, deltas = _sweep(
+        values_a, values_b, tols, params, chunksize
+    )
+    distances = np.sqrt(((deltas / tols) ** 2).sum(axis=1))
+    table = pd.DataFrame(
+        {
+            "Source A": detections_a.index.to_numpy()[rows_a],
+            "Source B": detections_b.index.to_numpy()[rows_b],
+            "Distance": distances,
+            **{
+                f"{param} Difference": deltas[:, idx]
+                for idx, param in enumerate(params)
+            },
+        }
+    )
+    if refine is not None:
+        table["Posterior Distance"] = _posterior_distances(
+            catalog_a, catalog_b, table["Source A"], table["Source B"], params
+        )
+        kept = ~(table["Posterior Distance"] > refine).to_numpy()
+        table, rows_a, rows_b = table[kept], rows_a[kept], rows_b[kept]
+    order = np.argsort(table["Distance"].to_numpy(), kind="stable")
+    if one_to_one:
+        order = order[_one_to_one(rows_a[order], rows_b[order])]
+    order = order[np.argsort(rows_a[order], kind="stable")]
+    return table.iloc[order].reset_index(drop=True)
@@ -10,14 +10,50 @@ responsible for :
 - loading detections and source posterior samples
 """
 
+import glob
 import importlib
+import os
+import threading
 from abc import ABC
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import partial
+from itertools import chain
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 import pandas as pd
+from loguru import logger
+
+from .lineage import CatalogLinks
+from .lineage import gather_lineages
+from .lineage import LineageGraph
+from .lineage import stack_epochs
+from .manifest import load_manifests
+from .manifest import manifest_entry
+from .manifest import ManifestEntry
+from .manifest import MetadataManifest
+from .monitoring import LogLevel
+from .monitoring import UtilsMonitoring
+from .parallel import map_sources
+from .ranking import RankedIndex
+from .storage import file_fingerprint
+from .storage import STORE_POOL
+from .summary import summarize_sources
+from .summary import summary_location
+from .summary import SummaryCache
+from .utils import CacheManager
+from .utils import DtypePolicy
+from .utils import LRUCache
+from .utils import read_only_view
+from .watch import CatalogWatcher
+
 
 class GWCatalogType:
     """GW catalog implementation.
@@ -43,7 +79,11 @@ class GWCatalogType:
 
 
 class GWCatalog:
-    """Interface for handling a GW catalog."""
+    """Interface for handling a GW catalog.
+
+    The implementations must call GWCatalog.__init__, which creates the
+    memoized detections and the ranked index of the catalog.
+    """
 
     @classmethod
     def __subclasshook__(cls, subclass):
@@ -67,6 +107,99 @@ class GWCatalog:
             or NotImplemented
         )
 
+    def __init__(
+        self,
+        cache: Optional[LRUCache] = None,
+        read_only: bool = False,
+        memmap: bool = False,
+        dtype_policy: Optional[DtypePolicy] = None,
+        manifest: Optional[ManifestEntry] = None,
+    ):
+        """Init the options and the memoized datasets shared by the
+        implementations.
+
+        Args:
+            cache (LRUCache, optional): cache of the posterior samples. The
+            cache shared by all the catalogs is used when None.
+            Defaults to None.
+            read_only (bool, optional): returns read-only views instead of
+            copies of the datasets. Defaults to False.
+            memmap (bool, optional): reads the posterior samples from the
+            packed files mapped in memory when they are up to date. The
+            mapped samples are copied unless read_only is True, so that
+            zero-copy reads need read_only=True. Defaults to False.
+            dtype_policy (DtypePolicy, optional): compact dtypes of the
+            posterior samples. Defaults to None.
+            manifest (ManifestEntry, optional): manifest entry of the
+            catalog file, used instead of opening the file when it is up
+            to date. Defaults to None.
+        """
+        self.__cache = cache
+        self.__read_only = read_only
+        self.__memmap = memmap
+        self.__dtype_policy = dtype_policy
+        self.__manifest = manifest
+        self.__datasets: Optional[List[str]] = (
+            None if manifest is None else list(manifest.datasets)
+        )
+        self.__detections_lock = threading.Lock()
+        self.__detections: Optional[pd.DataFrame] = None
+        self.__detections_fingerprint = None
+        self.__ranked = RankedIndex()
+        self.__summaries_lock = threading.Lock()
+        self.__summaries: Optional[SummaryCache] = None
+        self.__raw: Optional[GWCatalog] = None
+
+    @property
+    def read_only(self) -> bool:
+        """Read-only mode.
+
+        :getter: Returns True when read-only views of the datasets are
+            returned instead of copies
+        :type: bool
+        """
+        return self.__read_only
+
+    @property
+    def memmap(self) -> bool:
+        """Memory-mapped mode.
+
+        :getter: Returns True when the posterior samples are read from the
+            packed files mapped in memory
+        :type: bool
+        """
+        return self.__memmap
+
+    @property
+    def dtype_policy(self) -> Optional[DtypePolicy]:
+        """Dtype policy of the posterior samples.
+
+        :getter: Returns the dtype policy, None when the samples keep their
+            original dtypes
+        :type: Optional[DtypePolicy]
+        """
+        return self.__dtype_policy
+
+    @property
+    def cache(self) -> Optional[LRUCache]:
+        """Cache of the posterior samples.
+
+        :getter: Returns the cache of the posterior samples, None when the
+            shared cache is used
+        :type: Optional[LRUCache]
+        """
+        return self.__cache
+
+    @property
+    def manifest(self) -> Optional[ManifestEntry]:
+        """Manifest entry of the catalog file.
+
+        :getter: Returns the manifest entry, None when the manifest is not
+            used
+        :type: Optional[ManifestEntry]
+        """
+        return self.__manifest
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -116,19 +249,26 @@ class GWCatalog:
         """
         raise NotImplementedError("Not implemented")
 
-    @abstractmethod
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
     def get_attr_detections(self) -> List[str]:
         """Returns the attributes of the catalog.
 
-        Raises:
-            NotImplementedError: Not implemented
+        The attributes are taken from the manifest entry of the catalog
+        file when it is up to date, without reading the detections.
 
         Returns:
             List[str]: the list of attributes
         """
-        raise NotImplementedError("Not implemented")
-
-    @abstractmethod
+        if (
+            self.manifest is not None
+            and self.manifest.fingerprint == file_fingerprint(self.location)
+        ):
+            return list(self.manifest.detections)
+        return list(self._get_detections_dataset().columns)
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
     def get_median_source(self, attr: str) -> pd.DataFrame:
         """Returns the source corresponding to the median of the specified
         attribute.
@@ -136,24 +276,117 @@ class GWCatalog:
         Args:
             attr (str): attribute name
 
-        Raises:
-            NotImplementedError: Not implemented
-
         Returns:
             pd.DataFrame: the source for which the median is computed on the
             attribute
         """
-        raise NotImplementedError("Not implemented")
+        return self.get_quantile_source(attr, 0.5)
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_quantile_source(self, attr: str, q: float) -> pd.DataFrame:
+        """Returns the source closest to a quantile of the specified
+        attribute.
+
+        The attribute is ranked on the first lookup, so that the next
+        lookups on the same detections are binary searches.
+
+        Args:
+            attr (str): attribute name
+            q (float): quantile, between 0 and 1
+
+        Returns:
+            pd.DataFrame: the source whose attribute is the closest to the
+            quantile
+        """
+        detections = self._get_detections_dataset()
+        ranked = self.__ranked.get(detections, attr)
+        return self._share(
+            detections.iloc[[ranked.closest(ranked.quantile(q))]]
+        )
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_top_k(
+        self, attr: str, k: int, largest: bool = True
+    ) -> pd.DataFrame:
+        """Returns the sources with the largest (or smallest) values of the
+        specified attribute, the largest (smallest) first.
+
+        Args:
+            attr (str): attribute name
+            k (int): number of sources
+            largest (bool, optional): returns the smallest values when
+            False. Defaults to True.
+
+        Returns:
+            pd.DataFrame: the sources
+        """
+        detections = self._get_detections_dataset()
+        ranked = self.__ranked.get(detections, attr)
+        return self._share(detections.iloc[ranked.top(k, largest)])
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_range_sources(
+        self,
+        attr: str,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """Returns the sources whose attribute is in [low, high], in
+        increasing order of the attribute.
+
+        Args:
+            attr (str): attribute name
+            low (float, optional): lower bound. Unbounded when None.
+            Defaults to None.
+            high (float, optional): upper bound. Unbounded when None.
+            Defaults to None.
+
+        Returns:
+            pd.DataFrame: the sources
+        """
+        detections = self._get_detections_dataset()
+        ranked = self.__ranked.get(detections, attr)
+        return self._share(detections.iloc[ranked.between(low, high)])
 
     @abstractmethod
     def get_source_samples(
-        self, source_name: str, attr: List[str]
+        self,
+        source_name: str,
+        attr: List[str],
+        max_samples: Optional[int] = None,
+        stride: Optional[int] = None,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        random_state: Optional[int] = None,
     ) -> pd.DataFrame:
         """Returns the posterior samples of the source
 
+        A subset of the samples can be read instead of the whole chain
+        (see lisacattools.storage.SampleSelection): the samples
+        [start:stop], every `stride`-th of them and at most `max_samples`
+        of these, evenly spaced or drawn at random with the `random_state`
+        seed. The rows are selected when reading the file::
+
+            preview = catalog.get_source_samples(
+                source, max_samples=1000, random_state=42
+            )
+
         Args:
             source_name (str): source name
             attr (List[str]): the list of attributes to return in the result
+            max_samples (int, optional): maximum number of samples.
+            Defaults to None.
+            stride (int, optional): keeps one sample every `stride`
+            samples. Defaults to None.
+            start (int, optional): first sample of the window. Defaults to
+            None.
+            stop (int, optional): end of the window (excluded). Defaults to
+            None.
+            random_state (int, optional): seed drawing the `max_samples`
+            samples at random instead of evenly spaced. Defaults to None.
 
         Raises:
             NotImplementedError: [description]
@@ -163,6 +396,87 @@ class GWCatalog:
         """
         raise NotImplementedError("Not implemented")
 
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=1000)
+    def get_source_samples_many(
+        self,
+        source_names: List[str],
+        attr: Union[List[str], str] = None,
+        as_frame: bool = False,
+    ) -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+        """Returns the posterior samples of several sources.
+
+        The sources stored in the same file are read together, so that each
+        file is opened once. This implementation reads the sources one by
+        one, for the storages keeping their files open.
+
+        Args:
+            source_names (List[str]): source names
+            attr (Union[List[str], str], optional): attributes to return in
+            the result. Defaults to None.
+            as_frame (bool, optional): returns one DataFrame indexed by
+            source and sample instead of a dictionary. Defaults to False.
+
+        Returns:
+            Union[Dict[str, pd.DataFrame], pd.DataFrame]: the posterior
+            samples of each source
+        """
+        samples: Dict[str, pd.DataFrame] = {
+            source_name: self.get_source_samples(source_name, attr)
+            for source_name in source_names
+        }
+        return self._frame_samples(samples) if as_frame else samples
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def iter_source_samples(
+        self,
+        sources: Optional[List[str]] = None,
+        attr: Union[List[str], str] = None,
+        chunk_sources: Optional[int] = None,
+    ) -> Iterator[Union[Tuple[str, pd.DataFrame], Dict[str, pd.DataFrame]]]:
+        """Iterates over the posterior samples of the sources.
+
+        Only one chunk of sources is held at a time (besides the cache of the
+        posterior samples, which is bounded), so that reductions over the
+        whole catalog run in constant memory::
+
+            for source, samples in catalog.iter_source_samples(attr=params):
+                hist += np.histogram(samples["Frequency"], bins)[0]
+
+        Args:
+            sources (List[str], optional): source names. All the detections
+            are iterated when None. Defaults to None.
+            attr (Union[List[str], str], optional): attributes to return in
+            the result. Defaults to None.
+            chunk_sources (int, optional): number of sources per chunk. The
+            sources are yielded one by one when None. Defaults to None.
+
+        Raises:
+            ValueError: chunk_sources is lower than 1
+
+        Yields:
+            Union[Tuple[str, pd.DataFrame], Dict[str, pd.DataFrame]]: the
+            source name and its posterior samples, or the posterior samples
+            of each source of a chunk when chunk_sources is set
+        """
+        if chunk_sources is not None and chunk_sources < 1:
+            raise ValueError(
+                f"chunk_sources must be >= 1, got {chunk_sources}"
+            )
+        source_names = (
+            self.get_detections() if sources is None else list(sources)
+        )
+        size = 1 if chunk_sources is None else chunk_sources
+        for start in range(0, len(source_names), size):
+            stop = start + size
+            samples = self.get_source_samples_many(
+                source_names[start:stop], attr
+            )
+            if chunk_sources is None:
+                yield from samples.items()
+            else:
+                yield samples
+
     @abstractmethod
     def get_attr_source_samples(self, source_name: str) -> List[str]:
         """Returns the attributes of the source posterior samples
@@ -178,25 +492,357 @@ class GWCatalog:
         """
         raise NotImplementedError("Not implemented")
 
-    @abstractmethod
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=1000)
+    def get_summaries(
+        self,
+        quantiles: Optional[Tuple[float, ...]] = None,
+        covariance: bool = False,
+        workers: Optional[int] = 1,
+    ) -> pd.DataFrame:
+        """Returns the summaries of the posterior samples of every source.
+
+        The summaries (count, mean, std, min, quantiles, max and covariance)
+        are kept in a summary file next to the catalog, with the fingerprint
+        of the files the samples come from. Only the sources whose samples
+        have changed are summarized again. The summaries are computed on the
+        original dtypes of the samples, whatever the dtype policy::
+
+            means = catalog.get_summaries().xs("mean", level="Statistic")
+
+        Args:
+            quantiles (Tuple[float, ...], optional): quantiles of the
+            summaries, always with the quartiles. The quantiles of the
+            summary file (or DEFAULT_QUANTILES) are used when None.
+            Defaults to None.
+            covariance (bool, optional): returns the covariance of the
+            attributes, indexed by (Source, Attribute), instead of the
+            statistics. Defaults to False.
+            workers (int, optional): number of processes summarizing the
+            sources, see map_sources. Defaults to 1.
+
+        Returns:
+            pd.DataFrame: the statistics indexed by (Source, Statistic)
+        """
+        table = self._get_summary_cache().update(
+            self._summary_files(),
+            partial(summarize_sources, self._raw_catalog(), workers=workers),
+            quantiles,
+        )
+        return self._share(
+            table.covariance if covariance else table.statistics
+        )
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG)
     def describe_source_samples(self, source_name: str) -> pd.DataFrame:
         """Statistical summary of the source posterior samples
 
+        The summary is served from the summaries of get_summaries when they
+        are up to date, without reading the posterior samples. As these, it
+        is computed on the original dtypes of the samples.
+
         Args:
             source_name (str): source name
 
+        Returns:
+            pd.DataFrame: statistics
+        """
+        table = self._get_summary_cache().get(self._summary_files())
+        if table is not None and source_name in table.statistics.index:
+            return table.describe(source_name)
+        return self._raw_catalog().get_source_samples(source_name).describe()
+
+    def map_sources(
+        self,
+        func: Callable[[pd.DataFrame], Any],
+        sources: Optional[List[str]] = None,
+        attr: Union[List[str], str] = None,
+        workers: Optional[int] = None,
+        chunksize: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        timing: Optional[Callable[[dict], None]] = None,
+    ) -> pd.DataFrame:
+        """Applies a function to the posterior samples of each source on a
+        pool of processes.
+
+        Each worker rebuilds the catalog and opens its own HDF5 handles. The
+        function must be defined at the module level::
+
+            def credible_interval(samples):
+                return samples["Mass 1"].quantile([0.05, 0.95]).to_dict()
+
+            intervals = catalog.map_sources(credible_interval, workers=4)
+
+        Args:
+            func (Callable[[pd.DataFrame], Any]): function of the posterior
+            samples of a source, returning a scalar, a dictionary or a Series
+            sources (List[str], optional): source names. All the detections
+            are used when None. Defaults to None.
+            attr (Union[List[str], str], optional): attributes given to the
+            function. Defaults to None.
+            workers (int, optional): number of processes. The function runs
+            in this process when 1 and on all the CPUs when None.
+            Defaults to None.
+            chunksize (int, optional): number of sources per task. Four
+            tasks per worker when None. Defaults to None.
+            progress (Callable[[int, int], None], optional): called with the
+            number of sources done and the total. Defaults to None.
+            timing (Callable[[dict], None], optional): called at the end
+            with the elapsed time and the time spent reading and in the
+            function. Defaults to None.
+
+        Returns:
+            pd.DataFrame: the results indexed by source, in one column named
+            after the function or one column per key of the results
+        """
+        return map_sources(
+            self,
+            func,
+            sources,
+            attr,
+            workers=workers,
+            chunksize=chunksize,
+            progress=progress,
+            timing=timing,
+        )
+
+    @property
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def datasets(self) -> List[str]:
+        """dataset.
+
+        The datasets are listed on the first access only.
+
+        :getter: Returns the list of datasets
+        :type: List
+        """
+        if self.__datasets is None:
+            self.__datasets = STORE_POOL.keys(self.location)
+        return self.__datasets
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=10)
+    def get_dataset(self, name: str) -> pd.DataFrame:
+        """Returns a dataset based on its name.
+
+        Args:
+            name (str): name of the dataset
+
+        Returns:
+            pd.DataFrame: the dataset
+        """
+        return STORE_POOL.read(self.location, name)
+
+    def _read_detections(self) -> pd.DataFrame:
+        """Reads the detections dataset from the catalog file.
+
+        Returns:
+            pd.DataFrame: the detections dataset
+        """
+        return self.get_dataset("detections")
+
+    def _get_detections_dataset(self) -> pd.DataFrame:
+        """Returns the detections dataset.
+
+        The dataset is read once by _read_detections and memoized until the
+        modification time or the size of the catalog file changes. It must
+        not be modified.
+
+        Returns:
+            pd.DataFrame: the detections dataset
+        """
+        fingerprint = file_fingerprint(self.location)
+        with self.__detections_lock:
+            if (
+                self.__detections is None
+                or fingerprint != self.__detections_fingerprint
+            ):
+                detections = self._read_detections()
+                self.__detections = (
+                    read_only_view(detections)
+                    if self.read_only
+                    else detections
+                )
+                self.__detections_fingerprint = fingerprint
+            return self.__detections
+
+    def _has_detections(self) -> bool:
+        """Checks if the detections dataset is memoized.
+
+        Returns:
+            bool: True when the detections dataset has been read
+        """
+        return self.__detections is not None
+
+    def invalidate(self):
+        """Forgets the memoized detections dataset."""
+        with self.__detections_lock:
+            self.__detections = None
+            self.__detections_fingerprint = None
+
+    def _summary_files(self) -> Dict[str, List[str]]:
+        """Returns the sources of each file their posterior samples come
+        from.
+
         Raises:
-            NotImplementedError: Not implemented
+            NotImplementedError: When the method is not implemented
 
         Returns:
-            pd.DataFrame: statistics
+            Dict[str, List[str]]: sources of each file
         """
         raise NotImplementedError("Not implemented")
 
+    def _summary_location(self) -> str:
+        """Returns the location of the summary file of the catalog.
+
+        Returns:
+            str: location of the summary file
+        """
+        return summary_location(self.location)
+
+    def _get_summary_cache(self) -> SummaryCache:
+        """Returns the summaries of the catalog, created on the first call.
+
+        Returns:
+            SummaryCache: the summaries
+        """
+        with self.__summaries_lock:
+            if self.__summaries is None:
+                self.__summaries = SummaryCache(self._summary_location())
+            return self.__summaries
+
+    def _raw_catalog(self) -> "GWCatalog":
+        """Returns the catalog reading the posterior samples with their
+        original dtypes, created on the first call when the catalog has a
+        dtype policy.
+
+        Returns:
+            GWCatalog: this catalog, or the same catalog without the dtype
+            policy
+        """
+        if self.dtype_policy is None:
+            return self
+        with self.__summaries_lock:
+            if self.__raw is None:
+                options = self._options()
+                options["dtype_policy"] = None
+                self.__raw = type(self)(
+                    self.name, self.location, self.cache, **options
+                )
+            return self.__raw
+
+    def _share(
+        self, data: Union[pd.DataFrame, pd.Series]
+    ) -> Union[pd.DataFrame, pd.Series]:
+        """Returns a read-only view of the data in read-only mode, a copy
+        otherwise.
+
+        Args:
+            data (Union[pd.DataFrame, pd.Series]): data to return
+
+        Returns:
+            Union[pd.DataFrame, pd.Series]: view or copy of the data
+        """
+        return read_only_view(data) if self.read_only else data.copy()
+
+    def _share_samples(
+        self, data: Union[pd.DataFrame, pd.Series]
+    ) -> Union[pd.DataFrame, pd.Series]:
+        """Returns the posterior samples as _share, with the compact dtypes
+        of the dtype policy if any.
+
+        Args:
+            data (Union[pd.DataFrame, pd.Series]): samples to return
+
+        Returns:
+            Union[pd.DataFrame, pd.Series]: view or copy of the samples
+        """
+        if self.dtype_policy is None:
+            return self._share(data)
+        compact = self.dtype_policy.apply(data)
+        return read_only_view(compact) if self.read_only else compact
+
+    @staticmethod
+    def _frame_samples(samples: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Returns the posterior samples of several sources in one DataFrame
+        indexed by source and sample.
+
+        Args:
+            samples (Dict[str, pd.DataFrame]): posterior samples of each
+            source
+
+        Returns:
+            pd.DataFrame: the posterior samples
+        """
+        return pd.concat(samples, names=["Source", None])
+
+    def _options(self) -> Dict[str, Any]:
+        """Returns the keyword arguments rebuilding the catalog from its
+        name and its location, without its cache.
+
+        Returns:
+            Dict[str, Any]: keyword arguments of the constructor
+        """
+        options = {
+            "read_only": self.read_only,
+            "dtype_policy": self.dtype_policy,
+        }
+        if self.memmap:
+            options["memmap"] = True
+        if self.manifest is not None:
+            options["manifest"] = self.manifest
+        return options
+
+    def _store_files(self) -> List[str]:
+        """Returns the files of the catalog that the shared pool may keep
+        open.
+
+        Returns:
+            List[str]: location of the files
+        """
+        return [self.location]
+
+    def __enter__(self) -> "GWCatalog":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Closes the HDF5 stores of the catalog kept open by the shared
+        pool. The stores of the other catalogs stay open."""
+        for path in self._store_files():
+            STORE_POOL.close(path)
+
+    def __reduce__(self):
+        # rebuilt without the cache of this process, e.g. in the worker
+        # processes of map_sources
+        return (
+            partial(type(self), **self._options()),
+            (self.name, self.location),
+        )
+
 
 class GWCatalogs(ABC):
     """Interface fo handling time-evolving GW catalogs"""
 
+    #: Column sorting the catalogs of the set, None to keep the file order
+    SORT_BY: Optional[str] = None
+    #: Attributes of the samples returned by get_lineage_data by default,
+    #: all the attributes when None
+    LINEAGE_COLUMNS: Optional[List[str]] = None
+    #: Column identifying the same epoch of a source in several catalogs of
+    #: a lineage, None when the epochs are never duplicated
+    LINEAGE_UNIQUE: Optional[str] = None
+    #: Column of the detections holding the parent of each source
+    PARENT_COLUMN: str = "parent"
+
+    EXTRA_DIR = "extra_directories"
+    CACHE = "cache"
+    READ_ONLY = "read_only"
+    WORKERS = "workers"
+    MANIFEST = "manifest"
+    MEMMAP = "memmap"
+    DTYPE_POLICY = "dtype_policy"
+
     @classmethod
     def __subclasshook__(cls, subclass):
         return (
@@ -286,15 +932,166 @@ class GWCatalogs(ABC):
             arguments.append(rejected_pattern)
         return my_class(*arguments, *args, **kwargs)
 
+    def __init__(
+        self,
+        path: str,
+        accepted_pattern: Optional[str] = None,
+        rejected_pattern: Optional[str] = None,
+        **kwargs,
+    ):
+        """Init the options and the state shared by the implementations.
+
+        Args:
+            path (str): directory of the catalogs
+            accepted_pattern (str, optional): pattern to accept files.
+            Defaults to None.
+            rejected_pattern (str, optional): pattern to reject files.
+            Defaults to None.
+
+        Note:
+            The `cache` parameter can be given to use a specific LRUCache for
+            the posterior samples of this catalog set, otherwise the cache
+            shared by all the catalogs is used::
+
+                GWCatalogs.create(
+                    GWCatalogType.UCB, "/tmp", cache=LRUCache(2 * 1024**3)
+                )
+
+            The `read_only` parameter can be set to True to get read-only
+            views of the cached datasets instead of copies.
+
+            The `workers` parameter sets the number of threads reading the
+            metadata of the catalogs, and the epochs of a lineage in
+            get_lineage_data (1 by default). The resulting order does not
+            depend on it.
+
+            The `manifest` parameter can be set to True to keep the metadata
+            of the catalogs in a sidecar file of each directory (see
+            lisacattools.manifest.MetadataManifest), so that the unchanged
+            files are not opened when creating the catalogs.
+
+            The `memmap` parameter can be set to True to read the posterior
+            samples from the packed files written by
+            lisacattools.convert.convert_chains_to_packed, mapped in memory
+            instead of read from the HDF5 files. The mapped samples are
+            returned without copy with `read_only` only.
+
+            The `dtype_policy` parameter can be set to a
+            lisacattools.utils.DtypePolicy to return the posterior samples
+            with compact dtypes (float32 columns and categorical labels).
+            The cached samples keep their original dtypes.
+        """
+        self.path = path
+        self.accepted_pattern = accepted_pattern
+        self.rejected_pattern = rejected_pattern
+        self.extra_directories: List[str] = kwargs.get(
+            GWCatalogs.EXTRA_DIR, list()
+        )
+        self.cache: Optional[LRUCache] = kwargs.get(GWCatalogs.CACHE)
+        self.read_only: bool = kwargs.get(GWCatalogs.READ_ONLY, False)
+        self.workers: int = kwargs.get(GWCatalogs.WORKERS, 1)
+        self.manifest: bool = kwargs.get(GWCatalogs.MANIFEST, False)
+        self.memmap: bool = kwargs.get(GWCatalogs.MEMMAP, False)
+        self.dtype_policy: Optional[DtypePolicy] = kwargs.get(
+            GWCatalogs.DTYPE_POLICY
+        )
+        self.cat_files: List[str] = list()
+        self.__metadata: Optional[pd.DataFrame] = None
+        self.__manifests: Dict[str, MetadataManifest] = dict()
+        self.__catalogs: Dict[str, GWCatalog] = dict()
+        self.__fingerprints: Dict[str, Tuple[int, int]] = dict()
+        self.__refresh_lock = threading.Lock()
+        self.__lineage_lock = threading.Lock()
+        self.__lineage = LineageGraph()
+        self.__lineage_rows: Optional[pd.DataFrame] = None
+
+    def _load_catalogs(self):
+        """Searches the catalog files and reads their metadata, sorted by
+        SORT_BY.
+
+        Raises:
+            ValueError: no files found matching the accepted and rejected
+            patterns.
+        """
+        cat_files = self._search_catalog_files()
+        if len(cat_files) == 0:
+            directories = self._search_directories(
+                self.path, self.extra_directories
+            )
+            raise ValueError(
+                f"no files found matching the accepted \
+                    ({self.accepted_pattern}) and rejected \
+                    ({self.rejected_pattern}) patterns in {directories}"
+            )
+        self.__fingerprints = {
+            path: file_fingerprint(path) for path in cat_files
+        }
+        metadata = self._read_metadata(cat_files)
+        if self.SORT_BY is not None:
+            metadata = metadata.sort_values(by=self.SORT_BY)
+        self._set_metadata(metadata, cat_files)
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def _search_directories(
+        self, path: str, extra_directories: List[str]
+    ) -> List[str]:
+        """Compute the list of directories on which the pattern will be
+        applied.
+
+        Args:
+            path (str) : main path
+            extra_directories (List[str]) : others directories
+
+        Returns:
+            List[str]: list of directories on which the pattern will be
+            applied
+        """
+        directories: List[str] = extra_directories[:]
+        directories.append(path)
+        return directories
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def _search_files(
+        self, directories: List[str], accepted_pattern, rejected_pattern
+    ) -> List[str]:
+        """Search files in directories according to a set of constraints :
+        accepted and rejected patterns
+
+        Args:
+            directories (List[str]): List of directories to scan
+            accepted_pattern ([type]): pattern to get files
+            rejected_pattern ([type]): pattern to reject files
+
+        Returns:
+            List[str]: List of files
+        """
+        accepted_files = [
+            glob.glob(path + os.path.sep + accepted_pattern)
+            for path in directories
+        ]
+        accepted_files = list(chain(*accepted_files))
+        if rejected_pattern is None:
+            rejected_files = list()
+        else:
+            rejected_files = [
+                list()
+                if rejected_pattern is None
+                else glob.glob(path + os.path.sep + rejected_pattern)
+                for path in directories
+            ]
+        rejected_files = list(chain(*rejected_files))
+        cat_files = sorted(set(accepted_files) - set(rejected_files))
+        return cat_files
+
     @property
-    @abstractmethod
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
     def metadata(self) -> pd.DataFrame:
         """metadata.
 
         :getter: Returns the metadata of the catalog set
         :type: pd.DataFrame
         """
-        raise NotImplementedError("Not implemented")
+        return self.__metadata
 
     @property
     @abstractmethod
@@ -383,6 +1180,394 @@ class GWCatalogs(ABC):
         """
         raise NotImplementedError("Not implemented")
 
+    def _new_catalog(self, name: str, location: str) -> GWCatalog:
+        """Creates the catalog object of a catalog of the set.
+
+        Args:
+            name (str): name of the catalog
+            location (str): location of the catalog
+
+        Raises:
+            NotImplementedError: When the method is not implemented
+
+        Returns:
+            GWCatalog: the catalog
+        """
+        raise NotImplementedError("Not implemented")
+
+    def _get_catalog_object(self, name: str, location: str) -> GWCatalog:
+        """Returns the catalog object of a catalog of the set.
+
+        The catalog objects are kept so that the datasets they memoize are
+        shared by all the calls.
+
+        Args:
+            name (str): name of the catalog
+            location (str): location of the catalog
+
+        Returns:
+            GWCatalog: the catalog
+        """
+        catalog = self.__catalogs.get(name)
+        if catalog is None or catalog.location != location:
+            catalog = self._new_catalog(name, location)
+            self.__catalogs[name] = catalog
+        return catalog
+
+    def _catalog_options(self, location: str) -> Dict[str, Any]:
+        """Returns the options of the catalog objects of the set.
+
+        Args:
+            location (str): location of the catalog
+
+        Returns:
+            Dict[str, Any]: keyword arguments of the catalog constructor
+        """
+        return {
+            "read_only": self.read_only,
+            "manifest": manifest_entry(self.__manifests, location),
+            "memmap": self.memmap,
+            "dtype_policy": self.dtype_policy,
+        }
+
+    def _search_catalog_files(self) -> List[str]:
+        """Searches the catalog files of the set, in the directory and the
+        extra directories of the set.
+
+        Returns:
+            List[str]: the catalog files
+        """
+        directories = self._search_directories(
+            self.path, self.extra_directories
+        )
+        return self._search_files(
+            directories, self.accepted_pattern, self.rejected_pattern
+        )
+
+    def _read_cats(self, cat_file: str) -> pd.DataFrame:
+        """Reads the metadata of a given catalog and the location of the file.
+
+        The metadata is taken from the manifest of the directory when the
+        manifest is enabled.
+
+        Args:
+            cat_file (str): catalog to load
+
+        Returns:
+            pd.DataFrame: pandas data frame
+        """
+        entry = manifest_entry(self.__manifests, cat_file)
+        df = (
+            STORE_POOL.read(cat_file, "metadata")
+            if entry is None
+            else entry.metadata.copy()
+        )
+        df["location"] = cat_file
+        return df
+
+    def _read_metadata(self, cat_files: List[str]) -> pd.DataFrame:
+        """Reads the metadata of catalog files with the `workers` threads.
+
+        The manifests of the new directories are loaded first when the
+        manifest is enabled.
+
+        Args:
+            cat_files (List[str]): catalogs to load
+
+        Returns:
+            pd.DataFrame: the metadata of the catalogs, in the order of the
+            files
+        """
+        if self.manifest:
+            for directory, manifest in load_manifests(cat_files).items():
+                self.__manifests.setdefault(directory, manifest)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            metadata = pd.concat(
+                list(executor.map(self._read_cats, cat_files))
+            )
+        for manifest in self.__manifests.values():
+            manifest.save()
+        return metadata
+
+    def _set_metadata(self, metadata: pd.DataFrame, cat_files: List[str]):
+        """Replaces the metadata and the catalog files of the set.
+
+        Args:
+            metadata (pd.DataFrame): metadata of the set
+            cat_files (List[str]): catalog files of the set
+        """
+        self.__metadata = metadata
+        self.cat_files = cat_files
+
+    def _lineage_outdated(
+        self, graph: LineageGraph, names: List[str], metadata: pd.DataFrame
+    ) -> bool:
+        """Checks if the lineage links must be rebuilt after a refresh.
+
+        By default, they are rebuilt when a changed or removed catalog is
+        linked.
+
+        Args:
+            graph (LineageGraph): lineage graph of the set
+            names (List[str]): changed and removed catalogs
+            metadata (pd.DataFrame): metadata of the refreshed set
+
+        Returns:
+            bool: True when the lineage links must be rebuilt
+        """
+        return any(name in graph for name in names)
+
+    def _forget_lineage(self, names: List[str], metadata: pd.DataFrame):
+        """Forgets the lineage links of the changed and removed catalogs.
+
+        Args:
+            names (List[str]): changed and removed catalogs
+            metadata (pd.DataFrame): metadata of the refreshed set
+        """
+        with self.__lineage_lock:
+            if self._lineage_outdated(self.__lineage, names, metadata):
+                self.__lineage = LineageGraph()
+                self.__lineage_rows = None
+
+    def _scan(
+        self,
+    ) -> Tuple[List[str], Dict[str, Tuple[int, int]], List[str], List[str]]:
+        """Searches the catalog files again and compares them with the
+        files of the set.
+
+        Returns:
+            Tuple[List[str], Dict[str, Tuple[int, int]], List[str],
+            List[str]]: the files, their fingerprint, the new and changed
+            files, and the changed and removed files
+        """
+        cat_files = self._search_catalog_files()
+        fingerprints = {path: file_fingerprint(path) for path in cat_files}
+        changed = [
+            path
+            for path in cat_files
+            if self.__fingerprints.get(path) != fingerprints[path]
+        ]
+        stale = [
+            path
+            for path, fingerprint in self.__fingerprints.items()
+            if fingerprints.get(path) != fingerprint
+        ]
+        return cat_files, fingerprints, changed, stale
+
+    def _forget(self, stale: List[str], metadata: pd.DataFrame):
+        """Forgets the catalog objects, the cached samples, the open stores
+        and the lineage links of the changed and removed catalog files.
+
+        Args:
+            stale (List[str]): changed and removed catalog files
+            metadata (pd.DataFrame): metadata of the refreshed set
+        """
+        names = list(
+            self.metadata.index[self.metadata["location"].isin(stale)]
+        )
+        for name in names:
+            self.__catalogs.pop(name, None)
+        cache = (
+            self.cache if self.cache is not None else CacheManager.memory_cache
+        )
+        for location in stale:
+            cache.clear(location)
+            STORE_POOL.close(location)
+        self._forget_lineage(names, metadata)
+
+    def _refresh_files(self) -> List[str]:
+        """Refreshes the set as described in refresh, from the catalog files
+        found by _search_catalog_files.
+
+        Returns:
+            List[str]: names of the new or changed catalogs, in the order of
+            the set
+        """
+        with self.__refresh_lock:
+            cat_files, fingerprints, changed, stale = self._scan()
+            if len(changed) == 0 and len(stale) == 0:
+                return list()
+            metadata = self.metadata[~self.metadata["location"].isin(stale)]
+            if len(changed) > 0:
+                metadata = pd.concat([metadata, self._read_metadata(changed)])
+            if self.SORT_BY is not None:
+                metadata = metadata.sort_values(by=self.SORT_BY)
+            self._forget(stale, metadata)
+            self._set_metadata(metadata, cat_files)
+            self.__fingerprints = fingerprints
+            names = list(metadata.index[metadata["location"].isin(changed)])
+            logger.log(
+                LogLevel.DEBUG,
+                f"Refreshed {names}, removed {set(stale) - set(changed)}",
+            )
+            return names
+
+    def refresh(self) -> List[str]:
+        """Rescans the directories of the catalog set and reads the metadata
+        of the new and changed catalog files only.
+
+        The cached datasets of the changed and removed catalogs are
+        forgotten. The other catalogs keep theirs.
+
+        The sets searching their catalog files implement it with
+        _refresh_files. The other sets, such as a bundle, cannot be
+        refreshed.
+
+        Raises:
+            NotImplementedError: When the set cannot be refreshed
+
+        Returns:
+            List[str]: names of the new or changed catalogs, in the order of
+            the set
+        """
+        raise NotImplementedError(
+            "Refresh is not implemented for this catalog !"
+        )
+
+    def watch(
+        self,
+        callback: Callable[["GWCatalog"], None],
+        interval: float = 60.0,
+    ) -> CatalogWatcher:
+        """Returns a watcher refreshing the catalog set in a thread and
+        calling a function with each new or changed catalog::
+
+            with catalogs.watch(lambda catalog: print(catalog.name)):
+                ...
+
+        Args:
+            callback (Callable[[GWCatalog], None]): called with each new or
+            changed catalog
+            interval (float, optional): seconds between two refreshes.
+            Defaults to 60.0.
+
+        Returns:
+            CatalogWatcher: the watcher, started by `start` or by entering
+            it as a context manager
+        """
+        return CatalogWatcher(self, callback, interval)
+
+    def _metadata_value(self, cat_name: str, column: str):
+        """Returns a metadata value of a catalog, whatever the case of the
+        column."""
+        metadata = self.metadata.loc[cat_name]
+        if column in metadata.index:
+            return metadata[column]
+        columns = {str(name).lower(): name for name in metadata.index}
+        return metadata[columns[column.lower()]]
+
+    def _parent_catalog(self, idx: int) -> Optional[str]:
+        """Returns the parent catalog of a catalog of the set.
+
+        The parent catalog is given by the metadata of the catalog, otherwise
+        it is the previous catalog of the set.
+
+        Args:
+            idx (int): index of the catalog in the set
+
+        Returns:
+            Optional[str]: name of the parent catalog, None for the first one
+        """
+        name = self.metadata.index[idx]
+        parent = self._metadata_value(name, "parent")
+        if isinstance(parent, str) and parent != "":
+            return parent
+        return self.metadata.index[idx - 1] if idx > 0 else None
+
+    def _lineage_links(self, idx: int) -> Tuple[CatalogLinks, pd.DataFrame]:
+        """Returns the links of the sources of a catalog to their parent and
+        the detections of the catalog as they appear in a lineage.
+
+        The sources are linked by the PARENT_COLUMN column of the detections
+        to the sources of the parent catalog.
+
+        Args:
+            idx (int): index of the catalog in the set
+
+        Returns:
+            Tuple[CatalogLinks, pd.DataFrame]: the links and the detections
+        """
+        name = self.metadata.index[idx]
+        detections = self.get_catalog(idx)._get_detections_dataset()
+        links = CatalogLinks.from_detections(
+            name, self._parent_catalog(idx), detections, self.PARENT_COLUMN
+        )
+        rows = detections.copy()
+        wk = self._metadata_value(name, "Observation Week")
+        rows.insert(0, "Observation Week", wk, True)
+        rows.insert(1, "Catalog", name, True)
+        return links, rows
+
+    def _get_lineage_graph(self) -> Tuple[LineageGraph, pd.DataFrame]:
+        """Returns the parent of each source of the set and the detections
+        of all the catalogs, one row per node of the graph.
+
+        The graph is built on the first call. The catalogs added to the set
+        since then are linked to the graph without reading the others.
+
+        Returns:
+            Tuple[LineageGraph, pd.DataFrame]: the graph and the detections
+        """
+        with self.__lineage_lock:
+            indexes = [
+                idx
+                for idx, name in enumerate(self.metadata.index)
+                if name not in self.__lineage
+            ]
+            if len(indexes) > 0:
+                names = list(self.metadata.index[indexes])
+                logger.log(LogLevel.DEBUG, f"Linking the lineage of {names}")
+                links, rows = zip(*map(self._lineage_links, indexes))
+                self.__lineage.extend(list(links))
+                # None (no catalog linked yet) is dropped by concat
+                self.__lineage_rows = pd.concat(
+                    [self.__lineage_rows, *rows], axis=0
+                )
+            return self.__lineage, self.__lineage_rows
+
+    def _graph_lineage(self, cat_name: str, src_name: str) -> pd.DataFrame:
+        """Returns the lineage of a source as described in get_lineage, from
+        the lineage graph of the set.
+
+        Args:
+            cat_name (str): catalog from which the lineage starts
+            src_name (str): particular source
+
+        Returns:
+            pd.DataFrame: the epochs of the source
+        """
+        graph, rows = self._get_lineage_graph()
+        histDF: pd.DataFrame = rows.take(graph.path(cat_name, src_name))
+        if self.LINEAGE_UNIQUE is not None:
+            histDF.drop_duplicates(
+                subset=self.LINEAGE_UNIQUE, keep="last", inplace=True
+            )
+        histDF.sort_values(
+            by="Observation Week", ascending=True, inplace=True, kind="stable"
+        )
+        return histDF
+
+    def _graph_lineages(
+        self, cat_name: str, sources: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """Returns the lineages of several sources as described in
+        get_lineages, from the lineage graph of the set.
+
+        Args:
+            cat_name (str): catalog from which the lineages start
+            sources (List[str], optional): sources of the catalog. All the
+            sources of the catalog are used when None. Defaults to None.
+
+        Returns:
+            pd.DataFrame: the epochs indexed by (source, observation week)
+        """
+        graph, rows = self._get_lineage_graph()
+        if sources is None:
+            sources = list(graph.sources(cat_name))
+        return gather_lineages(
+            graph, rows, cat_name, sources, unique=self.LINEAGE_UNIQUE
+        )
+
     @abstractmethod
     def get_lineage(self, cat_name: str, src_name: str) -> pd.DataFrame:
         """Returns the history of a source (src_name: str) including metadata
@@ -403,23 +1588,111 @@ class GWCatalogs(ABC):
         """
         raise NotImplementedError("Not implemented")
 
-    @abstractmethod
-    def get_lineage_data(self, lineage: pd.DataFrame) -> pd.DataFrame:
+    def get_lineages(
+        self, cat_name: str, sources: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """Returns the lineages of several sources of a catalog in one
+        DataFrame, reading the detections of each catalog of the set once.
+
+        The lineage of each source is the one given by get_lineage(). By
+        default, get_lineage() is called for each source.
+
+        Args:
+            cat_name (str): catalog from which the lineages start
+            sources (List[str], optional): sources of the catalog. All the
+            detections of the catalog are used when None. Defaults to None.
+
+        Returns:
+            pd.DataFrame: epochs indexed by (source, observation week), with
+            the name of the source in each epoch in the "Epoch Source"
+            column and the catalog of each epoch in the "Catalog" column
+        """
+        if sources is None:
+            sources = self.get_catalog_by(cat_name).get_detections()
+        lineages = list()
+        for source in sources:
+            lineage = self.get_lineage(cat_name, source)
+            lineage.insert(2, "Epoch Source", lineage.index, True)
+            lineage.index = pd.MultiIndex.from_arrays(
+                [[source] * len(lineage), lineage["Observation Week"]],
+                names=["Source", "Observation Week"],
+            )
+            lineages.append(lineage.drop(columns="Observation Week"))
+        return pd.concat(lineages, axis=0)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_lineage_data(
+        self,
+        lineage: pd.DataFrame,
+        max_samples: Optional[int] = None,
+        stride: Optional[int] = None,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        random_state: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
         """Returns the posterior samples of a particular source at all
         different epochs of obervation in the DataFrame returned by
         get_lineage(). The samples are concatenated into a single DataFrame.
 
+        The samples of each epoch are selected as in
+        GWCatalog.get_source_samples, and only the `columns` attributes are
+        read. The epochs are read by the `workers` threads.
+
         Args:
             lineage (pd.DataFrame): time-dependent catalog for the evolution
             of a particular source in a series of catalogs returned by
             get_lineage()
-
-        Raises:
-            NotImplementedError: When the method is not implemented
+            max_samples (int, optional): maximum number of samples per
+            epoch. Defaults to None.
+            stride (int, optional): keeps one sample every `stride`
+            samples. Defaults to None.
+            start (int, optional): first sample of the window. Defaults to
+            None.
+            stop (int, optional): end of the window (excluded). Defaults to
+            None.
+            random_state (int, optional): seed drawing the `max_samples`
+            samples at random instead of evenly spaced. Defaults to None.
+            columns (List[str], optional): attributes of the samples. The
+            LINEAGE_COLUMNS attributes are used when None, all the
+            attributes when they are None too. Defaults to None.
 
         Returns:
-            pd.DataFrame: posterior samples of a particular source at all
+            pd.DataFrame: "Source" and "Observation Week" of the samples of
+            a particular source, followed by the attributes, at all
             different epochs of obervation in the DataFrame returned by
             get_lineage().
         """
-        raise NotImplementedError("Not implemented")
+        if columns is None:
+            columns = self.LINEAGE_COLUMNS
+        catalogs = [self.get_catalog_by(name) for name in lineage["Catalog"]]
+
+        def read(catalog: GWCatalog, source_epoch: str) -> pd.DataFrame:
+            return catalog.get_source_samples(
+                source_epoch,
+                columns,
+                max_samples=max_samples,
+                stride=stride,
+                start=start,
+                stop=stop,
+                random_state=random_state,
+            )
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            samples = list(executor.map(read, catalogs, lineage.index))
+        if columns is None:
+            columns = list(samples[0].columns) if len(samples) > 0 else []
+        merge_source_epochs = stack_epochs(lineage, samples, list(columns))
+        if self.dtype_policy is not None:
+            merge_source_epochs = self.dtype_policy.apply(merge_source_epochs)
+        return merge_source_epochs
+
+    def __enter__(self) -> "GWCatalogs":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Closes the HDF5 stores of the catalogs of the set kept open by
+        the shared pool. The stores of the other sets stay open."""
+        for idx in range(self.count):
+            self.get_catalog(idx).__exit__(exc_type, exc_value, traceback)
@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""This module converts the catalog files to other layouts. It is
+responsible for :
+- rewriting the posterior samples in a layout where columns are read
+  independently
+- converting the HDF5 catalogs to Parquet or Feather files
+- packing the posterior samples in files mapped in memory
+- consolidating a set of catalogs in one indexed HDF5 bundle
+"""
+
+import fnmatch
+import json
+import os
+import warnings
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import pandas as pd
+import tables
+from loguru import logger
+
+from .catalog import GWCatalogs
+from .memmap import packed_location
+from .memmap import write_packed_samples
+from .monitoring import LogLevel
+from .monitoring import UtilsMonitoring
+from .plugins.arrow import ArrowChainWriter
+from .plugins.arrow import PARQUET
+from .plugins.arrow import write_arrow_table
+from .plugins.bundle import BUNDLE_VERSION
+from .plugins.bundle import catalog_key
+from .storage import COLUMNAR_ATTRIBUTE
+from .storage import file_fingerprint
+from .storage import is_columnar
+from .storage import list_datasets
+from .storage import read_dataset
+from .storage import STORE_POOL
+
+
+@UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=60000)
+def convert_chains_to_columnar(
+    path: str,
+    output: Optional[str] = None,
+    pattern: str = "*_chain",
+    complevel: int = 0,
+    complib: str = "blosc",
+) -> str:
+    """Rewrites the posterior samples of an HDF5 file in the columnar layout.
+
+    Each dataset matching the pattern is written as one table per column
+    (see lisacattools.storage.is_columnar), so that reading a subset of the
+    columns only reads these columns from the disk. The other datasets are
+    copied as they are.
+
+    Args:
+        path (str): HDF5 file to convert (catalog or chain file)
+        output (str, optional): converted file. The file is converted in
+        place when None. Defaults to None.
+        pattern (str, optional): pattern of the datasets to convert.
+        Defaults to "*_chain".
+        complevel (int, optional): compression level of the tables (0-9).
+        Defaults to 0.
+        complib (str, optional): compression library. Defaults to "blosc".
+
+    Returns:
+        str: location of the converted file
+    """
+    destination = path + ".tmp" if output is None else output
+    with (
+        pd.HDFStore(path, "r") as src,
+        pd.HDFStore(
+            destination, "w", complevel=complevel, complib=complib
+        ) as dst,
+        warnings.catch_warnings(),
+    ):
+        warnings.simplefilter("ignore", tables.NaturalNameWarning)
+        for key in list_datasets(src):
+            data = read_dataset(src, key)
+            if fnmatch.fnmatch(key.lstrip("/"), pattern):
+                _write_columnar(dst, key, data)
+                logger.log(LogLevel.DEBUG, f"Converted {key} of {path}")
+            else:
+                is_table = not is_columnar(src, key) and (
+                    src.get_storer(key).is_table
+                )
+                dst.put(key, data, format="table" if is_table else "fixed")
+    STORE_POOL.close(path)
+    if output is None:
+        os.replace(destination, path)
+        destination = path
+    return destination
+
+
+def _write_columnar(store: pd.HDFStore, key: str, data: pd.DataFrame):
+    """Writes a dataset in the columnar layout.
+
+    Args:
+        store (pd.HDFStore): store open in write mode
+        key (str): name of the dataset
+        data (pd.DataFrame): dataset to write
+    """
+    for idx, column in enumerate(data.columns):
+        store.append(f"{key}/c{idx}", data[[column]], index=False)
+    store.get_node(key)._v_attrs[COLUMNAR_ATTRIBUTE] = list(data.columns)
+
+
+@UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=60000)
+def convert_chains_to_packed(path: str, pattern: str = "*_chain") -> str:
+    """Packs the posterior samples of an HDF5 file in a file mapped in
+    memory.
+
+    The packed file is written next to the HDF5 file (see
+    lisacattools.memmap) and is used by the catalogs created with
+    `memmap=True` until the HDF5 file changes.
+
+    Args:
+        path (str): HDF5 file to convert (catalog or chain file)
+        pattern (str, optional): pattern of the datasets to convert.
+        Defaults to "*_chain".
+
+    Returns:
+        str: location of the packed file
+    """
+    fingerprint = file_fingerprint(path)
+    location = packed_location(path)
+    with pd.HDFStore(path, "r") as src:
+        sources = write_packed_samples(
+            location + ".tmp", _iter_chains(src, pattern), fingerprint
+        )
+    os.replace(location + ".tmp", location)
+    logger.log(LogLevel.DEBUG, f"Packed {len(sources)} sources of {path}")
+    return location
+
+
+def _iter_chains(
+    store: pd.HDFStore, pattern: str
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """Iterates over the posterior samples of an HDF5 file.
+
+    Args:
+        store (pd.HDFStore): store open in read mode
+        pattern (str): pattern of the datasets to read
+
+    Yields:
+        Tuple[str, pd.DataFrame]: the name of the source and its samples
+    """
+    for key in list_datasets(store):
+        name = key.lstrip("/")
+        if fnmatch.fnmatch(name, pattern):
+            yield name.removesuffix("_chain"), read_dataset(store, key)
+
+
+@UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=60000)
+def convert_to_arrow(
+    catalogs: GWCatalogs,
+    output: str,
+    format: str = PARQUET,
+    compression: Optional[str] = None,
+) -> List[str]:
+    """Converts a set of catalogs to Parquet or Feather files.
+
+    The converted catalogs are loaded with the ARROW plugin (see
+    lisacattools.plugins.arrow), sorted and linked in lineages as the
+    original catalogs::
+
+        catalogs = GWCatalogs.create(GWCatalogType.MBH, "tutorial/data/mbh")
+        convert_to_arrow(catalogs, "/tmp/mbh")
+        catalogs = GWCatalogs.create(GWCatalogType.ARROW, "/tmp/mbh")
+
+    Args:
+        catalogs (GWCatalogs): catalogs to convert (UCB or MBH)
+        output (str): output directory, created when needed
+        format (str, optional): "parquet" or "feather". Defaults to
+        "parquet".
+        compression (str, optional): compression codec of the files (e.g.
+        "zstd"). The Feather files are only memory-mapped without copy
+        when they are not compressed. Defaults to None.
+
+    Returns:
+        List[str]: location of the converted catalogs
+    """
+    os.makedirs(output, exist_ok=True)
+    lineage = {
+        "columns": catalogs.LINEAGE_COLUMNS,
+        "unique": catalogs.LINEAGE_UNIQUE,
+        "parent": catalogs.PARENT_COLUMN,
+    }
+    locations: List[str] = list()
+    for name in catalogs.get_catalogs_name():
+        catalog = catalogs.get_catalog_by(name)
+        chains = _write_arrow_chains(catalog, output, format, compression)
+        detections = catalog.get_detections(catalog.get_attr_detections())
+        detections["chain file"] = detections.index.map(
+            {
+                source: chain_file
+                for chain_file, sources in chains.items()
+                for source in sources
+            }
+        )
+        metadata = catalogs.metadata.loc[[name]].drop(columns="location")
+        location = os.path.join(output, f"{name}.{format}")
+        write_arrow_table(
+            location,
+            detections,
+            {
+                "metadata": json.loads(metadata.to_json(orient="table")),
+                "sort_by": catalogs.SORT_BY,
+                "lineage": lineage,
+                "chains": chains,
+            },
+            compression,
+        )
+        logger.log(LogLevel.DEBUG, f"Converted {name} to {location}")
+        locations.append(location)
+    return locations
+
+
+def _write_arrow_chains(
+    catalog, output: str, format: str, compression: Optional[str]
+) -> Dict[str, List[str]]:
+    """Writes the posterior samples of the sources of a catalog.
+
+    The sources are written in the same chain file as long as their samples
+    have the same columns, a new chain file is started otherwise.
+
+    Args:
+        catalog (GWCatalog): catalog to convert
+        output (str): output directory
+        format (str): "parquet" or "feather"
+        compression (str, optional): compression codec of the files
+
+    Returns:
+        Dict[str, List[str]]: sources of each chain file
+    """
+    writers: List[ArrowChainWriter] = list()
+    try:
+        for source in catalog.get_detections():
+            try:
+                samples = catalog.get_source_samples(source)
+            except KeyError:
+                continue
+            writer = next((w for w in writers if w.accepts(samples)), None)
+            if writer is None:
+                writer = ArrowChainWriter(
+                    os.path.join(
+                        output,
+                        f"{catalog.name}_chains_{len(writers)}.{format}",
+                    ),
+                    compression,
+                )
+                writers.append(writer)
+            writer.write(source, samples)
+    finally:
+        for writer in writers:
+            writer.close()
+    return {
+        os.path.basename(writer.path): writer.sources for writer in writers
+    }
+
+
+@UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=60000)
+def convert_to_bundle(
+    catalogs: GWCatalogs,
+    output: str,
+    complevel: int = 0,
+    complib: str = "blosc",
+) -> str:
+    """Consolidates a set of catalogs in one indexed HDF5 file.
+
+    The bundle holds the metadata, the detections and the posterior samples
+    of all the catalogs, with the range of rows of each source (see
+    lisacattools.plugins.bundle). It is loaded with the UCB_BUNDLE plugin::
+
+        catalogs = GWCatalogs.create(GWCatalogType.UCB, "tutorial/data/ucb")
+        convert_to_bundle(catalogs, "/tmp/ucb.h5")
+        catalogs = GWCatalogs.create(GWCatalogType.UCB_BUNDLE, "/tmp/ucb.h5")
+
+    Args:
+        catalogs (GWCatalogs): catalogs to consolidate
+        output (str): location of the bundle
+        complevel (int, optional): compression level of the datasets (0-9).
+        Defaults to 0.
+        complib (str, optional): compression library. Defaults to "blosc".
+
+    Returns:
+        str: location of the bundle
+    """
+    sort_by = getattr(type(catalogs), "SORT_BY", None)
+    with (
+        pd.HDFStore(
+            output + ".tmp", "w", complevel=complevel, complib=complib
+        ) as store,
+        warnings.catch_warnings(),
+    ):
+        warnings.simplefilter("ignore", tables.NaturalNameWarning)
+        store.put(
+            "bundle",
+            pd.DataFrame({"version": [BUNDLE_VERSION], "sort_by": [sort_by]}),
+        )
+        store.put("metadata", catalogs.metadata.drop(columns="location"))
+        for name in catalogs.get_catalogs_name():
+            catalog = catalogs.get_catalog_by(name)
+            detections = catalog.get_detections(catalog.get_attr_detections())
+            if "chain file" in detections.columns:
+                detections["chain file"] = os.path.basename(output)
+            store.put(catalog_key(name, "detections"), detections)
+            store.put(
+                catalog_key(name, "index"),
+                _write_bundle_samples(store, catalog),
+            )
+            logger.log(LogLevel.DEBUG, f"Consolidated {name} in {output}")
+    os.replace(output + ".tmp", output)
+    STORE_POOL.close(output)
+    return output
+
+
+def _write_bundle_samples(store: pd.HDFStore, catalog) -> pd.DataFrame:
+    """Appends the posterior samples of the sources of a catalog to a
+    bundle.
+
+    The samples are appended to the same dataset as long as they have the
+    same columns and dtypes, a new dataset is started otherwise. The
+    sources without samples, or whose chain file is missing, are skipped.
+
+    Args:
+        store (pd.HDFStore): bundle open in write mode
+        catalog (GWCatalog): catalog to consolidate
+
+    Returns:
+        pd.DataFrame: dataset, first row and end row (excluded) of each
+        source
+    """
+    datasets: Dict[Tuple[Tuple[str, str], ...], str] = dict()
+    rows: Dict[str, int] = dict()
+    index: List[Tuple[str, str, int, int]] = list()
+    for source in catalog.get_detections():
+        try:
+            samples = catalog.get_source_samples(source)
+        except (KeyError, OSError):
+            continue
+        schema = tuple(
+            (str(name), str(dtype)) for name, dtype in samples.dtypes.items()
+        )
+        dataset = datasets.setdefault(schema, f"samples_{len(datasets)}")
+        start = rows.get(dataset, 0)
+        store.append(catalog_key(catalog.name, dataset), samples, index=False)
+        rows[dataset] = start + len(samples)
+        index.append((source, dataset, start, rows[dataset]))
+    return pd.DataFrame(
+        index, columns=["source", "dataset", "start", "stop"]
+    ).set_index("source")
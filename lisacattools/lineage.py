@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""This module handles the lineage of the sources across the catalogs of a
+set. It is responsible for :
+- linking each source of each catalog to its parent in the parent catalog,
+  in compact arrays built once for the set
+- walking the links of a source back to its first ancestor
+- adding the new catalogs of the set without relinking the others
+- gathering the lineages of many sources at once
+- stacking the posterior samples of the epochs of a lineage
+
+Each source of each catalog is a node numbered catalog after catalog: the
+node of the source at row `row` of the detections of the catalog `idx` is
+`offsets[idx] + row`. The graph is the array of the parent node of each
+node (-1 when the source has no parent in the set)::
+
+    graph = LineageGraph([CatalogLinks(name, parent, sources, parents), ...])
+    for cat_name, row in graph.walk("cat15728640_v2", "LDC0081497609"):
+        ...
+"""
+
+from dataclasses import dataclass
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class CatalogLinks:
+    """Sources of a catalog and the name of their parent."""
+
+    #: name of the catalog
+    name: str
+    #: name of the parent catalog, None for the first catalog
+    parent: Optional[str]
+    #: sources, in the order of the detections
+    sources: pd.Index
+    #: name of the parent of each source in the parent catalog, empty when
+    #: the source has no parent
+    parents: np.ndarray
+
+    @staticmethod
+    def from_detections(
+        name: str,
+        parent: Optional[str],
+        detections: pd.DataFrame,
+        column: str,
+    ) -> "CatalogLinks":
+        """Reads the links of a catalog from its detections.
+
+        Args:
+            name (str): name of the catalog
+            parent (str, optional): name of the parent catalog
+            detections (pd.DataFrame): detections of the catalog
+            column (str): column of the name of the parent of each source
+
+        Returns:
+            CatalogLinks: the links of the catalog
+        """
+        parents = (
+            detections[column].fillna("").astype(str).to_numpy()
+            if column in detections.columns
+            else np.full(len(detections), "", dtype=object)
+        )
+        return CatalogLinks(name, parent, detections.index, parents)
+
+
+class LineageGraph:
+    """Parent of each source of each catalog of a set, in compact arrays.
+
+    The graph grows with the set: `extend` numbers the sources of the new
+    catalogs after the existing nodes and only resolves the links of the new
+    catalogs (and of the catalogs whose parent catalog was missing).
+    """
+
+    def __init__(self, links: Optional[List[CatalogLinks]] = None):
+        """Init the graph by resolving the parent of every source.
+
+        Args:
+            links (List[CatalogLinks], optional): links of each catalog of
+            the set. Defaults to None.
+        """
+        #: name of each catalog id
+        self.catalogs: List[str] = list()
+        self.__ids: Dict[str, int] = dict()
+        self.__links: List[CatalogLinks] = list()
+        #: first node of each catalog id, and the number of nodes
+        self.offsets = np.zeros(1, dtype=np.int64)
+        #: catalog id of each node
+        self.node_catalogs = np.zeros(0, dtype=np.int32)
+        #: parent node of each node, -1 when the source has no parent
+        self.parents = np.zeros(0, dtype=np.int64)
+        self.extend(links or list())
+
+    def extend(self, links: List[CatalogLinks]):
+        """Adds catalogs to the graph.
+
+        Args:
+            links (List[CatalogLinks]): links of each new catalog
+
+        Raises:
+            ValueError: a catalog is already in the graph
+        """
+        first = len(self.catalogs)
+        for link in links:
+            if link.name in self.__ids:
+                raise ValueError(f"{link.name} is already in the graph")
+            self.__ids[link.name] = len(self.catalogs)
+            self.catalogs.append(link.name)
+            self.__links.append(link)
+        sizes = [len(link.sources) for link in links]
+        self.offsets = np.concatenate(
+            [self.offsets, self.offsets[-1] + np.cumsum(sizes, dtype=np.int64)]
+        )
+        self.node_catalogs = np.concatenate(
+            [
+                self.node_catalogs,
+                np.repeat(
+                    np.arange(first, len(self.catalogs), dtype=np.int32), sizes
+                ),
+            ]
+        )
+        self.parents = np.concatenate(
+            [self.parents, np.full(sum(sizes), -1, dtype=np.int64)]
+        )
+        for idx, link in enumerate(self.__links):
+            if idx >= first or self.__ids.get(link.parent, -1) >= first:
+                self._link(idx, link)
+
+    def _link(self, idx: int, link: CatalogLinks):
+        """Resolves the parent node of the sources of a catalog.
+
+        Args:
+            idx (int): catalog id
+            link (CatalogLinks): links of the catalog
+        """
+        parent_id = self.__ids.get(link.parent)
+        if parent_id is None:
+            return
+        sources = self.__links[parent_id].sources
+        rows = sources.get_indexer(pd.Index(link.parents))
+        nodes = np.where(rows >= 0, rows + self.offsets[parent_id], -1)
+        start, stop = self.offsets[idx], self.offsets[idx + 1]
+        self.parents[start:stop] = nodes
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def __contains__(self, cat_name: str) -> bool:
+        return cat_name in self.__ids
+
+    def sources(self, cat_name: str) -> pd.Index:
+        """Returns the sources of a catalog, in the order of the detections.
+
+        Args:
+            cat_name (str): name of the catalog
+
+        Raises:
+            KeyError: the catalog is not in the graph
+
+        Returns:
+            pd.Index: the sources
+        """
+        return self.__links[self.__ids[cat_name]].sources
+
+    def node(self, cat_name: str, src_name: str) -> int:
+        """Returns the node of a source of a catalog.
+
+        Args:
+            cat_name (str): name of the catalog
+            src_name (str): name of the source
+
+        Raises:
+            KeyError: the catalog or the source is not in the graph
+
+        Returns:
+            int: the node
+        """
+        idx = self.__ids[cat_name]
+        row = self.__links[idx].sources.get_loc(src_name)
+        return int(self.offsets[idx] + row)
+
+    def path(self, cat_name: str, src_name: str) -> np.ndarray:
+        """Returns the node of a source and of each of its ancestors, the
+        source first.
+
+        Args:
+            cat_name (str): name of the catalog
+            src_name (str): name of the source
+
+        Raises:
+            KeyError: the catalog or the source is not in the graph
+
+        Returns:
+            np.ndarray: the nodes
+        """
+        nodes = list()
+        node = self.node(cat_name, src_name)
+        # a source has at most one epoch per catalog, which bounds the walk
+        # when the parents make a cycle
+        while node >= 0 and len(nodes) < len(self.catalogs):
+            nodes.append(node)
+            node = int(self.parents[node])
+        return np.asarray(nodes, dtype=np.int64)
+
+    def paths(
+        self, cat_name: str, sources: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the nodes of the sources of a catalog and of all their
+        ancestors, walked one generation at a time for all the sources.
+
+        Args:
+            cat_name (str): name of the catalog
+            sources (List[str]): names of the sources
+
+        Raises:
+            KeyError: the catalog or a source is not in the graph
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: the nodes, generation after
+            generation, and the position in `sources` of the source of each
+            node
+        """
+        idx = self.__ids[cat_name]
+        rows = self.__links[idx].sources.get_indexer(pd.Index(sources))
+        if (rows < 0).any():
+            missing = list(pd.Index(sources)[rows < 0])
+            raise KeyError(f"{missing} not in {cat_name}")
+        frontier = rows + self.offsets[idx]
+        owners = np.arange(len(sources))
+        nodes, sources_of = list(), list()
+        for _ in range(len(self.catalogs)):
+            if len(frontier) == 0:
+                break
+            nodes.append(frontier)
+            sources_of.append(owners)
+            frontier = self.parents[frontier]
+            owners = owners[frontier >= 0]
+            frontier = frontier[frontier >= 0]
+        if len(nodes) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(nodes), np.concatenate(sources_of)
+
+    def walk(self, cat_name: str, src_name: str) -> List[Tuple[str, int]]:
+        """Returns the catalog and the row in its detections of a source and
+        of each of its ancestors, the source first.
+
+        Args:
+            cat_name (str): name of the catalog
+            src_name (str): name of the source
+
+        Raises:
+            KeyError: the catalog or the source is not in the graph
+
+        Returns:
+            List[Tuple[str, int]]: catalog name and row of each epoch
+        """
+        nodes = self.path(cat_name, src_name)
+        ids = self.node_catalogs[nodes]
+        rows = nodes - self.offsets[ids]
+        return [(self.catalogs[idx], int(row)) for idx, row in zip(ids, rows)]
+
+
+def gather_lineages(
+    graph: LineageGraph,
+    rows: pd.DataFrame,
+    cat_name: str,
+    sources: List[str],
+    unique: Optional[str] = None,
+) -> pd.DataFrame:
+    """Returns the lineages of the sources of a catalog in one frame.
+
+    Args:
+        graph (LineageGraph): lineage graph of the set
+        rows (pd.DataFrame): one row per node of the graph, with the
+        "Observation Week" and "Catalog" columns
+        cat_name (str): catalog from which the lineages start
+        sources (List[str]): sources of the catalog
+        unique (str, optional): column identifying the same epoch of a
+        source in several catalogs, the oldest one being kept.
+        Defaults to None.
+
+    Raises:
+        KeyError: the catalog or a source is not in the graph
+
+    Returns:
+        pd.DataFrame: the epochs indexed by (source, observation week), with
+        the name of the source in each epoch in the "Epoch Source" column
+    """
+    nodes, owners = graph.paths(cat_name, sources)
+    frame = rows.take(nodes)
+    if unique is not None:
+        kept = (
+            ~pd.DataFrame({"owner": owners, unique: frame[unique].to_numpy()})
+            .duplicated(keep="last")
+            .to_numpy()
+        )
+        frame, owners = frame[kept], owners[kept]
+    weeks = frame["Observation Week"].to_numpy()
+    order = np.lexsort((weeks, owners))
+    frame = frame.iloc[order]
+    frame.insert(2, "Epoch Source", frame.index, True)
+    frame.index = pd.MultiIndex.from_arrays(
+        [pd.Index(sources)[owners[order]], weeks[order]],
+        names=["Source", "Observation Week"],
+    )
+    return frame.drop(columns="Observation Week")
+
+
+def _stack_column(
+    parts: List[pd.Series], starts: np.ndarray, stops: np.ndarray
+) -> Union[np.ndarray, pd.api.extensions.ExtensionArray]:
+    """Copies a column of the samples of each epoch in one array allocated
+    once. The extension dtypes (categories) are concatenated by pandas."""
+    if not all(isinstance(part.dtype, np.dtype) for part in parts):
+        return pd.concat(parts, ignore_index=True).array
+    dtype = np.result_type(*[part.dtype for part in parts])
+    column = np.empty(stops[-1] if len(stops) > 0 else 0, dtype=dtype)
+    for part, start, stop in zip(parts, starts, stops):
+        column[start:stop] = part.to_numpy()
+    return column
+
+
+def stack_epochs(
+    lineage: pd.DataFrame, samples: List[pd.DataFrame], columns: List[str]
+) -> pd.DataFrame:
+    """Stacks the posterior samples of the epochs of a lineage.
+
+    Args:
+        lineage (pd.DataFrame): lineage of a source, as get_lineage()
+        samples (List[pd.DataFrame]): samples of each epoch of the lineage
+        columns (List[str]): attributes of the samples to keep
+
+    Returns:
+        pd.DataFrame: the "Source" and "Observation Week" of each sample,
+        followed by the attributes
+    """
+    counts = np.array([len(part) for part in samples], dtype=np.int64)
+    stops = np.cumsum(counts)
+    starts = stops - counts
+    data = {
+        "Source": np.repeat(lineage.index.to_numpy(), counts),
+        "Observation Week": np.repeat(
+            lineage["Observation Week"].to_numpy(), counts
+        ),
+    }
+    for column in columns:
+        data[column] = _stack_column(
+            [part[column] for part in samples], starts, stops
+        )
+    index = (
+        np.concatenate([part.index.to_numpy() for part in samples])
+        if len(samples) > 0
+        else None
+    )
+    return pd.DataFrame(data, index=index, copy=False)
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""This module handles the manifest of the catalog files of a directory. It
+is responsible for :
+- keeping the metadata, the datasets and the detections schema of each
+  catalog file in a sidecar file
+- refreshing the entries of the files that have changed on disk
+"""
+
+import io
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import pandas as pd
+from loguru import logger
+
+from .monitoring import LogLevel
+from .storage import file_fingerprint
+from .storage import STORE_POOL
+
+
+@dataclass
+class ManifestEntry:
+    """Content of a catalog file kept in the manifest."""
+
+    #: modification time in ns and size in bytes of the file
+    fingerprint: Tuple[int, int]
+    #: metadata dataset of the catalog
+    metadata: pd.DataFrame
+    #: name of the datasets of the file
+    datasets: List[str]
+    #: columns of the detections dataset and their type
+    detections: Dict[str, str]
+
+    @staticmethod
+    def read(path: str) -> "ManifestEntry":
+        """Reads the entry of a catalog file from the file.
+
+        Only the first row of the detections dataset is read to get its
+        schema.
+
+        Args:
+            path (str): location of the catalog file
+
+        Returns:
+            ManifestEntry: the entry of the file
+        """
+        fingerprint = file_fingerprint(path)
+        datasets = STORE_POOL.keys(path)
+        schema = (
+            STORE_POOL.read(path, "detections", stop=0).dtypes
+            if "/detections" in datasets
+            else pd.Series(dtype=object)
+        )
+        return ManifestEntry(
+            fingerprint,
+            STORE_POOL.read(path, "metadata"),
+            datasets,
+            {str(name): str(dtype) for name, dtype in schema.items()},
+        )
+
+    def to_dict(self) -> dict:
+        """Converts the entry to a JSON serializable dictionary.
+
+        Returns:
+            dict: the entry
+        """
+        return {
+            "mtime_ns": self.fingerprint[0],
+            "size": self.fingerprint[1],
+            "metadata": json.loads(self.metadata.to_json(orient="table")),
+            "datasets": self.datasets,
+            "detections": self.detections,
+        }
+
+    @staticmethod
+    def from_dict(value: dict) -> "ManifestEntry":
+        """Creates an entry from a dictionary written by to_dict.
+
+        Args:
+            value (dict): the entry
+
+        Returns:
+            ManifestEntry: the entry
+        """
+        metadata = pd.read_json(
+            io.StringIO(json.dumps(value["metadata"])), orient="table"
+        )
+        return ManifestEntry(
+            (value["mtime_ns"], value["size"]),
+            metadata,
+            list(value["datasets"]),
+            dict(value["detections"]),
+        )
+
+
+class MetadataManifest:
+    """Manifest of the catalog files of a directory.
+
+    The manifest is a JSON sidecar file of the directory holding, for each
+    catalog file, its metadata, the name of its datasets and the schema of
+    its detections. The entries are keyed by the name of the file and its
+    fingerprint (modification time and size), so that an unchanged file is
+    never opened to get them. The entry of a file that has changed is read
+    again from the file::
+
+        manifest = MetadataManifest("tutorial/data/mbh")
+        metadata = manifest.get("tutorial/data/mbh/MBH_wk001C.h5").metadata
+        manifest.save()
+    """
+
+    FILENAME = ".lisacattools_manifest.json"
+    VERSION = 1
+
+    def __init__(self, directory: str):
+        """Init the manifest of a directory from its sidecar file.
+
+        The manifest is empty when the sidecar file does not exist or cannot
+        be read.
+
+        Args:
+            directory (str): directory of the catalog files
+        """
+        self.__directory = directory
+        self.__lock = threading.Lock()
+        self.__entries: Dict[str, ManifestEntry] = dict()
+        self.__stats = {"hits": 0, "misses": 0}
+        self.__dirty = False
+        self._load()
+
+    @property
+    def directory(self) -> str:
+        """Directory of the catalog files.
+
+        :getter: Returns the directory of the catalog files
+        :type: str
+        """
+        return self.__directory
+
+    @property
+    def location(self) -> str:
+        """Location of the sidecar file.
+
+        :getter: Returns the location of the sidecar file
+        :type: str
+        """
+        return os.path.join(self.__directory, MetadataManifest.FILENAME)
+
+    @property
+    def stats(self) -> dict:
+        """Statistics of the manifest.
+
+        :getter: Returns the number of entries found up to date (hits) and
+            read from the files (misses)
+        :type: dict
+        """
+        with self.__lock:
+            return dict(self.__stats)
+
+    def _load(self):
+        """Loads the entries of the sidecar file."""
+        try:
+            with open(self.location, encoding="utf-8") as manifest:
+                content = json.load(manifest)
+            version = content.get("version")
+            if version != MetadataManifest.VERSION:
+                raise ValueError(f"unsupported version {version}")
+            self.__entries = {
+                name: ManifestEntry.from_dict(value)
+                for name, value in content["files"].items()
+            }
+        except FileNotFoundError:
+            pass
+        except (
+            OSError,
+            ValueError,
+            KeyError,
+            TypeError,
+            AttributeError,
+        ) as err:
+            logger.log(
+                LogLevel.WARNING,
+                f"Ignoring the manifest {self.location}: {err}",
+            )
+
+    def get(self, path: str) -> ManifestEntry:
+        """Returns the entry of a catalog file of the directory.
+
+        The entry is read from the file when it is missing or when the file
+        has changed since the entry was written.
+
+        Args:
+            path (str): location of the catalog file
+
+        Returns:
+            ManifestEntry: the entry of the file
+        """
+        name = os.path.basename(path)
+        fingerprint = file_fingerprint(path)
+        with self.__lock:
+            entry = self.__entries.get(name)
+            if entry is not None and entry.fingerprint == fingerprint:
+                self.__stats["hits"] += 1
+                return entry
+        entry = ManifestEntry.read(path)
+        with self.__lock:
+            self.__entries[name] = entry
+            self.__stats["misses"] += 1
+            self.__dirty = True
+        logger.log(LogLevel.DEBUG, f"Refreshed the manifest entry of {path}")
+        return entry
+
+    def save(self):
+        """Writes the sidecar file when entries have been refreshed.
+
+        The entries of the files that no longer exist are removed. The
+        sidecar file is not written when the directory is read-only.
+        """
+        with self.__lock:
+            for name in list(self.__entries):
+                if not os.path.exists(os.path.join(self.__directory, name)):
+                    del self.__entries[name]
+                    self.__dirty = True
+            if not self.__dirty:
+                return
+            content = {
+                "version": MetadataManifest.VERSION,
+                "files": {
+                    name: entry.to_dict()
+                    for name, entry in sorted(self.__entries.items())
+                },
+            }
+            try:
+                tmp = self.location + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as manifest:
+                    json.dump(content, manifest)
+                os.replace(tmp, self.location)
+                self.__dirty = False
+            except OSError as err:
+                logger.log(
+                    LogLevel.WARNING,
+                    f"Cannot write the manifest {self.location}: {err}",
+                )
+
+    def __contains__(self, path: str) -> bool:
+        with self.__lock:
+            return os.path.basename(path) in self.__entries
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__entries)
+
+    def __repr__(self):
+        return f"MetadataManifest({self.__directory!r})"
+
+
+def load_manifests(files: List[str]) -> Dict[str, MetadataManifest]:
+    """Loads the manifests of the directories of a list of files.
+
+    Args:
+        files (List[str]): catalog files
+
+    Returns:
+        Dict[str, MetadataManifest]: manifest of each directory
+    """
+    return {
+        directory: MetadataManifest(directory)
+        for directory in sorted({os.path.dirname(path) for path in files})
+    }
+
+
+def manifest_entry(
+    manifests: Dict[str, MetadataManifest], path: str
+) -> Optional[ManifestEntry]:
+    """Returns the manifest entry of a catalog file.
+
+    Args:
+        manifests (Dict[str, MetadataManifest]): manifest of each directory
+        path (str): location of the catalog file
+
+    Returns:
+        Optional[ManifestEntry]: the entry, None when the directory of the
+        file has no manifest
+    """
+    manifest = manifests.get(os.path.dirname(path))
+    return None if manifest is None else manifest.get(path)
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""This module handles the posterior samples packed in memory-mapped files.
+It is responsible for :
+- packing the posterior samples of an HDF5 file in a binary file where each
+  column of each source is contiguous
+- reading the samples of a source as data frames backed by the page cache,
+  without deserializing them
+
+A packed file is written next to the HDF5 file it comes from, with the
+PACKED_EXTENSION extension. Its layout is::
+
+    MAGIC | column data ... | footer (JSON) | footer length (<u8) | MAGIC
+
+Each column (and the index) of each source is an aligned block of raw
+values. The footer is the offset table: for each source, the number of
+rows and the dtype and offset of each column. It also holds the
+fingerprint of the HDF5 file, so that a packed file is ignored once the
+HDF5 file has changed.
+"""
+
+import json
+import os
+import threading
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .monitoring import LogLevel
+from .storage import file_fingerprint
+from .storage import SampleSelection
+
+#: Extension of the packed files
+PACKED_EXTENSION = ".npk"
+MAGIC = b"LCTNPK01"
+#: Alignment in bytes of the columns in the packed files
+ALIGNMENT = 64
+
+
+def packed_location(path: str) -> str:
+    """Returns the location of the packed file of an HDF5 file.
+
+    Args:
+        path (str): location of the HDF5 file
+
+    Returns:
+        str: location of the packed file
+    """
+    return os.path.splitext(path)[0] + PACKED_EXTENSION
+
+
+def is_packable(data: pd.DataFrame) -> bool:
+    """Checks if posterior samples can be packed.
+
+    Only numerical and boolean columns and indexes can be packed.
+
+    Args:
+        data (pd.DataFrame): posterior samples
+
+    Returns:
+        bool: True when the samples can be packed
+    """
+    return all(
+        isinstance(dtype, np.dtype) and dtype.kind in "biuf"
+        for dtype in [data.index.dtype, *data.dtypes]
+    )
+
+
+def write_packed_samples(
+    path: str,
+    samples: Iterable[Tuple[str, pd.DataFrame]],
+    source_fingerprint: Tuple[int, int],
+) -> List[str]:
+    """Writes the posterior samples of sources in a packed file.
+
+    The samples are written one source at a time, so that only one source
+    is held in memory. The sources that cannot be packed (see is_packable)
+    are skipped.
+
+    Args:
+        path (str): location of the packed file
+        samples (Iterable[Tuple[str, pd.DataFrame]]): name and posterior
+        samples of each source
+        source_fingerprint (Tuple[int, int]): fingerprint of the file the
+        samples come from
+
+    Returns:
+        List[str]: the packed sources
+    """
+    sources: Dict[str, dict] = dict()
+    with open(path, "wb") as packed:
+        packed.write(MAGIC)
+
+        def _write_column(values: np.ndarray) -> list:
+            packed.write(b"\0" * (-packed.tell() % ALIGNMENT))
+            offset = packed.tell()
+            packed.write(np.ascontiguousarray(values).tobytes())
+            return [values.dtype.str, offset]
+
+        for source_name, data in samples:
+            if not is_packable(data):
+                logger.log(
+                    LogLevel.WARNING,
+                    f"{source_name} has non numerical columns, not packed",
+                )
+                continue
+            sources[source_name] = {
+                "rows": len(data),
+                "index": _write_column(data.index.to_numpy()),
+                "columns": [
+                    [str(name), *_write_column(data[name].to_numpy())]
+                    for name in data.columns
+                ],
+            }
+        footer = json.dumps(
+            {"fingerprint": list(source_fingerprint), "sources": sources}
+        ).encode("utf-8")
+        packed.write(footer)
+        packed.write(np.uint64(len(footer)).astype("<u8").tobytes())
+        packed.write(MAGIC)
+    return list(sources)
+
+
+class PackedSampleStore:
+    """Packed file mapped in memory.
+
+    The file is mapped once and the columns of a source are views of the
+    mapping, so that reading a source does not copy it. The pages are
+    shared by all the processes mapping the same file.
+    """
+
+    def __init__(self, path: str):
+        """Init the store by mapping the file and reading its offset table.
+
+        Args:
+            path (str): location of the packed file
+
+        Raises:
+            ValueError: the file is not a packed file
+        """
+        self.path = path
+        self.fingerprint = file_fingerprint(path)
+        self.__buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        magic_size = len(MAGIC)
+        end = len(self.__buffer) - magic_size - 8
+        if (
+            end < magic_size
+            or bytes(self.__buffer[:magic_size]) != MAGIC
+            or bytes(self.__buffer[-magic_size:]) != MAGIC
+        ):
+            raise ValueError(f"{path} is not a packed file")
+        length = int(self.__buffer[end:-magic_size].view("<u8")[0])
+        start = end - length
+        footer = json.loads(bytes(self.__buffer[start:end]))
+        self.source_fingerprint: Tuple[int, int] = tuple(footer["fingerprint"])
+        self.__sources: Dict[str, dict] = footer["sources"]
+
+    @property
+    def sources(self) -> List[str]:
+        """Packed sources.
+
+        :getter: Returns the name of the packed sources
+        :type: List[str]
+        """
+        return list(self.__sources)
+
+    def __contains__(self, source_name: str) -> bool:
+        return source_name in self.__sources
+
+    def _column(self, rows: int, dtype: str, offset: int) -> np.ndarray:
+        """Returns a read-only view of a column.
+
+        Args:
+            rows (int): number of rows
+            dtype (str): dtype of the column
+            offset (int): offset of the column in the file
+
+        Returns:
+            np.ndarray: the column
+        """
+        stop = offset + rows * np.dtype(dtype).itemsize
+        return self.__buffer[offset:stop].view(dtype)
+
+    def columns(self, source_name: str) -> List[str]:
+        """Returns the columns of the posterior samples of a source.
+
+        Args:
+            source_name (str): name of the source
+
+        Raises:
+            KeyError: the source is not packed
+
+        Returns:
+            List[str]: the columns
+        """
+        return [name for name, _, _ in self.__sources[source_name]["columns"]]
+
+    def read(
+        self,
+        source_name: str,
+        columns: Optional[List[str]] = None,
+        selection: Optional[SampleSelection] = None,
+    ) -> pd.DataFrame:
+        """Returns the posterior samples of a source.
+
+        The columns of the data frame are read-only views of the mapping,
+        also when a window or a thinned window of the rows is selected.
+
+        Args:
+            source_name (str): name of the source
+            columns (List[str], optional): columns to read. All the columns
+            are read when None. Defaults to None.
+            selection (SampleSelection, optional): rows to read. All the
+            rows are read when None. Defaults to None.
+
+        Raises:
+            KeyError: the source or a column is not packed
+
+        Returns:
+            pd.DataFrame: the posterior samples of the source
+        """
+        entry = self.__sources[source_name]
+        rows = entry["rows"]
+        offsets = {
+            name: (dtype, offset) for name, dtype, offset in entry["columns"]
+        }
+        selected = list(offsets) if columns is None else list(columns)
+        missing = set(selected) - set(offsets)
+        if missing:
+            raise KeyError(f"{sorted(missing)} not in {source_name}")
+        picked = slice(None) if selection is None else selection.rows(rows)
+        return pd.DataFrame(
+            {
+                name: self._column(rows, *offsets[name])[picked]
+                for name in selected
+            },
+            index=pd.Index(
+                self._column(rows, *entry["index"])[picked], copy=False
+            ),
+            columns=selected,
+            copy=False,
+        )
+
+
+class PackedStorePool:
+    """Packed files mapped in memory, shared by the catalogs.
+
+    A packed file is mapped on its first read and mapped again when it has
+    changed on disk. It is ignored when the HDF5 file it comes from has
+    changed since it was written.
+    """
+
+    def __init__(self):
+        """Init the pool."""
+        self.__lock = threading.Lock()
+        self.__stores: Dict[str, Optional[PackedSampleStore]] = dict()
+
+    def _get_store(self, path: str) -> Optional[PackedSampleStore]:
+        """Returns the packed file of an HDF5 file, None when there is no
+        up-to-date packed file.
+
+        Args:
+            path (str): location of the HDF5 file
+
+        Returns:
+            Optional[PackedSampleStore]: the packed file
+        """
+        location = packed_location(path)
+        if not os.path.exists(location):
+            return None
+        with self.__lock:
+            store = self.__stores.get(location)
+            if store is None or store.fingerprint != file_fingerprint(
+                location
+            ):
+                store = PackedSampleStore(location)
+                self.__stores[location] = store
+        if store.source_fingerprint != file_fingerprint(path):
+            logger.log(LogLevel.DEBUG, f"{location} is older than {path}")
+            return None
+        return store
+
+    def read(
+        self,
+        path: str,
+        source_name: str,
+        columns: Optional[List[str]] = None,
+        selection: Optional[SampleSelection] = None,
+    ) -> Optional[pd.DataFrame]:
+        """Returns the posterior samples of a source from the packed file of
+        an HDF5 file.
+
+        Args:
+            path (str): location of the HDF5 file
+            source_name (str): name of the source
+            columns (List[str], optional): columns to read. All the columns
+            are read when None. Defaults to None.
+            selection (SampleSelection, optional): rows to read. All the
+            rows are read when None. Defaults to None.
+
+        Returns:
+            Optional[pd.DataFrame]: the posterior samples, backed by the
+            mapping, None when the source is not in an up-to-date packed
+            file
+        """
+        store = self._get_store(path)
+        if store is None or source_name not in store:
+            return None
+        return store.read(source_name, columns, selection)
+
+    def close(self):
+        """Unmaps all the packed files."""
+        with self.__lock:
+            self.__stores.clear()
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__stores)
+
+
+#: Pool shared by all the catalogs
+PACKED_POOL = PackedStorePool()
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""Per-source reductions of the posterior samples on a pool of processes.
+
+Each worker rebuilds the catalog from its pickled state and opens its own
+HDF5 handles, so that no handle is shared across processes. The function
+must be importable by the workers (defined at the module level)::
+
+    def credible_interval(samples):
+        return samples["Mass 1"].quantile([0.05, 0.95]).to_dict()
+
+    intervals = catalog.map_sources(credible_interval, workers=4)
+"""
+
+import math
+import os
+import pickle
+import time
+from concurrent.futures import as_completed
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import pandas as pd
+from loguru import logger
+
+from .memmap import PACKED_POOL
+from .monitoring import LogLevel
+from .storage import STORE_POOL
+
+#: Catalog of the worker process
+_WORKER_CATALOG = None
+
+ChunkResult = Tuple[List[Tuple[str, Any]], float, float]
+
+
+def _init_worker(state: bytes):
+    """Forgets the handles inherited from the parent and loads the catalog.
+
+    Args:
+        state (bytes): pickled catalog
+    """
+    global _WORKER_CATALOG
+    STORE_POOL.forget()
+    PACKED_POOL.close()
+    _WORKER_CATALOG = pickle.loads(state)
+
+
+def _apply(catalog, func: Callable, sources: List[str], attr) -> ChunkResult:
+    """Applies the function to the posterior samples of a chunk of sources.
+
+    Args:
+        catalog (GWCatalog): catalog
+        func (Callable): function of the posterior samples of a source
+        sources (List[str]): sources of the chunk
+        attr (Union[List[str], str]): attributes to read
+
+    Returns:
+        ChunkResult: the result of each source, the time spent reading and
+        the time spent in the function
+    """
+    start = time.perf_counter()
+    samples = catalog.get_source_samples_many(sources, attr)
+    read = time.perf_counter() - start
+    results = [(source, func(samples[source])) for source in sources]
+    return results, read, time.perf_counter() - start - read
+
+
+def _run_chunk(func: Callable, sources: List[str], attr) -> ChunkResult:
+    return _apply(_WORKER_CATALOG, func, sources, attr)
+
+
+def _to_frame(results: Dict[str, Any], name: str) -> pd.DataFrame:
+    """Assembles the results in a DataFrame indexed by source.
+
+    A function returning a dictionary or a Series gives one column per key,
+    any other result is stored in a column named after the function.
+    """
+    if results and all(
+        isinstance(value, (dict, pd.Series)) for value in results.values()
+    ):
+        frame = pd.DataFrame.from_dict(
+            {source: dict(value) for source, value in results.items()},
+            orient="index",
+        )
+    else:
+        frame = pd.DataFrame(
+            {name: list(results.values())}, index=list(results)
+        )
+    frame.index.name = "Source"
+    return frame
+
+
+def map_sources(
+    catalog,
+    func: Callable,
+    sources: Optional[List[str]] = None,
+    attr: Union[List[str], str] = None,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    timing: Optional[Callable[[dict], None]] = None,
+    mp_context=None,
+) -> pd.DataFrame:
+    """Applies a function to the posterior samples of each source.
+
+    Args:
+        catalog (GWCatalog): catalog
+        func (Callable): function of the posterior samples of a source,
+        returning a scalar, a dictionary or a Series
+        sources (List[str], optional): source names. All the detections are
+        used when None. Defaults to None.
+        attr (Union[List[str], str], optional): attributes given to the
+        function. Defaults to None.
+        workers (int, optional): number of processes. The function runs in
+        this process when 1 and on all the CPUs when None. Defaults to None.
+        chunksize (int, optional): number of sources per task. Four tasks
+        per worker when None. Defaults to None.
+        progress (Callable[[int, int], None], optional): called with the
+        number of sources done and the total when a chunk is done.
+        Defaults to None.
+        timing (Callable[[dict], None], optional): called at the end with
+        the number of sources, chunks and workers, the elapsed time and the
+        time spent reading and in the function, summed over the workers.
+        Defaults to None.
+        mp_context (optional): multiprocessing context of the pool. The
+        default start method of the platform is used when None.
+        Defaults to None.
+
+    Raises:
+        ValueError: workers or chunksize lower than 1
+
+    Returns:
+        pd.DataFrame: the results indexed by source
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+    if chunksize is not None and chunksize < 1:
+        raise ValueError(f"chunksize must be >= 1, got {chunksize}")
+    names = catalog.get_detections() if sources is None else list(sources)
+    size = chunksize or max(1, math.ceil(len(names) / (4 * workers)))
+    remaining = iter(names)
+    chunks = list(iter(lambda: list(islice(remaining, size)), []))
+
+    start = time.perf_counter()
+    done = _run(catalog, func, chunks, attr, workers, mp_context)
+    stats = _collect(done, len(names), progress)
+    results = stats.pop("results")
+    stats.update(
+        sources=len(names),
+        chunks=len(chunks),
+        workers=workers,
+        elapsed=time.perf_counter() - start,
+    )
+    logger.log(LogLevel.DEBUG, f"map_sources on {catalog}: {stats}")
+    if timing is not None:
+        timing(stats)
+    name = getattr(func, "__name__", "value")
+    return _to_frame({source: results[source] for source in names}, name)
+
+
+def _run(
+    catalog, func: Callable, chunks: List[List[str]], attr, workers, context
+) -> Iterator[ChunkResult]:
+    """Yields the results of the chunks as they are done."""
+    if workers == 1:
+        for chunk in chunks:
+            yield _apply(catalog, func, chunk, attr)
+        return
+    with ProcessPoolExecutor(
+        max_workers=min(workers, max(1, len(chunks))),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(pickle.dumps(catalog),),
+    ) as executor:
+        futures = [
+            executor.submit(_run_chunk, func, chunk, attr) for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _collect(chunks, total: int, progress) -> dict:
+    """Gathers the results of the chunks as they are done."""
+    stats = {"results": dict(), "read": 0.0, "compute": 0.0}
+    for results, read, compute in chunks:
+        stats["results"].update(results)
+        stats["read"] += read
+        stats["compute"] += compute
+        if progress is not None:
+            progress(len(stats["results"]), total)
+    return stats
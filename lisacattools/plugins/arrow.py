@@ -0,0 +1,753 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""Module implemented the catalogs stored in Parquet or Feather files.
+
+A catalog is stored in two kinds of files:
+- `<name>.parquet` (or `<name>.feather`) holds the detections. The metadata
+  of the catalog and the location of the posterior samples of each source
+  are stored in the schema metadata of the file, so that they are read
+  without reading the detections.
+- `<name>_chains_<i>.parquet` (or `.feather`) holds the posterior samples,
+  one row group (one record batch for Feather) per source. A source is read
+  without reading the others and its columns are selected in the file.
+
+The Feather files are memory-mapped, so that several processes reading the
+same catalog share the pages of the files.
+
+These files are written by lisacattools.convert.convert_to_arrow. The
+plugin requires pyarrow.
+"""
+
+import io
+import json
+import os
+import threading
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from ..catalog import GWCatalog
+from ..catalog import GWCatalogs
+from ..monitoring import UtilsMonitoring, LogLevel
+from ..storage import file_fingerprint
+from ..storage import SampleSelection
+from ..utils import CacheManager
+from ..utils import DtypePolicy
+from ..utils import LRUCache
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+    pq = None
+
+#: Key of the schema metadata written by lisacattools
+ARROW_METADATA = b"lisacattools"
+PARQUET = "parquet"
+FEATHER = "feather"
+
+
+def _check_pyarrow():
+    """Checks that pyarrow is installed.
+
+    Raises:
+        ImportError: pyarrow is not installed
+    """
+    if pa is None:
+        raise ImportError(
+            "pyarrow is required for the Parquet and Feather catalogs, "
+            "install it with: pip install lisacattools[arrow]"
+        )
+
+
+def arrow_format(path: str) -> str:
+    """Returns the format of a file from its extension.
+
+    Args:
+        path (str): location of the file
+
+    Raises:
+        ValueError: the extension is neither .parquet nor .feather
+
+    Returns:
+        str: PARQUET or FEATHER
+    """
+    extension = os.path.splitext(path)[1].lstrip(".")
+    if extension not in (PARQUET, FEATHER):
+        raise ValueError(f"{path} is neither a Parquet nor a Feather file")
+    return extension
+
+
+def read_arrow_schema(path: str) -> "pa.Schema":
+    """Reads the schema of a file without reading its data.
+
+    Args:
+        path (str): location of the Parquet or Feather file
+
+    Returns:
+        pa.Schema: the schema of the file
+    """
+    _check_pyarrow()
+    if arrow_format(path) == PARQUET:
+        return pq.read_schema(path)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema
+
+
+def read_arrow_metadata(path: str) -> dict:
+    """Reads the metadata written by lisacattools in a file.
+
+    Args:
+        path (str): location of the Parquet or Feather file
+
+    Raises:
+        KeyError: the file has not been written by lisacattools
+
+    Returns:
+        dict: the metadata
+    """
+    metadata = read_arrow_schema(path).metadata or dict()
+    return json.loads(metadata[ARROW_METADATA])
+
+
+def read_arrow_table(path: str) -> pd.DataFrame:
+    """Reads a whole file.
+
+    Args:
+        path (str): location of the Parquet or Feather file
+
+    Returns:
+        pd.DataFrame: the content of the file
+    """
+    _check_pyarrow()
+    if arrow_format(path) == PARQUET:
+        return pq.read_table(path).to_pandas()
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def write_arrow_table(
+    path: str,
+    data: pd.DataFrame,
+    metadata: Optional[dict] = None,
+    compression: Optional[str] = None,
+):
+    """Writes a data frame, with the metadata of lisacattools.
+
+    Args:
+        path (str): location of the Parquet or Feather file
+        data (pd.DataFrame): data to write
+        metadata (dict, optional): metadata of lisacattools. Defaults to
+        None.
+        compression (str, optional): compression codec. Defaults to None.
+    """
+    _check_pyarrow()
+    table = pa.Table.from_pandas(data, preserve_index=True)
+    if metadata is not None:
+        table = table.replace_schema_metadata(
+            {
+                **table.schema.metadata,
+                ARROW_METADATA: json.dumps(metadata),
+            }
+        )
+    if arrow_format(path) == PARQUET:
+        pq.write_table(table, path, compression=compression or "none")
+    else:
+        with (
+            pa.OSFile(path, "wb") as sink,
+            pa.ipc.new_file(
+                sink,
+                table.schema,
+                options=pa.ipc.IpcWriteOptions(compression=compression),
+            ) as writer,
+        ):
+            writer.write_table(table)
+
+
+class ArrowChainWriter:
+    """Writer of the posterior samples of the sources in a chain file, one
+    row group (Parquet) or one record batch (Feather) per source.
+
+    All the sources of a file have the same columns::
+
+        with ArrowChainWriter("cat_chains_0.parquet") as writer:
+            for source in sources:
+                writer.write(source, samples[source])
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        """Init the writer, the file is created with the first source.
+
+        Args:
+            path (str): location of the Parquet or Feather file
+            compression (str, optional): compression codec. Defaults to
+            None.
+        """
+        _check_pyarrow()
+        self.path = path
+        self.sources: List[str] = list()
+        self.__compression = compression
+        self.__format = arrow_format(path)
+        self.__schema: Optional["pa.Schema"] = None
+        self.__sink = None
+        self.__writer = None
+
+    def accepts(self, data: pd.DataFrame) -> bool:
+        """Checks if samples can be written in this file.
+
+        Args:
+            data (pd.DataFrame): posterior samples of a source
+
+        Returns:
+            bool: True when the file is empty or has the same schema
+        """
+        return self.__schema is None or self.__schema.equals(
+            pa.Schema.from_pandas(data, preserve_index=True),
+            check_metadata=False,
+        )
+
+    def write(self, source_name: str, data: pd.DataFrame):
+        """Writes the posterior samples of a source.
+
+        Args:
+            source_name (str): name of the source
+            data (pd.DataFrame): posterior samples of the source
+        """
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        if self.__writer is None:
+            self.__schema = table.schema
+            if self.__format == PARQUET:
+                self.__writer = pq.ParquetWriter(
+                    self.path,
+                    table.schema,
+                    compression=self.__compression or "none",
+                )
+            else:
+                self.__sink = pa.OSFile(self.path, "wb")
+                self.__writer = pa.ipc.new_file(
+                    self.__sink,
+                    table.schema,
+                    options=pa.ipc.IpcWriteOptions(
+                        compression=self.__compression
+                    ),
+                )
+        table = table.replace_schema_metadata(self.__schema.metadata)
+        if self.__format == PARQUET:
+            self.__writer.write_table(table, row_group_size=len(data) or 1)
+        else:
+            self.__writer.write_batch(
+                table.combine_chunks().to_batches()[0]
+                if len(data)
+                else pa.RecordBatch.from_pylist([], schema=self.__schema)
+            )
+        self.sources.append(source_name)
+
+    def close(self):
+        """Closes the file."""
+        if self.__writer is not None:
+            self.__writer.close()
+        if self.__sink is not None:
+            self.__sink.close()
+
+    def __enter__(self) -> "ArrowChainWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ArrowChainFile:
+    """Chain file open for reading the posterior samples of one source at a
+    time."""
+
+    def __init__(self, path: str, sources: List[str]):
+        """Init the chain file.
+
+        Args:
+            path (str): location of the Parquet or Feather file
+            sources (List[str]): sources of the file, in the order of the
+            row groups (record batches)
+        """
+        _check_pyarrow()
+        self.path = path
+        self.fingerprint = file_fingerprint(path)
+        self.__format = arrow_format(path)
+        self.__lock = threading.Lock()
+        self.__sources = {name: idx for idx, name in enumerate(sources)}
+        if self.__format == PARQUET:
+            self.__reader = pq.ParquetFile(path, memory_map=True)
+            self.__schema = self.__reader.schema_arrow
+        else:
+            self.__reader = pa.ipc.open_file(pa.memory_map(path))
+            self.__schema = self.__reader.schema
+        pandas_metadata = self.__schema.pandas_metadata or dict()
+        self.__index_columns = [
+            name
+            for name in pandas_metadata.get("index_columns", list())
+            if isinstance(name, str)
+        ]
+
+    @property
+    def columns(self) -> List[str]:
+        """Columns of the posterior samples.
+
+        :getter: Returns the columns of the posterior samples
+        :type: List[str]
+        """
+        return [
+            name
+            for name in self.__schema.names
+            if name not in self.__index_columns
+        ]
+
+    def read(
+        self,
+        source_name: str,
+        columns: Optional[List[str]] = None,
+        selection: Optional[SampleSelection] = None,
+    ) -> pd.DataFrame:
+        """Reads the posterior samples of a source.
+
+        Only the row group (record batch) of the source and the requested
+        columns are read. The rows of a selection are taken from the Arrow
+        table before its conversion to pandas, so that only these rows are
+        converted.
+
+        Args:
+            source_name (str): name of the source
+            columns (List[str], optional): columns to read. All the columns
+            are read when None. Defaults to None.
+            selection (SampleSelection, optional): rows to read. All the
+            rows are read when None. Defaults to None.
+
+        Raises:
+            KeyError: the source or a column is not in the file
+
+        Returns:
+            pd.DataFrame: the posterior samples of the source
+        """
+        idx = self.__sources[source_name]
+        if columns is not None:
+            missing = set(columns) - set(self.columns)
+            if missing:
+                raise KeyError(f"{sorted(missing)} not in {self.path}")
+        with self.__lock:
+            if self.__format == PARQUET:
+                table = self.__reader.read_row_group(
+                    idx, columns=columns, use_pandas_metadata=True
+                )
+            else:
+                table = pa.Table.from_batches([self.__reader.get_batch(idx)])
+                if columns is not None:
+                    table = table.select(list(columns) + self.__index_columns)
+        if selection is not None and not selection.is_full:
+            rows = selection.rows(table.num_rows)
+            if isinstance(rows, slice) and rows.step == 1:
+                table = table.slice(rows.start, max(rows.stop - rows.start, 0))
+            else:
+                table = table.take(np.arange(table.num_rows)[rows])
+        return table.to_pandas()
+
+
+class ArrowCatalogs(GWCatalogs):
+    """Implementation of the catalogs stored in Parquet or Feather files."""
+
+    def __init__(
+        self,
+        path: str,
+        accepted_pattern: Optional[str] = "*.parquet",
+        rejected_pattern: Optional[str] = "*_chains_*",
+        *args,
+        **kwargs,
+    ):
+        """Init the ArrowCatalogs by reading all catalogs with a specific
+        pattern in a given directory and rejecting files by another pattern.
+
+        The list of catalogs is sorted as the catalogs they were converted
+        from, and their lineages are linked as these.
+
+        Args:
+            path (str): directory
+            accepted_pattern (str, optional): pattern to accept files.
+            Defaults to "*.parquet".
+            rejected_pattern (str, optional): pattern to reject files.
+            Defaults to "*_chains_*".
+
+        Note:
+            The Feather catalogs are loaded with the "*.feather" accepted
+            pattern::
+
+                GWCatalogs.create(GWCatalogType.ARROW, "/tmp", "*.feather")
+
+            The `extra_directories`, `cache`, `read_only`, `workers` and
+            `dtype_policy` parameters are described in GWCatalogs.__init__.
+
+        Raises:
+            ImportError: pyarrow is not installed
+            ValueError: no files found matching the accepted and rejected
+            patterns.
+        """
+        _check_pyarrow()
+        super().__init__(path, accepted_pattern, rejected_pattern, **kwargs)
+        self._load_catalogs()
+
+    def _read_cats(self, cat_file: str) -> pd.DataFrame:
+        """Reads the metadata of a given catalog and the location of the file.
+
+        Only the schema of the file is read.
+
+        Args:
+            cat_file (str): catalog to load
+
+        Returns:
+            pd.DataFrame: pandas data frame
+        """
+        content = read_arrow_metadata(cat_file)
+        df = pd.read_json(
+            io.StringIO(json.dumps(content["metadata"])), orient="table"
+        )
+        df["location"] = cat_file
+        return df
+
+    def _read_metadata(self, cat_files: List[str]) -> pd.DataFrame:
+        """Reads the metadata of catalog files with the `workers` threads.
+
+        The column sorting the catalogs and the lineage columns of the set
+        the catalogs were converted from are read from the first file.
+
+        Args:
+            cat_files (List[str]): catalogs to load
+
+        Returns:
+            pd.DataFrame: the metadata of the catalogs, in the order of the
+            files
+        """
+        content = read_arrow_metadata(cat_files[0])
+        lineage = content.get("lineage", dict())
+        self.SORT_BY = content["sort_by"]
+        self.LINEAGE_COLUMNS = lineage.get("columns")
+        self.LINEAGE_UNIQUE = lineage.get("unique")
+        self.PARENT_COLUMN = lineage.get("parent", GWCatalogs.PARENT_COLUMN)
+        return super()._read_metadata(cat_files)
+
+    def _new_catalog(self, name: str, location: str) -> GWCatalog:
+        __doc__ = GWCatalogs._new_catalog.__doc__  # noqa: F841
+        return ArrowCatalog(
+            name,
+            location,
+            self.cache,
+            read_only=self.read_only,
+            dtype_policy=self.dtype_policy,
+        )
+
+    @property
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def count(self) -> int:
+        __doc__ = GWCatalogs.count.__doc__  # noqa: F841
+        return len(self.metadata.index)
+
+    @property
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def files(self) -> List[str]:
+        __doc__ = GWCatalogs.files.__doc__  # noqa: F841
+        return self.cat_files
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def get_catalogs_name(self) -> List[str]:
+        __doc__ = GWCatalogs.get_catalogs_name.__doc__  # noqa: F841
+        return list(self.metadata.index)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def get_first_catalog(self) -> GWCatalog:
+        __doc__ = GWCatalogs.get_first_catalog.__doc__  # noqa: F841
+        return self.get_catalog(0)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def get_last_catalog(self) -> GWCatalog:
+        __doc__ = GWCatalogs.get_last_catalog.__doc__  # noqa: F841
+        return self.get_catalog(self.count - 1)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def get_catalog(self, idx: int) -> GWCatalog:
+        __doc__ = GWCatalogs.get_catalog.__doc__  # noqa: F841
+        location = self.metadata.iloc[idx]["location"]
+        name = self.metadata.index[idx]
+        return self._get_catalog_object(name, location)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def get_catalog_by(self, name: str) -> GWCatalog:
+        __doc__ = GWCatalogs.get_catalog_by.__doc__  # noqa: F841
+        cat_idx = self.metadata.index.get_loc(name)
+        return self.get_catalog(cat_idx)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_lineage(self, cat_name: str, src_name: str) -> pd.DataFrame:
+        __doc__ = GWCatalogs.get_lineage.__doc__  # noqa: F841
+        return self._graph_lineage(cat_name, src_name)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_lineages(
+        self, cat_name: str, sources: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        __doc__ = GWCatalogs.get_lineages.__doc__  # noqa: F841
+        return self._graph_lineages(cat_name, sources)
+
+    def __repr__(self):
+        return f"ArrowCatalogs({self.path!r}, {self.accepted_pattern!r}, \
+            {self.rejected_pattern!r}, {self.extra_directories!r})"
+
+    def __str__(self):
+        return f"ArrowCatalogs: {self.path} {self.accepted_pattern!r} \
+            {self.rejected_pattern!r} {self.extra_directories!r}"
+
+
+class ArrowCatalog(GWCatalog):
+    """Implementation of the catalog stored in Parquet or Feather files."""
+
+    def __init__(
+        self,
+        catalog_name: str,
+        location: str,
+        cache: Optional[LRUCache] = None,
+        read_only: bool = False,
+        dtype_policy: Optional[DtypePolicy] = None,
+    ):
+        """Init the catalog with a name and a location
+
+        Args:
+            name (str): name of the catalog
+            location (str): location of the catalog
+            cache (LRUCache, optional): cache of the posterior samples. The
+            cache shared by all the catalogs is used when None.
+            Defaults to None.
+            read_only (bool, optional): returns read-only views instead of
+            copies of the datasets. Defaults to False.
+            dtype_policy (DtypePolicy, optional): compact dtypes of the
+            posterior samples. Defaults to None.
+        """
+        _check_pyarrow()
+        self.__name = catalog_name
+        self.__location = location
+        super().__init__(cache, read_only, dtype_policy=dtype_policy)
+        self.__chains: Optional[Dict[str, List[str]]] = None
+        self.__source_files: Dict[str, str] = dict()
+        self.__chain_files: Dict[str, ArrowChainFile] = dict()
+        self.__lock = threading.Lock()
+
+    @property
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def datasets(self) -> List[str]:
+        """dataset.
+
+        The chain file of each source, as the HDF5 catalogs, is named
+        `<source>_chain`.
+
+        :getter: Returns the list of datasets
+        :type: List
+        """
+        return ["/detections", "/metadata"] + [
+            f"/{source}_chain"
+            for sources in self._get_chains().values()
+            for source in sources
+        ]
+
+    def _get_chains(self) -> Dict[str, List[str]]:
+        """Returns the sources of each chain file of the catalog.
+
+        Returns:
+            Dict[str, List[str]]: sources of each chain file
+        """
+        if self.__chains is None:
+            self.__chains = read_arrow_metadata(self.location)["chains"]
+            self.__source_files = {
+                source: chain_file
+                for chain_file, sources in self.__chains.items()
+                for source in sources
+            }
+        return self.__chains
+
+    def _get_chain_file(self, source_name: str) -> ArrowChainFile:
+        """Returns the open chain file of a source.
+
+        The chain file is reopened when it has changed on disk.
+
+        Args:
+            source_name (str): name of the source
+
+        Raises:
+            KeyError: the source has no posterior samples
+
+        Returns:
+            ArrowChainFile: the chain file
+        """
+        chains = self._get_chains()
+        name = self.__source_files.get(source_name)
+        if name is None:
+            raise KeyError(f"No posterior samples for {source_name}")
+        path = os.path.join(os.path.dirname(self.location), name)
+        with self.__lock:
+            chain_file = self.__chain_files.get(name)
+            if (
+                chain_file is None
+                or chain_file.fingerprint != file_fingerprint(path)
+            ):
+                chain_file = ArrowChainFile(path, chains[name])
+                self.__chain_files[name] = chain_file
+            return chain_file
+
+    @CacheManager.get_cache_pandas(
+        keycache_argument=[1, 2, 3], level=LogLevel.INFO
+    )
+    def _read_chain(
+        self,
+        source_name: str,
+        columns: Optional[List[str]] = None,
+        selection: Optional[SampleSelection] = None,
+    ) -> pd.DataFrame:
+        """Reads the posterior samples of a source.
+
+        Args:
+            source_name (str): name of the source
+            columns (List[str], optional): columns to read. All the columns
+            are read when None. Defaults to None.
+            selection (SampleSelection, optional): rows to read. All the
+            rows are read when None. Defaults to None.
+
+        Returns:
+            pd.DataFrame: the posterior samples of the source
+        """
+        return self._get_chain_file(source_name).read(
+            source_name, columns, selection
+        )
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def get_dataset(self, name: str) -> pd.DataFrame:
+        """Returns a dataset based on its name.
+
+        Args:
+            name (str): name of the dataset
+
+        Returns:
+            pd.DataFrame: the dataset
+        """
+        name = name.lstrip("/")
+        if name == "detections":
+            return read_arrow_table(self.location)
+        if name == "metadata":
+            return pd.read_json(
+                io.StringIO(
+                    json.dumps(read_arrow_metadata(self.location)["metadata"])
+                ),
+                orient="table",
+            )
+        source_name = name[: -len("_chain")] if name.endswith("_chain") else ""
+        return self._get_chain_file(source_name).read(source_name)
+
+    def _read_detections(self) -> pd.DataFrame:
+        """Reads the detections dataset from the catalog file. The sources
+        of each chain file are read again with it.
+
+        Returns:
+            pd.DataFrame: the detections dataset
+        """
+        self.__chains = None
+        return self.get_dataset("detections")
+
+    def _summary_files(self) -> Dict[str, List[str]]:
+        """Returns the sources of each file their posterior samples come
+        from, the catalog file included.
+
+        Returns:
+            Dict[str, List[str]]: sources of each file
+        """
+        dirname = os.path.dirname(self.location)
+        files = {self.location: list()}
+        for name, sources in self._get_chains().items():
+            files[os.path.join(dirname, name)] = list(sources)
+        return files
+
+    def invalidate(self):
+        """Forgets the memoized detections dataset and closes the chain
+        files."""
+        super().invalidate()
+        self.__chains = None
+        with self.__lock:
+            self.__chain_files.clear()
+
+    @property
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def name(self) -> str:
+        __doc__ = GWCatalog.name.__doc__  # noqa: F841
+        return self.__name
+
+    @property
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def location(self) -> str:
+        __doc__ = GWCatalog.location.__doc__  # noqa: F841
+        return self.__location
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_detections(
+        self, attr: Union[List[str], str] = None
+    ) -> Union[List[str], pd.DataFrame, pd.Series]:
+        __doc__ = GWCatalog.get_detections.__doc__  # noqa: F841
+        detections = self._get_detections_dataset()
+        if attr is None:
+            return list(detections.index)
+        return self._share(detections[attr])
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def get_attr_detections(self) -> List[str]:
+        __doc__ = GWCatalog.get_attr_detections.__doc__  # noqa: F841
+        schema = read_arrow_schema(self.location)
+        index_columns = (schema.pandas_metadata or dict()).get(
+            "index_columns", list()
+        )
+        return [name for name in schema.names if name not in index_columns]
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_source_samples(
+        self,
+        source_name: str,
+        attr: List[str] = None,
+        max_samples: Optional[int] = None,
+        stride: Optional[int] = None,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        random_state: Optional[int] = None,
+    ) -> pd.DataFrame:
+        __doc__ = GWCatalog.get_source_samples.__doc__  # noqa: F841
+        selection = SampleSelection(
+            start, stop, stride, max_samples, random_state
+        )
+        columns = [attr] if isinstance(attr, str) else attr
+        source_samples = self._read_chain(source_name, columns, selection)
+        if attr is None and self.dtype_policy is None:
+            return source_samples
+        return self._share_samples(
+            source_samples if attr is None else source_samples[attr]
+        )
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def get_attr_source_samples(self, source_name: str) -> List[str]:
+        __doc__ = GWCatalog.get_attr_source_samples.__doc__  # noqa: F841
+        return self._get_chain_file(source_name).columns
+
+    def __repr__(self):
+        return f"ArrowCatalog({self.__name!r}, {self.__location!r})"
+
+    def __str__(self):
+        return f"ArrowCatalog: {self.__name} {self.__location}"
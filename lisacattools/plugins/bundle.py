@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""Module implemented the catalogs consolidated in a bundle.
+
+A bundle is one HDF5 file holding a whole set of catalogs:
+- `/bundle` holds the version of the bundle and the column sorting the
+  catalogs
+- `/metadata` holds the metadata of all the catalogs
+- `/catalogs/<name>/detections` holds the detections of a catalog
+- `/catalogs/<name>/samples_<i>` holds the posterior samples of the sources
+  of a catalog, one block of contiguous rows per source. The sources whose
+  samples have the same columns share the same dataset.
+- `/catalogs/<name>/index` maps each source of a catalog to its dataset and
+  its range of rows
+
+Opening a bundle reads `/bundle` and `/metadata` only. The samples of a
+source are read from its range of rows, without globbing the directory nor
+opening a chain file, and all the reads share one handle of the file.
+
+Bundles are written by lisacattools.convert.convert_to_bundle.
+"""
+
+import threading
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import pandas as pd
+
+from ..catalog import GWCatalog
+from ..catalog import GWCatalogs
+from ..monitoring import UtilsMonitoring, LogLevel
+from ..storage import file_fingerprint
+from ..storage import SampleSelection
+from ..storage import STORE_POOL
+from ..summary import summary_location
+from ..utils import CacheManager
+from ..utils import DtypePolicy
+from ..utils import LRUCache
+from ..utils import read_only_view
+
+#: Version of the bundle layout
+BUNDLE_VERSION = 1
+
+
+def catalog_key(catalog_name: str, dataset: str) -> str:
+    """Returns the key of a dataset of a catalog in a bundle.
+
+    Args:
+        catalog_name (str): name of the catalog
+        dataset (str): name of the dataset (detections, index, samples_<i>)
+
+    Returns:
+        str: key of the dataset
+    """
+    return f"catalogs/{catalog_name}/{dataset}"
+
+
+class UcbBundleCatalogs(GWCatalogs):
+    """Implementation of the catalogs consolidated in a bundle."""
+
+    def __init__(
+        self,
+        path: str,
+        accepted_pattern: Optional[str] = None,
+        rejected_pattern: Optional[str] = None,
+        *args,
+        **kwargs,
+    ):
+        """Init the UcbBundleCatalogs by reading the metadata of a bundle.
+
+        The list of catalogs is sorted as the catalogs they were converted
+        from::
+
+            GWCatalogs.create(GWCatalogType.UCB_BUNDLE, "/tmp/ucb.h5")
+
+        Args:
+            path (str): location of the bundle
+            accepted_pattern (str, optional): not used, the bundle holds
+            all its catalogs. Defaults to None.
+            rejected_pattern (str, optional): not used. Defaults to None.
+
+        Note:
+            The `cache`, `read_only`, `workers` and `dtype_policy`
+            parameters are described in GWCatalogs.__init__. The lineages
+            are linked by the "parent" column of the bundled detections.
+
+        Raises:
+            ValueError: the file is not a bundle
+        """
+        super().__init__(path, accepted_pattern, rejected_pattern, **kwargs)
+        sort_by = self._read_bundle()
+        metadata = STORE_POOL.read(path, "metadata")
+        metadata["location"] = path
+        if sort_by is not None:
+            metadata = metadata.sort_values(by=sort_by)
+        self._set_metadata(metadata, [path])
+
+    def _read_bundle(self) -> Optional[str]:
+        """Reads the description of the bundle.
+
+        Raises:
+            ValueError: the file is not a bundle or its version is not
+            supported
+
+        Returns:
+            Optional[str]: the column sorting the catalogs
+        """
+        try:
+            bundle = STORE_POOL.read(self.path, "bundle")
+        except (KeyError, OSError) as err:
+            raise ValueError(f"{self.path} is not a catalog bundle") from err
+        version = int(bundle["version"].iloc[0])
+        if version != BUNDLE_VERSION:
+            raise ValueError(
+                f"{self.path}: unsupported bundle version {version}"
+            )
+        sort_by = bundle["sort_by"].iloc[0]
+        return None if pd.isna(sort_by) else str(sort_by)
+
+    def _new_catalog(self, name: str, location: str) -> GWCatalog:
+        __doc__ = GWCatalogs._new_catalog.__doc__  # noqa: F841
+        return UcbBundleCatalog(
+            name,
+            location,
+            self.cache,
+            read_only=self.read_only,
+            dtype_policy=self.dtype_policy,
+        )
+
+    @property
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def count(self) -> int:
+        __doc__ = GWCatalogs.count.__doc__  # noqa: F841
+        return len(self.metadata.index)
+
+    @property
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def files(self) -> List[str]:
+        __doc__ = GWCatalogs.files.__doc__  # noqa: F841
+        return [self.path]
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def get_catalogs_name(self) -> List[str]:
+        __doc__ = GWCatalogs.get_catalogs_name.__doc__  # noqa: F841
+        return list(self.metadata.index)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def get_first_catalog(self) -> GWCatalog:
+        __doc__ = GWCatalogs.get_first_catalog.__doc__  # noqa: F841
+        return self.get_catalog(0)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def get_last_catalog(self) -> GWCatalog:
+        __doc__ = GWCatalogs.get_last_catalog.__doc__  # noqa: F841
+        return self.get_catalog(self.count - 1)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def get_catalog(self, idx: int) -> GWCatalog:
+        __doc__ = GWCatalogs.get_catalog.__doc__  # noqa: F841
+        location = self.metadata.iloc[idx]["location"]
+        name = self.metadata.index[idx]
+        return self._get_catalog_object(name, location)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    def get_catalog_by(self, name: str) -> GWCatalog:
+        __doc__ = GWCatalogs.get_catalog_by.__doc__  # noqa: F841
+        cat_idx = self.metadata.index.get_loc(name)
+        return self.get_catalog(cat_idx)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_lineage(self, cat_name: str, src_name: str) -> pd.DataFrame:
+        __doc__ = GWCatalogs.get_lineage.__doc__  # noqa: F841
+        return self._graph_lineage(cat_name, src_name)
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_lineages(
+        self, cat_name: str, sources: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        __doc__ = GWCatalogs.get_lineages.__doc__  # noqa: F841
+        return self._graph_lineages(cat_name, sources)
+
+    def __repr__(self):
+        return f"UcbBundleCatalogs({self.path!r})"
+
+    def __str__(self):
+        return f"UcbBundleCatalogs: {self.path}"
+
+
+class UcbBundleCatalog(GWCatalog):
+    """Implementation of a catalog consolidated in a bundle."""
+
+    def __init__(
+        self,
+        catalog_name: str,
+        location: str,
+        cache: Optional[LRUCache] = None,
+        read_only: bool = False,
+        dtype_policy: Optional[DtypePolicy] = None,
+    ):
+        """Init the catalog with a name and the location of its bundle
+
+        Args:
+            name (str): name of the catalog
+            location (str): location of the bundle
+            cache (LRUCache, optional): cache of the posterior samples. The
+            cache shared by all the catalogs is used when None.
+            Defaults to None.
+            read_only (bool, optional): returns read-only views instead of
+            copies of the datasets. Defaults to False.
+            dtype_policy (DtypePolicy, optional): compact dtypes of the
+            posterior samples. Defaults to None.
+        """
+        self.__name = catalog_name
+        self.__location = location
+        super().__init__(cache, read_only, dtype_policy=dtype_policy)
+        self.__lock = threading.Lock()
+        self.__detections: Optional[pd.DataFrame] = None
+        self.__index: Optional[pd.DataFrame] = None
+        self.__fingerprint = None
+
+    def _load(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Returns the detections and the index of the catalog.
+
+        Both datasets are read once and memoized until the modification
+        time or the size of the bundle changes. They must not be modified.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: the detections and the index
+        """
+        fingerprint = file_fingerprint(self.location)
+        with self.__lock:
+            if self.__fingerprint != fingerprint:
+                detections = STORE_POOL.read(
+                    self.location, catalog_key(self.name, "detections")
+                )
+                self.__detections = (
+                    read_only_view(detections)
+                    if self.read_only
+                    else detections
+                )
+                self.__index = STORE_POOL.read(
+                    self.location, catalog_key(self.name, "index")
+                )
+                self.__fingerprint = fingerprint
+            return self.__detections, self.__index
+
+    def _get_detections_dataset(self) -> pd.DataFrame:
+        """Returns the detections dataset.
+
+        Returns:
+            pd.DataFrame: the detections dataset
+        """
+        return self._load()[0]
+
+    def _locate(self, source_name: str) -> Tuple[str, int, int]:
+        """Returns the dataset and the range of rows of a source.
+
+        Args:
+            source_name (str): name of the source
+
+        Raises:
+            KeyError: the source has no posterior samples
+
+        Returns:
+            Tuple[str, int, int]: key of the dataset, first row and end row
+            (excluded) of the source
+        """
+        index = self._load()[1]
+        if source_name not in index.index:
+            raise KeyError(f"No posterior samples for {source_name}")
+        dataset, start, stop = index.loc[
+            source_name, ["dataset", "start", "stop"]
+        ]
+        return catalog_key(self.name, dataset), int(start), int(stop)
+
+    @CacheManager.get_cache_pandas(
+        keycache_argument=[1, 2, 3, 4], level=LogLevel.INFO
+    )
+    def _read_chain(
+        self,
+        source_name: str,
+        dataset: str,
+        columns: Optional[List[str]] = None,
+        selection: Optional[SampleSelection] = None,
+    ) -> pd.DataFrame:
+        """Reads the posterior samples of a source from its range of rows.
+
+        Args:
+            source_name (str): name of the source
+            dataset (str): key of the dataset holding the source
+            columns (List[str], optional): columns to read. All the columns
+            are read when None. Defaults to None.
+            selection (SampleSelection, optional): rows to read. All the
+            rows are read when None. Defaults to None.
+
+        Returns:
+            pd.DataFrame: the posterior samples of the source
+        """
+        _, start, stop = self._locate(source_name)
+        rows = (selection or SampleSelection()).rows(stop - start)
+        if isinstance(rows, slice):
+            rows = slice(start + rows.start, start + rows.stop, rows.step)
+        else:
+            rows = start + rows
+        return STORE_POOL.read_rows(self.location, dataset, rows, columns)
+
+    @property
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def datasets(self) -> List[str]:
+        """dataset.
+
+        The samples of each source, as the HDF5 catalogs, are named
+        `<source>_chain`.
+
+        :getter: Returns the list of datasets
+        :type: List
+        """
+        return ["/detections", "/metadata"] + [
+            f"/{source}_chain" for source in self._load()[1].index
+        ]
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def get_dataset(self, name: str) -> pd.DataFrame:
+        """Returns a dataset based on its name.
+
+        Args:
+            name (str): name of the dataset
+
+        Returns:
+            pd.DataFrame: the dataset
+        """
+        name = name.lstrip("/")
+        if name == "detections":
+            return self._get_detections_dataset().copy()
+        if name == "metadata":
+            return STORE_POOL.read(self.location, "metadata").loc[[self.name]]
+        source_name = name[: -len("_chain")] if name.endswith("_chain") else ""
+        return self.get_source_samples(source_name)
+
+    def _summary_files(self) -> Dict[str, List[str]]:
+        """Returns the sources of each file their posterior samples come
+        from.
+
+        Returns:
+            Dict[str, List[str]]: sources of each file
+        """
+        return {self.location: self.get_detections()}
+
+    def _summary_location(self) -> str:
+        __doc__ = GWCatalog._summary_location.__doc__  # noqa: F841
+        return summary_location(self.location, self.name)
+
+    def invalidate(self):
+        """Forgets the memoized detections and index."""
+        with self.__lock:
+            self.__detections = None
+            self.__index = None
+            self.__fingerprint = None
+
+    @property
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def name(self) -> str:
+        __doc__ = GWCatalog.name.__doc__  # noqa: F841
+        return self.__name
+
+    @property
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def location(self) -> str:
+        __doc__ = GWCatalog.location.__doc__  # noqa: F841
+        return self.__location
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_detections(
+        self, attr: Union[List[str], str] = None
+    ) -> Union[List[str], pd.DataFrame, pd.Series]:
+        __doc__ = GWCatalog.get_detections.__doc__  # noqa: F841
+        detections = self._get_detections_dataset()
+        if attr is None:
+            return list(detections.index)
+        return self._share(detections[attr])
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_source_samples(
+        self,
+        source_name: str,
+        attr: List[str] = None,
+        max_samples: Optional[int] = None,
+        stride: Optional[int] = None,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        random_state: Optional[int] = None,
+    ) -> pd.DataFrame:
+        __doc__ = GWCatalog.get_source_samples.__doc__  # noqa: F841
+        selection = SampleSelection(
+            start, stop, stride, max_samples, random_state
+        )
+        columns = [attr] if isinstance(attr, str) else attr
+        dataset = self._locate(source_name)[0]
+        source_samples = self._read_chain(
+            source_name, dataset, columns, selection
+        )
+        if attr is None and self.dtype_policy is None:
+            return source_samples
+        return self._share_samples(
+            source_samples if attr is None else source_samples[attr]
+        )
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def get_attr_source_samples(self, source_name: str) -> List[str]:
+        __doc__ = GWCatalog.get_attr_source_samples.__doc__  # noqa: F841
+        dataset, start, _ = self._locate(source_name)
+        return list(
+            STORE_POOL.read_rows(
+                self.location, dataset, slice(start, start, 1)
+            ).columns
+        )
+
+    def __repr__(self):
+        return f"UcbBundleCatalog({self.__name!r}, {self.__location!r})"
+
+    def __str__(self):
+        return f"UcbBundleCatalog: {self.__name} {self.__location}"
@@ -5,24 +5,44 @@
 # SPDX-License-Identifier: Apache-2.0
 
 """Module implemented the MBH catalog."""
-import glob
-import os
-from itertools import chain
+from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Union
 
-import numpy as np
 import pandas as pd
 
 from ..catalog import GWCatalog
 from ..catalog import GWCatalogs
+from ..manifest import ManifestEntry
+from ..memmap import PACKED_POOL
 from ..monitoring import UtilsMonitoring, LogLevel
+from ..storage import SampleSelection
+from ..storage import STORE_POOL
+from ..utils import CacheManager
+from ..utils import DtypePolicy
+from ..utils import LRUCache
+
 
 class MbhCatalogs(GWCatalogs):
     """Implementation of the MBH catalogs."""
 
-    EXTRA_DIR = "extra_directories"
+    SORT_BY = "observation week"
+    LINEAGE_COLUMNS = [
+        "Mass 1",
+        "Mass 2",
+        "Spin 1",
+        "Spin 2",
+        "Ecliptic Latitude",
+        "Ecliptic Longitude",
+        "Luminosity Distance",
+        "Barycenter Merge Time",
+        "Merger Phase",
+        "Polarization",
+        "cos inclination",
+    ]
+    LINEAGE_UNIQUE = "Log Likelihood"
+    PARENT_COLUMN = "Parent"
 
     def __init__(
         self,
@@ -44,104 +64,23 @@ class MbhCatalogs(GWCatalogs):
             rejected_pattern (str, optional): pattern to reject files.
             Defaults to None.
 
+        Note:
+            The `extra_directories`, `cache`, `read_only`, `workers`,
+            `manifest`, `memmap` and `dtype_policy` parameters are described
+            in GWCatalogs.__init__.
+
         Raises:
             ValueError: no files found matching the accepted and rejected
             patterns.
         """
-        self.path = path
-        self.accepted_pattern = accepted_pattern
-        self.rejected_pattern = rejected_pattern
-        self.extra_directories = (
-            kwargs[MbhCatalogs.EXTRA_DIR]
-            if MbhCatalogs.EXTRA_DIR in kwargs
-            else list()
-        )
-        directories = self._search_directories(
-            self.path, self.extra_directories
-        )
-        self.cat_files = self._search_files(
-            directories, accepted_pattern, rejected_pattern
-        )
-        if len(self.cat_files) == 0:
-            raise ValueError(
-                f"no files found matching the accepted \
-                    ({self.accepted_pattern}) and rejected \
-                    ({self.rejected_pattern}) patterns in {directories}"
-            )
-        self.__metadata = pd.concat(
-            [self._read_cats(cat_file) for cat_file in self.cat_files]
-        )
-        self.__metadata = self.__metadata.sort_values(by="observation week")
-
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def _search_directories(
-        self, path: str, extra_directories: List[str]
-    ) -> List[str]:
-        """Compute the list of directories on which the pattern will be applied.
-
-        Args:
-            path (str) : main path
-            extra_directories (List[str]) : others directories
-
-        Returns:
-            List[str]: list of directories on which the pattern will be applied
-        """
-        directories: List[str] = extra_directories[:]
-        directories.append(path)
-        return directories
-
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def _search_files(
-        self, directories: List[str], accepted_pattern, rejected_pattern
-    ) -> List[str]:
-        """Search files in directories according to a set of constraints :
-        accepted and rejected patterns
-
-        Args:
-            directories (List[str]): List of directories to scan
-            accepted_pattern ([type]): pattern to get files
-            rejected_pattern ([type]): pattern to reject files
-
-        Returns:
-            List[str]: List of files
-        """
-        accepted_files = [
-            glob.glob(path + os.path.sep + accepted_pattern)
-            for path in directories
-        ]
-        accepted_files = list(chain(*accepted_files))
-        if rejected_pattern is None:
-            rejected_files = list()
-        else:
-            rejected_files = [
-                list()
-                if rejected_pattern is None
-                else glob.glob(path + os.path.sep + rejected_pattern)
-                for path in directories
-            ]
-        rejected_files = list(chain(*rejected_files))
-        cat_files = list(set(accepted_files) - set(rejected_files))
-        return cat_files
-
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def _read_cats(self, cat_file: str) -> pd.DataFrame:
-        """Reads the metadata of a given catalog and the location of the file.
-
-        Args:
-            cat_file (str): catalog to load
-
-        Returns:
-            pd.DataFrame: pandas data frame
-        """
-        df = pd.read_hdf(cat_file, key="metadata")
-        df["location"] = cat_file
-        return df
+        super().__init__(path, accepted_pattern, rejected_pattern, **kwargs)
+        self._load_catalogs()
 
-    @property
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def metadata(self) -> pd.DataFrame:
-        __doc__ = GWCatalogs.metadata.__doc__  # noqa: F841
-        return self.__metadata
+    def _new_catalog(self, name: str, location: str) -> GWCatalog:
+        __doc__ = GWCatalogs._new_catalog.__doc__  # noqa: F841
+        return MbhCatalog(
+            name, location, self.cache, **self._catalog_options(location)
+        )
 
     @property
     @UtilsMonitoring.log_io(level=LogLevel.TRACE)
@@ -166,7 +105,7 @@ class MbhCatalogs(GWCatalogs):
         __doc__ = GWCatalogs.get_first_catalog.__doc__  # noqa: F841
         location = self.metadata.iloc[0]["location"]
         name = self.metadata.index[0]
-        return MbhCatalog(name, location)
+        return self._get_catalog_object(name, location)
 
     @UtilsMonitoring.log_io(level=LogLevel.TRACE)
     @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=10)
@@ -174,7 +113,7 @@ class MbhCatalogs(GWCatalogs):
         __doc__ = GWCatalogs.get_last_catalog.__doc__  # noqa: F841
         location = self.metadata.iloc[self.count - 1]["location"]
         name = self.metadata.index[self.count - 1]
-        return MbhCatalog(name, location)
+        return self._get_catalog_object(name, location)
 
     @UtilsMonitoring.log_io(level=LogLevel.TRACE)
     @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=10)
@@ -182,7 +121,7 @@ class MbhCatalogs(GWCatalogs):
         __doc__ = GWCatalogs.get_catalog.__doc__  # noqa: F841
         location = self.metadata.iloc[idx]["location"]
         name = self.metadata.index[idx]
-        return MbhCatalog(name, location)
+        return self._get_catalog_object(name, location)
 
     @UtilsMonitoring.log_io(level=LogLevel.TRACE)
     @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=10)
@@ -191,86 +130,25 @@ class MbhCatalogs(GWCatalogs):
         cat_idx = self.metadata.index.get_loc(name)
         return self.get_catalog(cat_idx)
 
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def refresh(self) -> List[str]:
+        __doc__ = GWCatalogs.refresh.__doc__  # noqa: F841
+        return self._refresh_files()
+
     @UtilsMonitoring.log_io(level=LogLevel.TRACE)
     @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
     def get_lineage(self, cat_name: str, src_name: str) -> pd.DataFrame:
         __doc__ = GWCatalogs.get_lineage.__doc__  # noqa: F841
-
-        dfs: List[pd.Series] = list()
-        while src_name != "" and cat_name not in [None, ""]:
-            detections = self.get_catalog_by(cat_name).get_dataset(
-                "detections"
-            )
-            src = detections.loc[[src_name]]
-            try:
-                wk = self.metadata.loc[cat_name]["observation week"]
-            except:  # noqa: E722
-                wk = self.metadata.loc[cat_name]["Observation Week"]
-
-            src.insert(0, "Observation Week", wk, True)
-            src.insert(1, "Catalog", cat_name, True)
-            dfs.append(src)
-            try:
-                prnt = self.metadata.loc[cat_name]["parent"]
-            except:  # noqa: E722
-                prnt = self.metadata.loc[cat_name]["Parent"]
-
-            cat_name = prnt
-            src_name = src.iloc[0]["Parent"]
-
-        histDF: pd.DataFrame = pd.concat(dfs, axis=0)
-        histDF.drop_duplicates(
-            subset="Log Likelihood", keep="last", inplace=True
-        )
-        histDF.sort_values(by="Observation Week", ascending=True, inplace=True)
-        return histDF
+        return self._graph_lineage(cat_name, src_name)
 
     @UtilsMonitoring.log_io(level=LogLevel.TRACE)
     @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
-    def get_lineage_data(self, lineage: pd.DataFrame) -> pd.DataFrame:
-        __doc__ = GWCatalogs.get_lineage_data.__doc__  # noqa: F841
-
-        def _process_lineage(source_epoch, source_data, obs_week):
-            source_data.insert(
-                len(source_data.columns), "Source", source_epoch, True
-            )
-            source_data.insert(
-                len(source_data.columns), "Observation Week", obs_week, True
-            )
-            return source_data
-
-        source_epochs = list(lineage.index)
-
-        merge_source_epochs: pd.DataFrame = pd.concat(
-            [
-                _process_lineage(
-                    source_epoch,
-                    self.get_catalog_by(
-                        lineage.loc[source_epoch]["Catalog"]
-                    ).get_source_samples(source_epoch),
-                    lineage.loc[source_epoch]["Observation Week"],
-                )
-                for source_epoch in source_epochs
-            ]
-        )
-        merge_source_epochs = merge_source_epochs[
-            [
-                "Source",
-                "Observation Week",
-                "Mass 1",
-                "Mass 2",
-                "Spin 1",
-                "Spin 2",
-                "Ecliptic Latitude",
-                "Ecliptic Longitude",
-                "Luminosity Distance",
-                "Barycenter Merge Time",
-                "Merger Phase",
-                "Polarization",
-                "cos inclination",
-            ]
-        ].copy()
-        return merge_source_epochs
+    def get_lineages(
+        self, cat_name: str, sources: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        __doc__ = GWCatalogs.get_lineages.__doc__  # noqa: F841
+        return self._graph_lineages(cat_name, sources)
 
     def __repr__(self):
         return f"MbhCatalogs({self.path!r}, {self.accepted_pattern!r}, \
@@ -284,40 +162,75 @@ class MbhCatalogs(GWCatalogs):
 class MbhCatalog(GWCatalog):
     """Implementation of the Mbh catalog."""
 
-    def __init__(self, name: str, location: str):
+    def __init__(
+        self,
+        name: str,
+        location: str,
+        cache: Optional[LRUCache] = None,
+        read_only: bool = False,
+        manifest: Optional[ManifestEntry] = None,
+        memmap: bool = False,
+        dtype_policy: Optional[DtypePolicy] = None,
+    ):
         """Init the MBH catalog with a name and a location
 
         Args:
             name (str): name of the catalog
             location (str): location of the catalog
+            cache (LRUCache, optional): cache of the posterior samples. The
+            cache shared by all the catalogs is used when None.
+            Defaults to None.
+            read_only (bool, optional): returns read-only views instead of
+            copies of the datasets. Defaults to False.
+            manifest (ManifestEntry, optional): manifest entry of the
+            catalog file, used instead of opening the file when it is up
+            to date. Defaults to None.
+            memmap (bool, optional): reads the posterior samples from the
+            packed files mapped in memory when they are up to date.
+            Defaults to False.
+            dtype_policy (DtypePolicy, optional): compact dtypes of the
+            posterior samples. Defaults to None.
         """
         self.__name = name
         self.__location = location
-        store = pd.HDFStore(location, "r")
-        self.__datasets = store.keys()
-        store.close()
+        super().__init__(cache, read_only, memmap, dtype_policy, manifest)
 
-    @property
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def datasets(self):
-        """dataset.
+    @CacheManager.get_cache_pandas(
+        keycache_argument=[1, 2, 3], level=LogLevel.INFO
+    )
+    def _read_chain(
+        self,
+        source_name: str,
+        columns: Optional[List[str]] = None,
+        selection: Optional[SampleSelection] = None,
+    ) -> pd.DataFrame:
+        """Read the posterior samples of a source in the catalog file
 
-        :getter: Returns the list of datasets
-        :type: List
-        """
-        return self.__datasets
+        Args:
+            source_name (str): Name of the source
+            columns (List[str], optional): columns to read. All the columns
+            are read when None. Defaults to None.
+            selection (SampleSelection, optional): rows to read. All the
+            rows are read when None. Defaults to None.
 
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def get_dataset(self, name: str) -> pd.DataFrame:
-        """Returns a dataset based on its name.
+        Returns:
+            pd.DataFrame: the posterior samples
+        """
+        return STORE_POOL.read(
+            self.location,
+            f"{source_name}_chain",
+            columns,
+            selection=selection,
+        )
 
-        Args:
-            name (str): name of the dataset
+    def _summary_files(self) -> Dict[str, List[str]]:
+        """Returns the sources of each file their posterior samples come
+        from.
 
         Returns:
-            pd.DataFrame: the dataset
+            Dict[str, List[str]]: sources of each file
         """
-        return pd.read_hdf(self.location, key=name)
+        return {self.location: self.get_detections()}
 
     @property
     @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
@@ -336,45 +249,60 @@ class MbhCatalog(GWCatalog):
         self, attr: Union[List[str], str] = None
     ) -> Union[List[str], pd.DataFrame, pd.Series]:
         __doc__ = GWCatalog.get_detections.__doc__  # noqa: F841
-        detections = self.get_dataset("detections")
-        return (
-            list(detections.index) if attr is None else detections[attr].copy()
-        )
-
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def get_attr_detections(self) -> List[str]:
-        __doc__ = GWCatalog.get_attr_detections.__doc__  # noqa: F841
-        return list(self.get_dataset("detections").columns)
-
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def get_median_source(self, attr: str) -> pd.DataFrame:
-        __doc__ = GWCatalog.get_median_source.__doc__  # noqa: F841
-        detections: pd.Series = self.get_detections(attr)
-        source_idx = self.get_detections()[
-            np.argmin(np.abs(np.array(detections) - detections.median()))
-        ]
-        return self.get_detections(self.get_attr_detections()).loc[
-            [source_idx]
-        ]
+        detections = self._get_detections_dataset()
+        if attr is None:
+            return list(detections.index)
+        return self._share(detections[attr])
 
     @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
     def get_source_samples(
-        self, source_name: str, attr: List[str] = None
+        self,
+        source_name: str,
+        attr: List[str] = None,
+        max_samples: Optional[int] = None,
+        stride: Optional[int] = None,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        random_state: Optional[int] = None,
     ) -> pd.DataFrame:
         __doc__ = GWCatalog.get_source_samples.__doc__  # noqa: F841
-        samples = self.get_dataset(f"{source_name}_chain")
-        return samples if attr is None else samples[attr].copy()
+        selection = SampleSelection(
+            start, stop, stride, max_samples, random_state
+        )
+        columns = [attr] if isinstance(attr, str) else attr
+        if self.memmap:
+            packed = PACKED_POOL.read(
+                self.location, source_name, columns, selection
+            )
+            if packed is not None:
+                return self._share_samples(
+                    packed[attr] if isinstance(attr, str) else packed
+                )
+        samples = self._read_chain(source_name, columns, selection)
+        if attr is None and self.dtype_policy is None:
+            return samples
+        return self._share_samples(samples if attr is None else samples[attr])
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    def get_source_samples_many(
+        self,
+        source_names: List[str],
+        attr: Union[List[str], str] = None,
+        as_frame: bool = False,
+    ) -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+        __doc__ = GWCatalog.get_source_samples_many.__doc__  # noqa: F841
+        with STORE_POOL.pinned(self.location):
+            samples: Dict[str, pd.DataFrame] = {
+                source_name: self.get_source_samples(source_name, attr)
+                for source_name in source_names
+            }
+        return self._frame_samples(samples) if as_frame else samples
 
     @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
     def get_attr_source_samples(self, source_name: str) -> List[str]:
         __doc__ = GWCatalog.get_attr_source_samples.__doc__  # noqa: F841
         return list(self.get_dataset(f"{source_name}_chain").columns)
 
-    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
-    def describe_source_samples(self, source_name: str) -> pd.DataFrame:
-        __doc__ = GWCatalog.describe_source_samples.__doc__  # noqa: F841
-        return self.get_source_samples(source_name).describe()
-
     def __repr__(self):
         return f"MbhCatalog({self.__name!r}, {self.__location!r})"
 
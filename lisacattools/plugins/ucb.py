@@ -5,25 +5,31 @@
 # SPDX-License-Identifier: Apache-2.0
 
 """Module implemented the UCB catalog."""
-import glob
 import os
-from itertools import chain
+from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Union
 
-import numpy as np
 import pandas as pd
 
 from ..catalog import GWCatalog
 from ..catalog import GWCatalogs
+from ..lineage import LineageGraph
+from ..manifest import ManifestEntry
+from ..memmap import PACKED_POOL
 from ..monitoring import UtilsMonitoring, LogLevel
+from ..storage import SampleSelection
+from ..storage import STORE_POOL
 from ..utils import CacheManager
+from ..utils import DtypePolicy
+from ..utils import LRUCache
+
 
 class UcbCatalogs(GWCatalogs):
     """Implementation of the UCB catalogs."""
 
-    EXTRA_DIR = "extra_directories"
+    SORT_BY = "Observation Time"
 
     def __init__(
         self,
@@ -45,104 +51,46 @@ class UcbCatalogs(GWCatalogs):
             rejected_pattern (str, optional): pattern to reject files.
             Defaults to "*chain*".
 
+        Note:
+            The `extra_directories`, `cache`, `read_only`, `workers`,
+            `manifest`, `memmap` and `dtype_policy` parameters are described
+            in GWCatalogs.__init__.
+
         Raises:
             ValueError: no files found matching the accepted and rejected
             patterns.
         """
-        self.path = path
-        self.accepted_pattern = accepted_pattern
-        self.rejected_pattern = rejected_pattern
-        self.extra_directories = (
-            kwargs[UcbCatalogs.EXTRA_DIR]
-            if UcbCatalogs.EXTRA_DIR in kwargs
-            else list()
-        )
-        directories = self._search_directories(
-            self.path, self.extra_directories
-        )
-        self.cat_files = self._search_files(
-            directories, accepted_pattern, rejected_pattern
-        )
-        if len(self.cat_files) == 0:
-            raise ValueError(
-                f"no files found matching the accepted \
-                    ({self.accepted_pattern}) and rejected \
-                    ({self.rejected_pattern}) patterns in {directories}"
-            )
-        self.__metadata = pd.concat(
-            [self._read_cats(cat_file) for cat_file in self.cat_files]
-        )
-        self.__metadata = self.__metadata.sort_values(by="Observation Time")
-
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def _search_directories(
-        self, path: str, extra_directories: List[str]
-    ) -> List[str]:
-        """Compute the list of directories on which the pattern will be applied.
+        super().__init__(path, accepted_pattern, rejected_pattern, **kwargs)
+        self._load_catalogs()
 
-        Args:
-            path (str) : main path
-            extra_directories (List[str]) : others directories
+    def _lineage_outdated(
+        self, graph: LineageGraph, names: List[str], metadata: pd.DataFrame
+    ) -> bool:
+        """Checks if the lineage links must be rebuilt after a refresh.
 
-        Returns:
-            List[str]: list of directories on which the pattern will be applied
-        """
-        directories: List[str] = extra_directories[:]
-        directories.append(path)
-        return directories
-
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def _search_files(
-        self, directories: List[str], accepted_pattern, rejected_pattern
-    ) -> List[str]:
-        """Search files in directories according to a set of constraints :
-        accepted and rejected patterns
+        The catalogs sorted after a new catalog get it as parent, so the
+        lineage links are rebuilt when a linked catalog is not among the
+        first catalogs of the set anymore.
 
         Args:
-            directories (List[str]): List of directories to scan
-            accepted_pattern ([type]): pattern to get files
-            rejected_pattern ([type]): pattern to reject files
+            graph (LineageGraph): lineage graph of the set
+            names (List[str]): changed and removed catalogs
+            metadata (pd.DataFrame): metadata of the refreshed set
 
         Returns:
-            List[str]: List of files
+            bool: True when the lineage links must be rebuilt
         """
-        accepted_files = [
-            glob.glob(path + os.path.sep + accepted_pattern)
-            for path in directories
-        ]
-        accepted_files = list(chain(*accepted_files))
-        if rejected_pattern is None:
-            rejected_files = list()
-        else:
-            rejected_files = [
-                list()
-                if rejected_pattern is None
-                else glob.glob(path + os.path.sep + rejected_pattern)
-                for path in directories
-            ]
-        rejected_files = list(chain(*rejected_files))
-        cat_files = list(set(accepted_files) - set(rejected_files))
-        return cat_files
-
-    def _read_cats(self, cat_file: str) -> pd.DataFrame:
-        """Reads the metadata of a given catalog and the location of the file.
-
-        Args:
-            cat_file (str): catalog to load
-            pattern (str) : pattern to be used when the catalog is a tar
-
-        Returns:
-            pd.DataFrame: pandas data frame
-        """
-        df = pd.read_hdf(cat_file, key="metadata")
-        df["location"] = cat_file
-        return df
+        linked = [name in graph for name in metadata.index]
+        # the linked catalogs must stay the first ones of the set
+        return any(name in graph for name in names) or (
+            linked != sorted(linked, reverse=True)
+        )
 
-    @property
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def metadata(self) -> pd.DataFrame:
-        __doc__ = GWCatalogs.metadata.__doc__  # noqa: F841
-        return self.__metadata
+    def _new_catalog(self, name: str, location: str) -> GWCatalog:
+        __doc__ = GWCatalogs._new_catalog.__doc__  # noqa: F841
+        return UcbCatalog(
+            name, location, self.cache, **self._catalog_options(location)
+        )
 
     @property
     @UtilsMonitoring.log_io(level=LogLevel.TRACE)
@@ -167,7 +115,7 @@ class UcbCatalogs(GWCatalogs):
         __doc__ = GWCatalogs.get_first_catalog.__doc__  # noqa: F841
         location = self.metadata.iloc[0]["location"]
         name = self.metadata.index[0]
-        return UcbCatalog(name, location)
+        return self._get_catalog_object(name, location)
 
     @UtilsMonitoring.log_io(level=LogLevel.TRACE)
     @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=10)
@@ -175,7 +123,7 @@ class UcbCatalogs(GWCatalogs):
         __doc__ = GWCatalogs.get_last_catalog.__doc__  # noqa: F841
         location = self.metadata.iloc[self.count - 1]["location"]
         name = self.metadata.index[self.count - 1]
-        return UcbCatalog(name, location)
+        return self._get_catalog_object(name, location)
 
     @UtilsMonitoring.log_io(level=LogLevel.TRACE)
     @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=10)
@@ -183,7 +131,7 @@ class UcbCatalogs(GWCatalogs):
         __doc__ = GWCatalogs.get_catalog.__doc__  # noqa: F841
         location = self.metadata.iloc[idx]["location"]
         name = self.metadata.index[idx]
-        return UcbCatalog(name, location)
+        return self._get_catalog_object(name, location)
 
     @UtilsMonitoring.log_io(level=LogLevel.TRACE)
     @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=10)
@@ -192,15 +140,25 @@ class UcbCatalogs(GWCatalogs):
         cat_idx = self.metadata.index.get_loc(name)
         return self.get_catalog(cat_idx)
 
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def refresh(self) -> List[str]:
+        __doc__ = GWCatalogs.refresh.__doc__  # noqa: F841
+        return self._refresh_files()
+
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
     def get_lineage(self, cat_name: str, src_name: str) -> pd.DataFrame:
-        raise NotImplementedError(
-            "Get_lineage is not implemented for this catalog !"
-        )
+        __doc__ = GWCatalogs.get_lineage.__doc__  # noqa: F841
+        return self._graph_lineage(cat_name, src_name)
 
-    def get_lineage_data(self, lineage: pd.DataFrame) -> pd.DataFrame:
-        raise NotImplementedError(
-            "Get_lineage_data is not implemented for this catalog !"
-        )
+    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
+    def get_lineages(
+        self, cat_name: str, sources: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        __doc__ = GWCatalogs.get_lineages.__doc__  # noqa: F841
+        return self._graph_lineages(cat_name, sources)
 
     def __repr__(self):
         return f"UcbCatalogs({self.path!r}, {self.accepted_pattern!r}, \
@@ -214,24 +172,48 @@ class UcbCatalogs(GWCatalogs):
 class UcbCatalog(GWCatalog):
     """Implementation of the Ucb catalog."""
 
-    def __init__(self, catalog_name: str, location: str):
+    def __init__(
+        self,
+        catalog_name: str,
+        location: str,
+        cache: Optional[LRUCache] = None,
+        read_only: bool = False,
+        manifest: Optional[ManifestEntry] = None,
+        memmap: bool = False,
+        dtype_policy: Optional[DtypePolicy] = None,
+    ):
         """Init the LISA catalog with a name and a location
 
         Args:
             name (str): name of the catalog
             location (str): location of the catalog
+            cache (LRUCache, optional): cache of the posterior samples. The
+            cache shared by all the catalogs is used when None.
+            Defaults to None.
+            read_only (bool, optional): returns read-only views instead of
+            copies of the datasets. Defaults to False.
+            manifest (ManifestEntry, optional): manifest entry of the
+            catalog file, used instead of opening the file when it is up
+            to date. Defaults to None.
+            memmap (bool, optional): reads the posterior samples from the
+            packed files mapped in memory when they are up to date.
+            Defaults to False.
+            dtype_policy (DtypePolicy, optional): compact dtypes of the
+            posterior samples. Defaults to None.
         """
         self.__name = catalog_name
         self.__location = location
-        store = pd.HDFStore(location, "r")
-        self.__datasets = store.keys()
-        store.close()
+        super().__init__(cache, read_only, memmap, dtype_policy, manifest)
 
     @CacheManager.get_cache_pandas(
-        keycache_argument=[1, 2], level=LogLevel.INFO
+        keycache_argument=[1, 2, 3, 4], level=LogLevel.INFO
     )
     def _read_chain_file(
-        self, source_name: str, chain_file: str
+        self,
+        source_name: str,
+        chain_file: str,
+        columns: Optional[List[str]] = None,
+        selection: Optional[SampleSelection] = None,
     ) -> pd.DataFrame:
         """Read a source in a chain_file
 
@@ -239,39 +221,50 @@ class UcbCatalog(GWCatalog):
             source_name (str): Name of the source to extract from the
             chain_file
             chain_file (str): file to load
+            columns (List[str], optional): columns to read. All the columns
+            are read when None. Defaults to None.
+            selection (SampleSelection, optional): rows to read. All the
+            rows are read when None. Defaults to None.
 
         Returns:
-            pd.DataFrame: [description]
+            pd.DataFrame: the posterior samples of the source
         """
         dirname = os.path.dirname(self.location)
         source_samples_file = os.path.join(dirname, chain_file)
-        source_samples = pd.read_hdf(
-            source_samples_file, key=f"{source_name}_chain"
+        source_samples = STORE_POOL.read(
+            source_samples_file,
+            f"{source_name}_chain",
+            columns,
+            selection=selection,
         )
         return source_samples
 
-    @property
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    def datasets(self):
-        """dataset.
+    def _summary_files(self) -> Dict[str, List[str]]:
+        """Returns the sources of each file their posterior samples come
+        from, the catalog file included.
 
-        :getter: Returns the list of datasets
-        :type: List
+        Returns:
+            Dict[str, List[str]]: sources of each file
         """
-        return self.__datasets
-
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=10)
-    def get_dataset(self, name: str) -> pd.DataFrame:
-        """Returns a dataset based on its name.
-
-        Args:
-            name (str): name of the dataset
+        dirname = os.path.dirname(self.location)
+        chain_files = self._get_detections_dataset()["chain file"]
+        files = {self.location: list()}
+        for chain_file, sources in chain_files.groupby(
+            chain_files, sort=False
+        ):
+            files[os.path.join(dirname, chain_file)] = list(sources.index)
+        return files
+
+    def _store_files(self) -> List[str]:
+        """Returns the catalog file and, once the detections are read, the
+        chain files of the catalog.
 
         Returns:
-            pd.DataFrame: the dataset
+            List[str]: location of the files
         """
-        return pd.read_hdf(self.location, key=name)
+        if not self._has_detections():
+            return [self.location]
+        return list(self._summary_files())
 
     @property
     @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
@@ -291,39 +284,79 @@ class UcbCatalog(GWCatalog):
         self, attr: Union[List[str], str] = None
     ) -> Union[List[str], pd.DataFrame, pd.Series]:
         __doc__ = GWCatalog.get_detections.__doc__  # noqa: F841
-        detections = self.get_dataset("detections")
-        return (
-            list(detections.index) if attr is None else detections[attr].copy()
-        )
-
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
-    def get_attr_detections(self) -> List[str]:
-        __doc__ = GWCatalog.get_attr_detections.__doc__  # noqa: F841
-        return list(self.get_dataset("detections").columns)
-
-    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
-    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
-    def get_median_source(self, attr: str) -> pd.DataFrame:
-        __doc__ = GWCatalog.get_median_source.__doc__  # noqa: F841
-        val = self.get_detections(attr)
-        source_idx = self.get_detections()[
-            np.argmin(np.abs(np.array(val) - val.median()))
-        ]
-        return self.get_detections(self.get_attr_detections()).loc[
-            [source_idx]
-        ]
+        detections = self._get_detections_dataset()
+        if attr is None:
+            return list(detections.index)
+        return self._share(detections[attr])
 
     @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
     @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=100)
     def get_source_samples(
-        self, source_name: str, attr: List[str] = None
+        self,
+        source_name: str,
+        attr: List[str] = None,
+        max_samples: Optional[int] = None,
+        stride: Optional[int] = None,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        random_state: Optional[int] = None,
     ) -> pd.DataFrame:
         __doc__ = GWCatalog.get_source_samples.__doc__  # noqa: F841
-        samples: pd.DataFrame = self.get_detections(["chain file"])
-        chain_file: str = samples.loc[source_name]["chain file"]
-        source_samples = self._read_chain_file(source_name, chain_file)
-        return source_samples if attr is None else source_samples[attr].copy()
+        selection = SampleSelection(
+            start, stop, stride, max_samples, random_state
+        )
+        detections = self._get_detections_dataset()
+        chain_file: str = detections.loc[source_name, "chain file"]
+        columns = [attr] if isinstance(attr, str) else attr
+        if self.memmap:
+            packed = PACKED_POOL.read(
+                os.path.join(os.path.dirname(self.location), chain_file),
+                source_name,
+                columns,
+                selection,
+            )
+            if packed is not None:
+                return self._share_samples(
+                    packed[attr] if isinstance(attr, str) else packed
+                )
+        source_samples = self._read_chain_file(
+            source_name, chain_file, columns, selection
+        )
+        if attr is None and self.dtype_policy is None:
+            return source_samples
+        return self._share_samples(
+            source_samples if attr is None else source_samples[attr]
+        )
+
+    @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
+    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG, threshold_in_ms=1000)
+    def get_source_samples_many(
+        self,
+        source_names: List[str],
+        attr: Union[List[str], str] = None,
+        as_frame: bool = False,
+    ) -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+        __doc__ = GWCatalog.get_source_samples_many.__doc__  # noqa: F841
+        detections = self._get_detections_dataset()
+        chain_files: pd.Series = detections.loc[
+            list(source_names), "chain file"
+        ]
+        samples: Dict[str, pd.DataFrame] = dict()
+        for chain_file, sources in chain_files.groupby(
+            chain_files, sort=False
+        ):
+            source_samples_file = os.path.join(
+                os.path.dirname(self.location), chain_file
+            )
+            with STORE_POOL.pinned(source_samples_file):
+                for source_name in sources.index:
+                    samples[source_name] = self.get_source_samples(
+                        source_name, attr
+                    )
+        samples = {
+            source_name: samples[source_name] for source_name in source_names
+        }
+        return self._frame_samples(samples) if as_frame else samples
 
     @UtilsMonitoring.log_io(level=LogLevel.DEBUG)
     @UtilsMonitoring.time_spent(level=LogLevel.DEBUG)
@@ -331,12 +364,6 @@ class UcbCatalog(GWCatalog):
         __doc__ = GWCatalog.get_attr_source_samples.__doc__  # noqa: F841
         return list(self.get_source_samples(source_name).columns)
 
-    @UtilsMonitoring.log_io(level=LogLevel.TRACE)
-    @UtilsMonitoring.time_spent(level=LogLevel.DEBUG)
-    def describe_source_samples(self, source_name: str) -> pd.DataFrame:
-        __doc__ = GWCatalog.describe_source_samples.__doc__  # noqa: F841
-        return self.get_source_samples(source_name).describe()
-
     def __repr__(self):
         return f"UcbCatalog({self.__name!r}, {self.__location!r})"
 
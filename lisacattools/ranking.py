@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""This module handles the ranked attributes of the detections. It is
+responsible for :
+- sorting the values of an attribute of the detections once
+- answering the quantile, top-k and range lookups by binary search on the
+  sorted values
+
+The missing values (NaN) are not ranked. The sources with equal values are
+ranked in the order of the detections.
+"""
+
+import threading
+from typing import Dict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class RankedAttribute:
+    """Values of an attribute of the detections, sorted once."""
+
+    def __init__(self, values: pd.Series):
+        """Init the ranking by sorting the values.
+
+        Args:
+            values (pd.Series): values of the attribute for each detection
+
+        Raises:
+            TypeError: the attribute is not numerical
+        """
+        if not pd.api.types.is_numeric_dtype(values):
+            raise TypeError(f"{values.name} is not a numerical attribute")
+        array = values.to_numpy(dtype="float64")
+        valid = np.flatnonzero(~np.isnan(array))
+        #: position in the detections of each rank
+        self.positions = valid[np.argsort(array[valid], kind="stable")]
+        #: sorted values
+        self.values = array[self.positions]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def quantile(self, q: float) -> float:
+        """Returns the quantile of the values, interpolated linearly as
+        `pd.Series.quantile` (and as `pd.Series.median` for 0.5).
+
+        Args:
+            q (float): quantile, between 0 and 1
+
+        Raises:
+            ValueError: q out of [0, 1] or no value ranked
+
+        Returns:
+            float: the quantile
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"q must be in [0, 1], got {q}")
+        if len(self) == 0:
+            raise ValueError("No value ranked")
+        rank = (len(self) - 1) * q
+        low = int(np.floor(rank))
+        high = low + (1 if rank == low else 2)
+        window = self.values[low:high]
+        return float(
+            np.median(window) if q == 0.5 else np.quantile(window, rank - low)
+        )
+
+    def closest(self, value: float) -> int:
+        """Returns the position in the detections of the value closest to a
+        value. The first detection wins a tie, as with `np.argmin`.
+
+        Args:
+            value (float): value to look up
+
+        Returns:
+            int: position in the detections
+        """
+        rank = int(np.searchsorted(self.values, value))
+        candidates = [
+            # first rank of a run of equal values: first detection of the run
+            int(np.searchsorted(self.values, self.values[idx]))
+            for idx in (rank - 1, rank)
+            if 0 <= idx < len(self)
+        ]
+        return min(
+            (abs(self.values[idx] - value), self.positions[idx])
+            for idx in candidates
+        )[1]
+
+    def top(self, k: int, largest: bool = True) -> np.ndarray:
+        """Returns the positions in the detections of the k largest (or
+        smallest) values, the largest (smallest) first.
+
+        Args:
+            k (int): number of values
+            largest (bool, optional): returns the largest values instead of
+            the smallest. Defaults to True.
+
+        Raises:
+            ValueError: k lower than 0
+
+        Returns:
+            np.ndarray: positions in the detections
+        """
+        if k < 0:
+            raise ValueError(f"k must be >= 0, got {k}")
+        if not largest:
+            return self.positions[:k]
+        if k == 0:
+            return self.positions[:0]
+        start = max(len(self) - k, 0)
+        # the whole run of values equal to the smallest value kept, so that
+        # its first detections are kept
+        start = np.searchsorted(self.values, self.values[start])
+        positions = self.positions[start:]
+        order = np.lexsort((positions, -self.values[start:]))
+        return positions[order[:k]]
+
+    def between(
+        self, low: Optional[float] = None, high: Optional[float] = None
+    ) -> np.ndarray:
+        """Returns the positions in the detections of the values in
+        [low, high], in increasing order of the values.
+
+        Args:
+            low (float, optional): lower bound. Unbounded when None.
+            Defaults to None.
+            high (float, optional): upper bound. Unbounded when None.
+            Defaults to None.
+
+        Returns:
+            np.ndarray: positions in the detections
+        """
+        start = 0 if low is None else np.searchsorted(self.values, low)
+        stop = (
+            len(self)
+            if high is None
+            else np.searchsorted(self.values, high, side="right")
+        )
+        return self.positions[start:stop]
+
+
+class RankedIndex:
+    """Ranked attributes of the detections of a catalog.
+
+    An attribute is ranked on its first lookup. The rankings are dropped when
+    the catalog gives another detections dataset (the file has changed).
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__detections: Optional[pd.DataFrame] = None
+        self.__attributes: Dict[str, RankedAttribute] = dict()
+
+    def get(self, detections: pd.DataFrame, attr: str) -> RankedAttribute:
+        """Returns the ranking of an attribute of the detections.
+
+        Args:
+            detections (pd.DataFrame): detections dataset of the catalog
+            attr (str): attribute name
+
+        Raises:
+            KeyError: the attribute does not exist
+            TypeError: the attribute is not numerical
+
+        Returns:
+            RankedAttribute: the ranking
+        """
+        with self.__lock:
+            if detections is not self.__detections:
+                self.__detections = detections
+                self.__attributes = dict()
+            if attr not in self.__attributes:
+                self.__attributes[attr] = RankedAttribute(detections[attr])
+            return self.__attributes[attr]
+
+    def clear(self):
+        """Drops the rankings."""
+        with self.__lock:
+            self.__detections = None
+            self.__attributes = dict()
@@ -0,0 +1,649 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""This module handles the access to the HDF5 files of the catalogs. It is
+responsible for :
+- keeping the HDF5 stores open between two reads
+- closing the least recently used stores when too many files are open
+- reading a window or a thinned subset of the rows of a dataset
+"""
+
+import atexit
+import math
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import pandas as pd
+import tables
+from loguru import logger
+
+from .monitoring import LogLevel
+
+
+def file_fingerprint(path: str) -> Tuple[int, int]:
+    """Returns the modification time and the size of a file.
+
+    Two different fingerprints mean that the file has changed.
+
+    Args:
+        path (str): location of the file
+
+    Returns:
+        Tuple[int, int]: modification time in ns and size in bytes
+    """
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass(frozen=True)
+class SampleSelection:
+    """Rows of the posterior samples to read.
+
+    The rows are selected in this order: the window [start:stop] (with the
+    semantics of a Python slice), every `stride`-th row of the window and at
+    most `max_samples` of these rows. The `max_samples` rows are evenly
+    spaced, or drawn at random without replacement when `random_state` is
+    set, so that the same seed always selects the same rows.
+    """
+
+    start: Optional[int] = None
+    stop: Optional[int] = None
+    stride: Optional[int] = None
+    max_samples: Optional[int] = None
+    random_state: Optional[int] = None
+
+    def __post_init__(self):
+        if self.stride is not None and self.stride < 1:
+            raise ValueError(f"stride must be >= 1, got {self.stride}")
+        if self.max_samples is not None and self.max_samples < 1:
+            raise ValueError(
+                f"max_samples must be >= 1, got {self.max_samples}"
+            )
+
+    @property
+    def is_full(self) -> bool:
+        """Selection of all the rows.
+
+        :getter: Returns True when all the rows are selected
+        :type: bool
+        """
+        return (
+            self.start is None
+            and self.stop is None
+            and self.stride in (None, 1)
+            and self.max_samples is None
+        )
+
+    def rows(self, nrows: int) -> Union[slice, np.ndarray]:
+        """Returns the selected rows of a dataset.
+
+        Args:
+            nrows (int): number of rows of the dataset
+
+        Returns:
+            Union[slice, np.ndarray]: a slice with a positive step, or the
+            sorted positions of the rows drawn at random
+        """
+        window = slice(self.start, self.stop, self.stride)
+        start, stop, step = window.indices(nrows)
+        count = len(range(start, stop, step))
+        if self.max_samples is None or count <= self.max_samples:
+            return slice(start, stop, step)
+        if self.random_state is None:
+            step *= math.ceil(count / self.max_samples)
+            return slice(start, stop, step)
+        rng = np.random.default_rng(self.random_state)
+        picked = rng.choice(count, self.max_samples, replace=False)
+        return start + step * np.sort(picked)
+
+
+#: Attribute of the HDF5 group of a dataset written in the columnar layout
+COLUMNAR_ATTRIBUTE = "lisacattools_columns"
+
+
+def is_columnar(store: pd.HDFStore, key: str) -> bool:
+    """Checks if a dataset is written in the columnar layout.
+
+    In the columnar layout, a dataset is an HDF5 group holding one table
+    per column, named c0, c1, ... The names of the columns are stored in
+    the COLUMNAR_ATTRIBUTE attribute of the group. Reading a column only
+    reads its own table.
+
+    Args:
+        store (pd.HDFStore): open store
+        key (str): name of the dataset
+
+    Returns:
+        bool: True when the dataset is written in the columnar layout
+    """
+    node = store.get_node(key)
+    return node is not None and COLUMNAR_ATTRIBUTE in node._v_attrs
+
+
+def dataset_nrows(store: pd.HDFStore, key: str) -> int:
+    """Returns the number of rows of a dataset without reading it.
+
+    Args:
+        store (pd.HDFStore): open store
+        key (str): name of the dataset
+
+    Returns:
+        int: number of rows
+    """
+    if is_columnar(store, key):
+        return store.get_storer(f"{key}/c0").nrows
+    storer = store.get_storer(key)
+    return storer.nrows if storer.is_table else storer.shape[0]
+
+
+def read_dataset(
+    store: pd.HDFStore,
+    key: str,
+    columns: Optional[List[str]] = None,
+    selection: Optional[SampleSelection] = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """Reads a dataset, selecting the columns in the file when possible.
+
+    The columns are selected in the file for the table format and the
+    columnar layout. They are selected after reading the whole dataset for
+    the fixed format. The rows of a selection are always selected in the
+    file (see read_rows).
+
+    Args:
+        store (pd.HDFStore): open store
+        key (str): name of the dataset
+        columns (List[str], optional): columns to read. All the columns are
+        read when None. Defaults to None.
+        selection (SampleSelection, optional): rows to read. All the rows
+        are read when None. Defaults to None.
+        kwargs: extra arguments of pd.HDFStore.select
+
+    Raises:
+        KeyError: the dataset does not exist
+
+    Returns:
+        pd.DataFrame: the dataset
+    """
+    if selection is not None and not selection.is_full:
+        rows = selection.rows(dataset_nrows(store, key))
+        return read_rows(store, key, rows, columns, **kwargs)
+    if is_columnar(store, key):
+        names = list(store.get_node(key)._v_attrs[COLUMNAR_ATTRIBUTE])
+        selected = names if columns is None else columns
+        missing = set(selected) - set(names)
+        if missing:
+            raise KeyError(f"{sorted(missing)} not in {key}")
+        return pd.concat(
+            [
+                store.select(f"{key}/c{names.index(name)}", **kwargs)
+                for name in selected
+            ],
+            axis=1,
+        )
+    if columns is not None and not store.get_storer(key).is_table:
+        return store.select(key, **kwargs)[columns]
+    return store.select(key, columns=columns, **kwargs)
+
+
+def read_fixed_rows(
+    store: pd.HDFStore,
+    key: str,
+    rows: slice,
+    columns: Optional[List[str]] = None,
+) -> Optional[pd.DataFrame]:
+    """Reads the rows of a slice of a DataFrame written in the fixed format,
+    slicing the PyTables arrays of the index and of the blocks with the step
+    of the slice.
+
+    Only the frames of numeric blocks with a numeric index are read this
+    way, the other layouts are decoded by pandas.
+
+    Args:
+        store (pd.HDFStore): open store
+        key (str): name of the dataset
+        rows (slice): slice with explicit bounds and a positive step
+        columns (List[str], optional): columns to read. All the columns are
+        read when None. Defaults to None.
+
+    Returns:
+        Optional[pd.DataFrame]: the rows, None when the dataset is not a
+        frame of numeric arrays
+    """
+    storer = store.get_storer(key)
+    if storer.pandas_type != "frame" or (
+        storer.attrs.axis1_variety != "regular"
+    ):
+        return None
+    index_node = storer.group.axis1
+    nodes = [
+        getattr(storer.group, f"block{idx}_values")
+        for idx in range(storer.nblocks)
+    ]
+    if index_node._v_attrs.kind not in ("integer", "float") or not all(
+        _is_plain_array(node) for node in nodes
+    ):
+        return None
+    # the index read without rows gives its name and its dtype
+    empty = storer.read_index("axis1", start=0, stop=0)
+    index = pd.Index(index_node[rows], dtype=empty.dtype, name=empty.name)
+    items = storer.read_index("axis0")
+    selected = items if columns is None else pd.Index(columns)
+    blocks = [pd.DataFrame(index=index)]
+    for idx, node in enumerate(nodes):
+        block_items = storer.read_index(f"block{idx}_items")
+        if block_items.isin(selected).any():
+            blocks.append(
+                pd.DataFrame(node[rows], index=index, columns=block_items)
+            )
+    return pd.concat(blocks, axis=1)[list(selected)]
+
+
+def _is_plain_array(node) -> bool:
+    """Checks if a PyTables node is a numeric array stored row by row,
+    without attributes to decode its values."""
+    return (
+        type(node) is tables.Array
+        and node.dtype.kind in "biuf"
+        and set(node._v_attrs._f_list()) == {"transposed"}
+        and bool(node._v_attrs.transposed)
+    )
+
+
+def read_rows(
+    store: pd.HDFStore,
+    key: str,
+    rows: Union[slice, np.ndarray],
+    columns: Optional[List[str]] = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """Reads rows of a dataset.
+
+    A slice with a step of 1 is read as the contiguous block of rows from
+    its start to its stop. The other rows are read by coordinates for the
+    table format and the columnar layout. For the fixed format, the rows
+    of a slice are read by slicing the PyTables arrays with the step (see
+    read_fixed_rows), and the rows given by position as the block from the
+    first to the last row.
+
+    Args:
+        store (pd.HDFStore): open store
+        key (str): name of the dataset
+        rows (Union[slice, np.ndarray]): slice with explicit bounds and a
+        positive step, or sorted positions of the rows
+        columns (List[str], optional): columns to read. All the columns are
+        read when None. Defaults to None.
+        kwargs: extra arguments of pd.HDFStore.select
+
+    Returns:
+        pd.DataFrame: the rows
+    """
+    if isinstance(rows, slice) and (
+        rows.step in (None, 1) or rows.start >= rows.stop
+    ):
+        return read_dataset(
+            store, key, columns, start=rows.start, stop=rows.stop, **kwargs
+        )
+    if is_columnar(store, key) or store.get_storer(key).is_table:
+        if isinstance(rows, slice):
+            rows = np.arange(rows.start, rows.stop, rows.step)
+        return read_dataset(
+            store, key, columns, where=pd.Index(rows), **kwargs
+        )
+    if isinstance(rows, slice):
+        data = read_fixed_rows(store, key, rows, columns)
+        if data is not None:
+            return data
+        rows = np.arange(rows.start, rows.stop, rows.step)
+    start = int(rows[0])
+    data = read_dataset(
+        store, key, columns, start=start, stop=int(rows[-1]) + 1, **kwargs
+    )
+    return data.iloc[rows - start]
+
+
+def list_datasets(store: pd.HDFStore) -> List[str]:
+    """Returns the name of the datasets of a store.
+
+    The tables of a dataset written in the columnar layout are replaced by
+    the name of the dataset.
+
+    Args:
+        store (pd.HDFStore): open store
+
+    Returns:
+        List[str]: name of the datasets
+    """
+    datasets: List[str] = list()
+    groups: dict = dict()
+    for key in store.keys():
+        group = key.rsplit("/", 1)[0]
+        if group not in groups:
+            groups[group] = group != "" and is_columnar(store, group)
+        name = group if groups[group] else key
+        if name not in datasets:
+            datasets.append(name)
+    return datasets
+
+
+class HDFStorePool:
+    """Pool of read-only HDF5 stores shared by the catalogs.
+
+    The stores are kept open after a read and the least recently used ones
+    are closed when more than `max_size` files are open. A store is never
+    closed while another thread is reading it and is reopened when the file
+    has changed on disk.
+
+    The pool can be used as a context manager, all stores are closed when
+    leaving the context::
+
+        with HDFStorePool(max_size=8) as pool:
+            detections = pool.read("cat.h5", "detections")
+    """
+
+    DEFAULT_MAX_SIZE = 32
+
+    class _Entry:
+        """Open store, its fingerprint and the lock serializing the reads on
+        it."""
+
+        def __init__(self, store: pd.HDFStore, fingerprint: Tuple[int, int]):
+            self.store = store
+            self.fingerprint = fingerprint
+            self.lock = threading.RLock()
+            self.pins = 0
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        """Init the pool.
+
+        Args:
+            max_size (int, optional): maximum number of open stores.
+            Defaults to DEFAULT_MAX_SIZE.
+
+        Raises:
+            ValueError: max_size is lower than 1
+        """
+        self.__lock = threading.RLock()
+        self.__entries: "OrderedDict[str, HDFStorePool._Entry]" = OrderedDict()
+        self.__keys: Dict[str, Tuple[Tuple[int, int], List[str]]] = dict()
+        self.__stats = {"opens": 0, "reads": 0, "evictions": 0}
+        self.max_size = max_size
+
+    @property
+    def max_size(self) -> int:
+        """Maximum number of open stores.
+
+        :getter: Returns the maximum number of open stores
+        :setter: Sets the maximum number of open stores and closes the least
+            recently used stores above this limit
+        :type: int
+        """
+        return self.__max_size
+
+    @max_size.setter
+    def max_size(self, value: int):
+        if value < 1:
+            raise ValueError(f"max_size must be >= 1, got {value}")
+        with self.__lock:
+            self.__max_size = value
+            evicted = self._evict()
+        self._close_entries(evicted)
+
+    def _evict(self) -> List["HDFStorePool._Entry"]:
+        """Removes the least recently used stores above max_size from the
+        pool. Must be called with the pool lock held.
+
+        The pinned stores are never removed, so the pool may exceed max_size
+        while they are pinned.
+
+        Returns:
+            List[HDFStorePool._Entry]: the removed stores, to close with
+            _close_entries once the pool lock is released
+        """
+        unpinned = [
+            path for path, entry in self.__entries.items() if entry.pins == 0
+        ]
+        evicted = list()
+        for path in unpinned[: max(len(self.__entries) - self.__max_size, 0)]:
+            evicted.append(self.__entries.pop(path))
+            self.__stats["evictions"] += 1
+            logger.log(LogLevel.DEBUG, f"Evicted HDF5 store {path}")
+        return evicted
+
+    @staticmethod
+    def _close_entries(entries: List["HDFStorePool._Entry"]):
+        """Closes stores removed from the pool.
+
+        Each store is closed once the reads running on it are done. It must
+        be called without the pool lock, so that a slow read only delays the
+        closing of its own store.
+
+        Args:
+            entries (List[HDFStorePool._Entry]): stores to close
+        """
+        for entry in entries:
+            with entry.lock:
+                entry.store.close()
+
+    @property
+    def stats(self) -> dict:
+        """Statistics of the pool.
+
+        :getter: Returns the number of opens, reads and evictions
+        :type: dict
+        """
+        with self.__lock:
+            return dict(self.__stats)
+
+    def _acquire(self, path: str) -> "HDFStorePool._Entry":
+        """Returns the entry of a store, opening it when needed.
+
+        The file is opened outside of the pool lock so that slow opens do
+        not block the reads of the other stores.
+
+        Args:
+            path (str): location of the HDF5 file
+
+        Returns:
+            HDFStorePool._Entry: the open store and its lock
+        """
+        fingerprint = file_fingerprint(path)
+        with self.__lock:
+            entry = self.__entries.get(path)
+            if entry is not None and entry.fingerprint == fingerprint:
+                self.__entries.move_to_end(path)
+                return entry
+        store = pd.HDFStore(path, "r")
+        with self.__lock:
+            entry = self.__entries.get(path)
+            if entry is not None and entry.fingerprint == fingerprint:
+                store.close()
+                self.__entries.move_to_end(path)
+                return entry
+            # the store of the previous version of the file is closed too
+            evicted = [] if entry is None else [entry]
+            logger.log(LogLevel.DEBUG, f"Opened HDF5 store {path}")
+            entry = HDFStorePool._Entry(store, fingerprint)
+            self.__entries[path] = entry
+            self.__entries.move_to_end(path)
+            self.__stats["opens"] += 1
+            evicted.extend(self._evict())
+        self._close_entries(evicted)
+        return entry
+
+    def _run(self, path: str, func):
+        """Runs a function on an open store while holding its lock.
+
+        Args:
+            path (str): location of the HDF5 file
+            func (Callable[[pd.HDFStore], object]): function to run
+
+        Returns:
+            object: the result of the function
+        """
+        while True:
+            entry = self._acquire(path)
+            with entry.lock:
+                # the store may have been evicted between the two locks
+                if entry.store.is_open:
+                    return func(entry.store)
+
+    def read(
+        self,
+        path: str,
+        key: str,
+        columns: Optional[List[str]] = None,
+        **kwargs,
+    ) -> pd.DataFrame:
+        """Reads a dataset from an HDF5 file.
+
+        The columns are selected when reading the file if the layout of the
+        dataset allows it, the rows of a selection are always selected when
+        reading the file (see read_dataset).
+
+        Args:
+            path (str): location of the HDF5 file
+            key (str): name of the dataset
+            columns (List[str], optional): columns to read. All the columns
+            are read when None. Defaults to None.
+            kwargs: extra arguments of read_dataset (e.g. selection)
+
+        Returns:
+            pd.DataFrame: the dataset
+        """
+        with self.__lock:
+            self.__stats["reads"] += 1
+        return self._run(
+            path, lambda store: read_dataset(store, key, columns, **kwargs)
+        )
+
+    def read_rows(
+        self,
+        path: str,
+        key: str,
+        rows: Union[slice, np.ndarray],
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """Reads rows of a dataset from an HDF5 file (see read_rows).
+
+        Args:
+            path (str): location of the HDF5 file
+            key (str): name of the dataset
+            rows (Union[slice, np.ndarray]): slice with explicit bounds and
+            a positive step, or sorted positions of the rows
+            columns (List[str], optional): columns to read. All the columns
+            are read when None. Defaults to None.
+
+        Returns:
+            pd.DataFrame: the rows
+        """
+        with self.__lock:
+            self.__stats["reads"] += 1
+        return self._run(
+            path, lambda store: read_rows(store, key, rows, columns)
+        )
+
+    def keys(self, path: str) -> List[str]:
+        """Returns the name of the datasets of an HDF5 file.
+
+        The datasets written in the columnar layout are listed once. The
+        listing is kept until the file changes on disk, even when the store
+        is closed, so that the group tree of a file is walked only once.
+
+        Args:
+            path (str): location of the HDF5 file
+
+        Returns:
+            List[str]: name of the datasets
+        """
+        fingerprint = file_fingerprint(path)
+        with self.__lock:
+            cached = self.__keys.get(path)
+        if cached is None or cached[0] != fingerprint:
+            cached = (fingerprint, self._run(path, list_datasets))
+            with self.__lock:
+                self.__keys[path] = cached
+        return list(cached[1])
+
+    @contextmanager
+    def pinned(self, path: str) -> Iterator[None]:
+        """Keeps a store open while reading several datasets of the file.
+
+        The store is not evicted until the end of the context, whatever the
+        number of stores opened meanwhile::
+
+            with STORE_POOL.pinned(chain_file):
+                for key in keys:
+                    STORE_POOL.read(chain_file, key)
+
+        Args:
+            path (str): location of the HDF5 file
+        """
+        entry = self._acquire(path)
+        with self.__lock:
+            entry.pins += 1
+        try:
+            yield
+        finally:
+            with self.__lock:
+                entry.pins -= 1
+                evicted = self._evict()
+            self._close_entries(evicted)
+
+    def close(self, path: Optional[str] = None):
+        """Closes a store or all the stores of the pool.
+
+        Args:
+            path (str, optional): location of the HDF5 file to close. All
+            the stores are closed when None. Defaults to None.
+        """
+        with self.__lock:
+            paths = list(self.__entries) if path is None else [path]
+            entries = [self.__entries.pop(name, None) for name in paths]
+        self._close_entries([entry for entry in entries if entry is not None])
+
+    def forget(self):
+        """Drops the stores of the pool without closing them.
+
+        A forked process inherits the HDF5 handles of its parent: closing
+        them would flush the parent's handles, so the child forgets them and
+        opens its own ones.
+        """
+        self.__lock = threading.RLock()
+        self.__entries = OrderedDict()
+        self.__keys = dict()
+
+    def __contains__(self, path: str) -> bool:
+        with self.__lock:
+            return path in self.__entries
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__entries)
+
+    def __enter__(self) -> "HDFStorePool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f"HDFStorePool(max_size={self.max_size!r})"
+
+
+#: Pool shared by all the catalogs
+STORE_POOL = HDFStorePool()
+atexit.register(STORE_POOL.close)
@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""This module handles the summaries of the posterior samples of the sources.
+It is responsible for :
+- summarizing the posterior samples of each source of a catalog (count, mean,
+  std, quantiles and covariance) in one table
+- keeping the table in a file next to the catalog, with the fingerprints of
+  the files the samples come from, so that only the sources of the files
+  that have changed are summarized again
+
+The table is indexed by (Source, Statistic) with one column per attribute,
+so that the summary of a source has the layout of `pd.DataFrame.describe`::
+
+    summaries = catalog.get_summaries()
+    snr = summaries.xs("mean", level="Statistic")["SNR"]
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import pandas as pd
+from loguru import logger
+
+from .monitoring import LogLevel
+from .storage import file_fingerprint
+from .storage import STORE_POOL
+
+#: Extension of the summary files (HDF5 files, not matched by the
+#: patterns of the catalog files)
+SUMMARY_EXTENSION = ".summary"
+#: Quantiles of the summaries
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+#: Quantiles always summarized, so that describe is served from the table
+QUARTILES = (0.25, 0.5, 0.75)
+
+#: Summary and covariance of the posterior samples of a source
+SourceSummary = Tuple[pd.DataFrame, pd.DataFrame]
+
+
+def summary_location(path: str, name: Optional[str] = None) -> str:
+    """Returns the location of the summary file of a catalog file.
+
+    Args:
+        path (str): location of the catalog file
+        name (str, optional): name of the catalog, for the files holding
+        several catalogs. Defaults to None.
+
+    Returns:
+        str: location of the summary file
+    """
+    stem = os.path.splitext(path)[0]
+    return stem + ("" if name is None else f"_{name}") + SUMMARY_EXTENSION
+
+
+def _fingerprints(files: Dict[str, List[str]]) -> Dict[str, Tuple[int, int]]:
+    return {os.path.normpath(path): file_fingerprint(path) for path in files}
+
+
+def summarize_samples(
+    samples: pd.DataFrame, quantiles: Tuple[float, ...] = DEFAULT_QUANTILES
+) -> SourceSummary:
+    """Summarizes the numerical attributes of the posterior samples.
+
+    Args:
+        samples (pd.DataFrame): posterior samples of a source
+        quantiles (Tuple[float, ...], optional): quantiles to compute, in
+        addition to the quartiles. Defaults to DEFAULT_QUANTILES.
+
+    Returns:
+        SourceSummary: the statistics of `describe` for the quantiles and the
+        covariance of the attributes
+    """
+    numerical = samples.select_dtypes("number").astype("float64")
+    percentiles = sorted(set(quantiles) | set(QUARTILES))
+    return numerical.describe(percentiles=percentiles), numerical.cov()
+
+
+def summarize_sources(
+    catalog,
+    sources: List[str],
+    quantiles: Tuple[float, ...] = DEFAULT_QUANTILES,
+    workers: Optional[int] = 1,
+) -> Dict[str, SourceSummary]:
+    """Summarizes the posterior samples of sources of a catalog.
+
+    Args:
+        catalog (GWCatalog): catalog
+        sources (List[str]): source names
+        quantiles (Tuple[float, ...], optional): quantiles to compute, in
+        addition to the quartiles. Defaults to DEFAULT_QUANTILES.
+        workers (int, optional): number of processes, see map_sources.
+        Defaults to 1.
+
+    Returns:
+        Dict[str, SourceSummary]: the summary of each source
+    """
+    results = catalog.map_sources(
+        partial(summarize_samples, quantiles=quantiles),
+        sources,
+        workers=workers,
+    )
+    return results.iloc[:, 0].to_dict()
+
+
+@dataclass
+class SummaryTable:
+    """Summaries of the posterior samples of the sources of a catalog."""
+
+    #: statistics indexed by (Source, Statistic)
+    statistics: pd.DataFrame
+    #: covariance of the attributes indexed by (Source, Attribute)
+    covariance: pd.DataFrame
+    #: fingerprint of each file the samples come from
+    fingerprints: Dict[str, Tuple[int, int]]
+    #: quantiles of the statistics
+    quantiles: Tuple[float, ...]
+
+    @staticmethod
+    def from_summaries(
+        summaries: Dict[str, SourceSummary],
+        fingerprints: Dict[str, Tuple[int, int]],
+        quantiles: Tuple[float, ...],
+    ) -> "SummaryTable":
+        """Assembles the summaries of the sources in a table.
+
+        Args:
+            summaries (Dict[str, SourceSummary]): summary of each source
+            fingerprints (Dict[str, Tuple[int, int]]): fingerprint of each
+            file the samples come from
+            quantiles (Tuple[float, ...]): quantiles of the summaries
+
+        Returns:
+            SummaryTable: the table
+        """
+
+        def _concat(frames: Dict[str, pd.DataFrame], level: str):
+            if not frames:
+                return pd.DataFrame(
+                    index=pd.MultiIndex.from_tuples(
+                        [], names=["Source", level]
+                    )
+                )
+            return pd.concat(frames, names=["Source", level])
+
+        return SummaryTable(
+            _concat({k: v[0] for k, v in summaries.items()}, "Statistic"),
+            _concat({k: v[1] for k, v in summaries.items()}, "Attribute"),
+            fingerprints,
+            tuple(quantiles),
+        )
+
+    @property
+    def sources(self) -> List[str]:
+        """Summarized sources.
+
+        :getter: Returns the name of the summarized sources
+        :type: List[str]
+        """
+        return list(self.statistics.index.unique("Source"))
+
+    def get(self, source_name: str) -> SourceSummary:
+        """Returns the summary of a source, restricted to its attributes.
+
+        Args:
+            source_name (str): name of the source
+
+        Raises:
+            KeyError: the source is not summarized
+
+        Returns:
+            SourceSummary: the statistics and the covariance of the source
+        """
+        statistics = self.statistics.loc[source_name]
+        attributes = statistics.columns[statistics.loc["count"].notna()]
+        covariance = self.covariance.loc[source_name]
+        return (
+            statistics[attributes].rename_axis(index=None),
+            covariance.loc[attributes, attributes].rename_axis(index=None),
+        )
+
+    def unchanged(
+        self, files: Dict[str, List[str]]
+    ) -> Dict[str, SourceSummary]:
+        """Returns the summaries of the sources of the files that are
+        unchanged since the table was built.
+
+        Args:
+            files (Dict[str, List[str]]): sources of each file the samples
+            come from
+
+        Returns:
+            Dict[str, SourceSummary]: summary of each source
+        """
+        known = set(self.sources)
+        unchanged = [
+            path
+            for path, fingerprint in _fingerprints(files).items()
+            if self.fingerprints.get(path) == fingerprint
+        ]
+        return {
+            name: self.get(name)
+            for path in files
+            if os.path.normpath(path) in unchanged
+            for name in files[path]
+            if name in known
+        }
+
+    def describe(self, source_name: str) -> pd.DataFrame:
+        """Returns the summary of a source as `pd.DataFrame.describe`.
+
+        Args:
+            source_name (str): name of the source
+
+        Raises:
+            KeyError: the source is not summarized
+
+        Returns:
+            pd.DataFrame: count, mean, std, min, quartiles and max
+        """
+        statistics = self.get(source_name)[0]
+        rows = ["count", "mean", "std", "min"]
+        rows += [f"{q:.0%}" for q in QUARTILES] + ["max"]
+        return statistics.loc[rows]
+
+    @staticmethod
+    def read(path: str) -> Optional["SummaryTable"]:
+        """Reads the table of a summary file.
+
+        Args:
+            path (str): location of the summary file
+
+        Returns:
+            Optional[SummaryTable]: the table, None when the file does not
+            exist
+        """
+        if not os.path.exists(path):
+            return None
+        dirname = os.path.dirname(path)
+        fingerprints = STORE_POOL.read(path, "fingerprints")
+        return SummaryTable(
+            STORE_POOL.read(path, "statistics"),
+            STORE_POOL.read(path, "covariance"),
+            {
+                os.path.normpath(os.path.join(dirname, name)): (
+                    int(row["mtime_ns"]),
+                    int(row["size"]),
+                )
+                for name, row in fingerprints.iterrows()
+            },
+            tuple(STORE_POOL.read(path, "quantiles")),
+        )
+
+    def write(self, path: str):
+        """Writes the table in a summary file.
+
+        The location of the files the samples come from are stored relative
+        to the summary file.
+
+        Args:
+            path (str): location of the summary file
+        """
+        dirname = os.path.dirname(path)
+        fingerprints = pd.DataFrame.from_dict(
+            {
+                os.path.relpath(name, dirname): fingerprint
+                for name, fingerprint in self.fingerprints.items()
+            },
+            orient="index",
+            columns=["mtime_ns", "size"],
+        )
+        STORE_POOL.close(path)
+        with pd.HDFStore(path, "w") as store:
+            store.put("statistics", self.statistics)
+            store.put("covariance", self.covariance)
+            store.put("fingerprints", fingerprints)
+            store.put("quantiles", pd.Series(self.quantiles, dtype="float64"))
+
+
+def _summaries(
+    table: Optional[SummaryTable],
+    files: Dict[str, List[str]],
+    summarize: Callable[[List[str]], Dict[str, SourceSummary]],
+) -> Dict[str, SourceSummary]:
+    """Returns the summary of each source, taken from the table when its file
+    is unchanged and summarized otherwise."""
+    summaries = dict() if table is None else table.unchanged(files)
+    names = [name for sources in files.values() for name in sources]
+    missing = [name for name in names if name not in summaries]
+    summaries.update(summarize(missing) if missing else dict())
+    return {name: summaries[name] for name in names}
+
+
+class SummaryCache:
+    """Summary table of a catalog, kept in memory and in a summary file next
+    to the catalog.
+
+    The table is up to date when the fingerprints of the files the samples
+    come from are unchanged. When it is not, only the sources of the files
+    that have changed and the new sources are summarized again.
+    """
+
+    def __init__(self, path: str):
+        """Init the cache of the summaries of a catalog.
+
+        Args:
+            path (str): location of the summary file, see summary_location
+        """
+        self.path = path
+        self.__lock = threading.Lock()
+        self.__table: Optional[SummaryTable] = None
+        self.__read = False
+
+    def _load(self) -> Optional[SummaryTable]:
+        """Returns the table in memory, read from the summary file once."""
+        if not self.__read:
+            self.__read = True
+            try:
+                self.__table = SummaryTable.read(self.path)
+            except (KeyError, OSError, ValueError) as err:
+                logger.log(
+                    LogLevel.WARNING, f"Ignoring summaries {self.path}: {err}"
+                )
+        return self.__table
+
+    def _write(self, table: SummaryTable):
+        """Writes the table, kept in memory only when it cannot be written."""
+        try:
+            table.write(self.path)
+        except OSError as err:
+            logger.log(
+                LogLevel.WARNING,
+                f"Summaries kept in memory, cannot write {self.path}: {err}",
+            )
+
+    def get(self, files: Dict[str, List[str]]) -> Optional[SummaryTable]:
+        """Returns the table when it is up to date.
+
+        Args:
+            files (Dict[str, List[str]]): sources of each file the samples
+            come from
+
+        Returns:
+            Optional[SummaryTable]: the table, None when it is missing or
+            out of date
+        """
+        fingerprints = _fingerprints(files)
+        with self.__lock:
+            table = self._load()
+        if table is None or table.fingerprints != fingerprints:
+            return None
+        return table
+
+    def update(
+        self,
+        files: Dict[str, List[str]],
+        summarize: Callable[
+            [List[str], Tuple[float, ...]], Dict[str, SourceSummary]
+        ],
+        quantiles: Optional[Tuple[float, ...]] = None,
+    ) -> SummaryTable:
+        """Summarizes the sources that are missing or out of date and
+        writes the table.
+
+        Args:
+            files (Dict[str, List[str]]): sources of each file the samples
+            come from
+            summarize (Callable[[List[str], Tuple[float, ...]],
+            Dict[str, SourceSummary]]): summarizes the posterior samples of
+            sources for quantiles, see summarize_sources
+            quantiles (Tuple[float, ...], optional): quantiles of the
+            summaries. The quantiles of the current table are kept when
+            None. Defaults to None.
+
+        Returns:
+            SummaryTable: the table
+        """
+        with self.__lock:
+            table = self._load()
+            current = None if table is None else table.quantiles
+            quantiles = tuple(quantiles or current or DEFAULT_QUANTILES)
+            table = table if quantiles == current else None
+            fingerprints = _fingerprints(files)
+            if table is not None and table.fingerprints == fingerprints:
+                return table
+            table = SummaryTable.from_summaries(
+                _summaries(
+                    table, files, partial(summarize, quantiles=quantiles)
+                ),
+                fingerprints,
+                quantiles,
+            )
+            self._write(table)
+            self.__table = table
+            return table
+
+    def clear(self):
+        """Forgets the table in memory, which is read again from the file."""
+        with self.__lock:
+            self.__table = None
+            self.__read = False
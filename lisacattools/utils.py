@@ -4,10 +4,16 @@
 # This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
 # SPDX-License-Identifier: Apache-2.0
 
+import fnmatch
+import threading
+from collections import OrderedDict
 from enum import Enum
 from functools import partial
 from functools import wraps
+from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import Union
 from typing import Callable
 from loguru import logger
@@ -42,17 +48,384 @@ class FrameEnum(DocEnum):
     ECLIPTIC = "Ecliptic", "Ecliptic frame"
 
 
+def _copy_on_write_enabled() -> bool:
+    """Returns True when pandas copies the shared data before a write."""
+    return (
+        int(pd.__version__.split(".")[0]) >= 3
+        or pd.get_option("mode.copy_on_write") is True
+    )
+
+
+def _read_only_values(
+    series: pd.Series,
+) -> Union[np.ndarray, pd.api.extensions.ExtensionArray]:
+    """Returns the values of a Series without copying them, flagged as
+    read-only when they are a NumPy array.
+
+    Args:
+        series (pd.Series): Series to share
+
+    Returns:
+        Union[np.ndarray, pd.api.extensions.ExtensionArray]: the values
+    """
+    if not isinstance(series.dtype, np.dtype):
+        return series.array
+    values = series.to_numpy().view()
+    values.flags.writeable = False
+    return values
+
+
+def read_only_view(
+    data: Union[pd.DataFrame, pd.Series],
+) -> Union[pd.DataFrame, pd.Series]:
+    """Returns a view of a pandas object without copying its data.
+
+    The view is a new object, so adding or removing columns does not change
+    `data`. Writing in the shared values either raises a ValueError (the
+    NumPy values of each column are flagged as read-only) or, when the
+    copy-on-write mode of pandas is enabled, copies the modified column
+    first.
+
+    Args:
+        data (Union[pd.DataFrame, pd.Series]): pandas object to share
+
+    Returns:
+        Union[pd.DataFrame, pd.Series]: view of the pandas object
+    """
+    if _copy_on_write_enabled():
+        return data.copy(deep=False)
+    if isinstance(data, pd.Series):
+        return pd.Series(
+            _read_only_values(data),
+            index=data.index,
+            name=data.name,
+            copy=False,
+        )
+    # one array per column, not consolidated in blocks, so that the frame
+    # holds the read-only arrays themselves
+    view = pd.DataFrame(
+        {
+            idx: _read_only_values(column)
+            for idx, (_, column) in enumerate(data.items())
+        },
+        index=data.index,
+        copy=False,
+    )
+    view.columns = data.columns
+    return view
+
+
+class LRUCache:
+    """Cache of pandas objects bounded by their memory usage.
+
+    The entries are stored by namespace (e.g. the catalog file) and key. When
+    the memory used by the entries exceeds `max_bytes`, the least recently
+    used entries are evicted. The cache is safe to use from threads.
+    """
+
+    DEFAULT_MAX_BYTES = 512 * 1024**2
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Init the cache.
+
+        Args:
+            max_bytes (int, optional): maximum memory used by the entries.
+            Defaults to DEFAULT_MAX_BYTES.
+        """
+        self.__lock = threading.RLock()
+        self.__entries: "OrderedDict[Tuple[str, str], Tuple[object, int]]" = (
+            OrderedDict()
+        )
+        self.__nbytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def sizeof(value: Union[pd.DataFrame, pd.Series]) -> int:
+        """Returns the memory used by a pandas object.
+
+        Args:
+            value (Union[pd.DataFrame, pd.Series]): pandas object
+
+        Returns:
+            int: memory usage in bytes
+        """
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+
+    @property
+    def max_bytes(self) -> int:
+        """Maximum memory used by the entries.
+
+        :getter: Returns the maximum memory in bytes
+        :setter: Sets the maximum memory in bytes and evicts the least
+            recently used entries above this limit
+        :type: int
+        """
+        return self.__max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int):
+        if value < 0:
+            raise ValueError(f"max_bytes must be >= 0, got {value}")
+        with self.__lock:
+            self.__max_bytes = value
+            self._evict()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Statistics of the cache.
+
+        :getter: Returns the number of hits, misses, evictions, entries and
+            the memory used by the entries
+        :type: Dict[str, int]
+        """
+        with self.__lock:
+            return {
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "evictions": self.__evictions,
+                "entries": len(self.__entries),
+                "bytes": self.__nbytes,
+            }
+
+    def _evict(self):
+        """Evicts the least recently used entries above max_bytes."""
+        while self.__nbytes > self.__max_bytes:
+            _, (_, nbytes) = self.__entries.popitem(last=False)
+            self.__nbytes -= nbytes
+            self.__evictions += 1
+
+    def get(self, namespace: str, key: str) -> Optional[object]:
+        """Returns an entry of the cache.
+
+        Args:
+            namespace (str): namespace of the entry
+            key (str): key of the entry
+
+        Returns:
+            Optional[object]: the cached object or None when the entry is not
+            in the cache
+        """
+        with self.__lock:
+            entry = self.__entries.get((namespace, key))
+            if entry is None:
+                self.__misses += 1
+                return None
+            self.__hits += 1
+            self.__entries.move_to_end((namespace, key))
+            return entry[0]
+
+    def put(
+        self, namespace: str, key: str, value: Union[pd.DataFrame, pd.Series]
+    ):
+        """Adds an entry in the cache.
+
+        An object larger than max_bytes is not cached.
+
+        Args:
+            namespace (str): namespace of the entry
+            key (str): key of the entry
+            value (Union[pd.DataFrame, pd.Series]): object to cache
+        """
+        nbytes = LRUCache.sizeof(value)
+        with self.__lock:
+            self.discard(namespace, key)
+            if nbytes > self.__max_bytes:
+                return
+            self.__entries[(namespace, key)] = (value, nbytes)
+            self.__nbytes += nbytes
+            self._evict()
+
+    def discard(self, namespace: str, key: str):
+        """Removes an entry from the cache if it exists.
+
+        Args:
+            namespace (str): namespace of the entry
+            key (str): key of the entry
+        """
+        with self.__lock:
+            entry = self.__entries.pop((namespace, key), None)
+            if entry is not None:
+                self.__nbytes -= entry[1]
+
+    def clear(self, namespace: Optional[str] = None):
+        """Removes the entries of a namespace or all the entries.
+
+        Args:
+            namespace (str, optional): namespace to clear. All the entries
+            are removed when None. Defaults to None.
+        """
+        with self.__lock:
+            keys = [
+                key
+                for key in self.__entries
+                if namespace is None or key[0] == namespace
+            ]
+            for key in keys:
+                self.discard(*key)
+
+    def __contains__(self, item: Tuple[str, str]) -> bool:
+        with self.__lock:
+            return item in self.__entries
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__entries)
+
+    def __repr__(self):
+        return f"LRUCache(max_bytes={self.max_bytes!r})"
+
+
+class DtypePolicy:
+    """Compact dtypes of the posterior samples.
+
+    The float64 columns are downcast to float32, except the columns matching
+    one of the `keep_float64` patterns: float32 keeps ~7 significant digits,
+    which is enough for the sky angles, masses or spins but not for the
+    frequencies or the times. The text columns repeating a few labels (e.g.
+    the "Source" column of the lineage data) are stored as categoricals.
+
+    The memory saved by the policy is accumulated in `stats`::
+
+        policy = DtypePolicy()
+        catalogs = GWCatalogs.create(
+            GWCatalogType.MBH, "tutorial/data/mbh", dtype_policy=policy
+        )
+        ...
+        print(policy.stats["saved"])
+    """
+
+    KEEP_FLOAT64 = ("Frequency*", "*Time*")
+
+    def __init__(
+        self,
+        float32: bool = True,
+        keep_float64: Tuple[str, ...] = KEEP_FLOAT64,
+        categorical: bool = True,
+    ):
+        """Init the policy.
+
+        Args:
+            float32 (bool, optional): downcasts the float64 columns.
+            Defaults to True.
+            keep_float64 (Tuple[str, ...], optional): patterns of the
+            columns kept in float64. Defaults to KEEP_FLOAT64.
+            categorical (bool, optional): stores the repeated labels as
+            categoricals. Defaults to True.
+        """
+        self.float32 = float32
+        self.keep_float64 = tuple(keep_float64)
+        self.categorical = categorical
+        self.__lock = threading.Lock()
+        self.__stats = {"before": 0, "after": 0}
+
+    def __reduce__(self):
+        # the statistics and the lock stay in the process of the policy
+        return (
+            DtypePolicy,
+            (self.float32, self.keep_float64, self.categorical),
+        )
+
+    @property
+    def stats(self) -> dict:
+        """Memory used by the data before and after applying the policy.
+
+        :getter: Returns the bytes before and after applying the policy and
+            the bytes saved
+        :type: dict
+        """
+        with self.__lock:
+            return {
+                **self.__stats,
+                "saved": self.__stats["before"] - self.__stats["after"],
+            }
+
+    def _dtype(self, name, values: pd.Series) -> Optional[object]:
+        """Returns the compact dtype of a column.
+
+        Args:
+            name (object): name of the column
+            values (pd.Series): the column
+
+        Returns:
+            Optional[object]: the compact dtype, None when the column is
+            kept as it is
+        """
+        if (
+            self.float32
+            and values.dtype == np.float64
+            and not any(
+                fnmatch.fnmatch(str(name), pattern)
+                for pattern in self.keep_float64
+            )
+        ):
+            return np.float32
+        if (
+            self.categorical
+            and values.dtype == object
+            and values.nunique() <= len(values) // 2
+        ):
+            return "category"
+        return None
+
+    def apply(
+        self, data: Union[pd.DataFrame, pd.Series]
+    ) -> Union[pd.DataFrame, pd.Series]:
+        """Returns the data with the compact dtypes.
+
+        Args:
+            data (Union[pd.DataFrame, pd.Series]): posterior samples
+
+        Returns:
+            Union[pd.DataFrame, pd.Series]: a copy of the data with the
+            compact dtypes
+        """
+        if isinstance(data, pd.Series):
+            dtype = self._dtype(data.name, data)
+            result = data.copy() if dtype is None else data.astype(dtype)
+        else:
+            dtypes = {
+                name: dtype
+                for name in data.columns
+                if (dtype := self._dtype(name, data[name])) is not None
+            }
+            result = data.astype(dtypes) if dtypes else data.copy()
+        before = np.sum(data.memory_usage(deep=True))
+        after = np.sum(result.memory_usage(deep=True))
+        with self.__lock:
+            self.__stats["before"] += int(before)
+            self.__stats["after"] += int(after)
+        return result
+
+    def __repr__(self):
+        return (
+            f"DtypePolicy({self.float32!r}, {self.keep_float64!r}, "
+            f"{self.categorical!r})"
+        )
+
+
 class CacheManager:
-    memory_cache = {}
+    #: Cache used when the object does not provide its own cache
+    memory_cache = LRUCache()
 
     @staticmethod
     def get_cache_pandas(
         func: Callable = None,
         keycache_argument: Union[int, List[int]] = 0,
         level: str = "INFO",  # loguru accepts string levels like "DEBUG", "INFO", etc.
+        namespace_attribute: str = "location",
     ):
         """Cache a pandas DataFrame in memory.
 
+        The cache is given by the `cache` attribute of the first argument of
+        the function (i.e. the object of a method). CacheManager.memory_cache
+        is used when this attribute does not exist or is None. When the
+        `read_only` attribute of the first argument is True, read-only views
+        are returned instead of copies (see read_only_view).
+
         Parameters
         ----------
         func : Callable, optional
@@ -61,6 +434,9 @@ class CacheManager:
             Argument index(es) used as cache key (default: 0)
         level : str
             Log level for messages (default: "INFO")
+        namespace_attribute : str
+            Attribute of the first argument used as namespace of the cache
+            (default: "location")
 
         Returns
         -------
@@ -72,6 +448,7 @@ class CacheManager:
                 CacheManager.get_cache_pandas,
                 keycache_argument=keycache_argument,
                 level=level,
+                namespace_attribute=namespace_attribute,
             )
 
         @wraps(func)
@@ -95,17 +472,32 @@ class CacheManager:
                 logger.warning(f"[{func.__name__}] Failed to build cache key: {e}")
                 return func(*args, **kwargs)
 
+            cache = getattr(args[0], "cache", None) if args else None
+            if cache is None:
+                cache = CacheManager.memory_cache
+            namespace = str(
+                getattr(args[0], namespace_attribute, func.__qualname__)
+                if args
+                else func.__qualname__
+            )
+
+            # Views are shared instead of copies in read-only mode
+            read_only = bool(getattr(args[0], "read_only", False))
+            share = read_only_view if read_only else pd.DataFrame.copy
+
             # Return from cache if available
-            if key in CacheManager.memory_cache:
+            cached = cache.get(namespace, key)
+            if cached is not None:
                 logger.log(level, f"[{func.__name__}] Retrieved result from cache for key: {key}")
-                return CacheManager.memory_cache[key].copy()
+                return share(cached)
 
             # Compute and cache the result
             result = func(*args, **kwargs)
             if isinstance(result, pd.DataFrame):
-                CacheManager.memory_cache.clear()  # Reset cache (only one key allowed)
-                CacheManager.memory_cache[key] = result.copy()
+                cache.put(namespace, key, share(result))
                 logger.log(level, f"[{func.__name__}] Cached result for key: {key}")
+                if read_only:
+                    result = read_only_view(result)
             else:
                 logger.warning(f"[{func.__name__}] Result is not a DataFrame, not cached.")
 
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# lisacattools - A small example package for using LISA catalogs
+# Copyright (C) 2020 - 2025 - James I. Thorpe, Tyson B. Littenberg, Jean-Christophe Malapert
+# This file is part of lisacattools <https://github.com/tlittenberg/lisacattools>
+# SPDX-License-Identifier: Apache-2.0
+
+"""Polling of a catalog set for the new catalog files.
+
+A thread refreshes the catalog set at a regular interval and calls a
+function with each catalog that is new or has changed::
+
+    def on_catalog(catalog):
+        print(catalog.name, len(catalog.get_detections()))
+
+    with catalogs.watch(on_catalog, interval=3600):
+        ...
+
+The new files should be written elsewhere and moved to the directory of the
+catalogs, so that a file is not read while it is written.
+"""
+
+import threading
+from typing import Callable
+from typing import List
+from typing import Optional
+
+from loguru import logger
+
+from .monitoring import LogLevel
+
+
+class CatalogWatcher:
+    """Refreshes a catalog set in a thread and reports its new catalogs."""
+
+    def __init__(
+        self,
+        catalogs,
+        callback: Callable,
+        interval: float = 60.0,
+    ):
+        """Init the watcher. The polling starts with `start`.
+
+        Args:
+            catalogs (GWCatalogs): catalog set to refresh
+            callback (Callable[[GWCatalog], None]): called with each catalog
+            that is new or has changed
+            interval (float, optional): seconds between two refreshes.
+            Defaults to 60.0.
+
+        Raises:
+            ValueError: interval not greater than 0
+        """
+        if interval <= 0:
+            raise ValueError(f"interval must be > 0, got {interval}")
+        self.__catalogs = catalogs
+        self.__callback = callback
+        self.__interval = interval
+        self.__stop = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    @property
+    def interval(self) -> float:
+        """Seconds between two refreshes.
+
+        :getter: Returns the interval
+        :type: float
+        """
+        return self.__interval
+
+    @property
+    def running(self) -> bool:
+        """True when the polling thread is running.
+
+        :getter: Returns the state of the thread
+        :type: bool
+        """
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def poll(self) -> List[str]:
+        """Refreshes the catalog set and calls the callback with each new or
+        changed catalog.
+
+        The error of the callback on a catalog is logged, and the callback is
+        still called with the next catalogs.
+
+        Returns:
+            List[str]: names of the new or changed catalogs
+        """
+        names = self.__catalogs.refresh()
+        for name in names:
+            try:
+                self.__callback(self.__catalogs.get_catalog_by(name))
+            except Exception as err:
+                logger.log(
+                    LogLevel.WARNING,
+                    f"Callback of {self.__catalogs} failed on {name}: "
+                    f"{err!r}",
+                )
+        return names
+
+    def _run(self):
+        """Polls until stopped. The errors of a refresh are logged and the
+        polling goes on."""
+        while not self.__stop.wait(self.__interval):
+            try:
+                self.poll()
+            except Exception as err:
+                logger.log(
+                    LogLevel.WARNING,
+                    f"Refresh of {self.__catalogs} failed: {err!r}",
+                )
+
+    def start(self) -> "CatalogWatcher":
+        """Starts the polling thread.
+
+        Returns:
+            CatalogWatcher: the watcher
+        """
+        if not self.running:
+            self.__stop.clear()
+            self.__thread = threading.Thread(
+                target=self._run, name="CatalogWatcher", daemon=True
+            )
+            self.__thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stops the polling thread, waiting for the running refresh.
+
+        Args:
+            timeout (float, optional): seconds to wait for the thread.
+            Waits until it ends when None. Defaults to None.
+        """
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+            self.__thread = None
+
+    def __enter__(self) -> "CatalogWatcher":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def __repr__(self):
+        return f"CatalogWatcher({self.__catalogs!r}, {self.__interval!r})"
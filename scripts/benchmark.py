@@ -0,0 +1,502 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of the catalog access on synthetic catalogs.
+
+Usage::
+
+    python scripts/benchmark.py [benchmark ...]
+
+Without argument, all the benchmarks are run.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from lisacattools import DtypePolicy
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools import LRUCache
+from lisacattools import STORE_POOL
+from lisacattools.association import associate
+from lisacattools.convert import convert_chains_to_columnar
+from lisacattools.convert import convert_chains_to_packed
+from lisacattools.convert import convert_to_arrow
+from lisacattools.convert import convert_to_bundle
+
+UCB_PARAMETERS = [
+    "Frequency",
+    "Frequency Derivative",
+    "Amplitude",
+    "Ecliptic Longitude",
+    "Ecliptic Latitude",
+    "coslat",
+    "cosinc",
+    "Initial Phase",
+    "Polarization",
+]
+
+
+def make_ucb_catalog(
+    directory: str,
+    name: str = "cat15728640_v2",
+    nb_sources: int = 10000,
+    nb_chains: int = 100,
+    nb_samples: int = 1000,
+    seed: int = 0,
+) -> str:
+    """Writes a synthetic UCB catalog.
+
+    Only the first `nb_chains` sources get posterior samples.
+
+    Args:
+        directory (str): output directory
+        name (str, optional): name of the catalog.
+        nb_sources (int, optional): number of detections.
+        nb_chains (int, optional): number of sources with samples.
+        nb_samples (int, optional): number of samples per chain.
+        seed (int, optional): seed of the random generator.
+
+    Returns:
+        str: location of the catalog
+    """
+    rng = np.random.default_rng(seed)
+    sources = [f"LDC{idx:010d}" for idx in range(nb_sources)]
+    chain_file = f"{name}_chains_0.h5"
+    detections = pd.DataFrame(
+        {param: rng.random(nb_sources) for param in UCB_PARAMETERS},
+        index=sources,
+    )
+    detections["SNR"] = 7 + 100 * rng.random(nb_sources)
+    detections["parent"] = ""
+    detections["chain file"] = chain_file
+    metadata = pd.DataFrame(
+        {"Observation Time": [15728640.0], "parent": [""]}, index=[name]
+    )
+    location = os.path.join(directory, f"{name}.h5")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        metadata.to_hdf(location, key="metadata")
+        detections.to_hdf(location, key="detections")
+        for source in sources[:nb_chains]:
+            pd.DataFrame(
+                {param: rng.random(nb_samples) for param in UCB_PARAMETERS}
+            ).to_hdf(
+                os.path.join(directory, chain_file), key=f"{source}_chain"
+            )
+    return location
+
+
+def make_ucb_catalogs(directory: str, nb_catalogs: int):
+    """Writes small synthetic UCB catalogs without posterior samples, one
+    per observation week.
+
+    Args:
+        directory (str): output directory
+        nb_catalogs (int): number of catalogs
+    """
+    for week in range(1, nb_catalogs + 1):
+        make_ucb_catalog(
+            directory,
+            name=f"cat{week * 655360:d}_v2",
+            nb_sources=100,
+            nb_chains=0,
+            seed=week,
+        )
+
+
+def make_mbh_catalogs(directory: str, nb_catalogs: int, nb_sources: int):
+    """Writes synthetic MBH catalogs without posterior samples, one per
+    observation week, each source being the child of the source of the same
+    rank in the previous week.
+
+    Args:
+        directory (str): output directory
+        nb_catalogs (int): number of catalogs
+        nb_sources (int): number of detections per catalog
+    """
+    rng = np.random.default_rng(0)
+    for week in range(1, nb_catalogs + 1):
+        name = f"MBHcatalog_week{week:03d}"
+        parent = f"MBHcatalog_week{week - 1:03d}" if week > 1 else ""
+        detections = pd.DataFrame(
+            {
+                "Parent": [
+                    f"MBH{week - 1:03d}{idx:06d}" if week > 1 else ""
+                    for idx in range(nb_sources)
+                ],
+                "Log Likelihood": rng.random(nb_sources),
+                "Mass 1": rng.random(nb_sources),
+                "Mass 2": rng.random(nb_sources),
+            },
+            index=[f"MBH{week:03d}{idx:06d}" for idx in range(nb_sources)],
+        )
+        metadata = pd.DataFrame(
+            {"observation week": [week], "parent": [parent]}, index=[name]
+        )
+        location = os.path.join(directory, f"MBH_wk{week:03d}C.h5")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            metadata.to_hdf(location, key="metadata")
+            detections.to_hdf(location, key="detections")
+
+
+def bench_detections_memoization(directory: str):
+    """Reads of the detections table in a per-source loop, with and without
+    the memoized detections."""
+    make_ucb_catalog(directory)
+    catalogs = GWCatalogs.create(GWCatalogType.UCB, directory, "cat*.h5")
+    catalog = catalogs.get_last_catalog()
+    sources = catalog.get_detections()[:100]
+
+    def loop(invalidate: bool):
+        STORE_POOL.close()
+        catalog.invalidate()
+        start_reads = STORE_POOL.stats["reads"]
+        start = time.perf_counter()
+        for source in sources:
+            if invalidate:
+                catalog.invalidate()
+            catalog.get_source_samples(source, ["Frequency"])
+            if invalidate:
+                catalog.invalidate()
+            catalog.get_median_source("SNR")
+        elapsed = time.perf_counter() - start
+        return STORE_POOL.stats["reads"] - start_reads, elapsed
+
+    reads, elapsed = loop(invalidate=True)
+    print(f"  re-read detections : {reads:6d} reads {elapsed:8.3f} s")
+    reads, elapsed = loop(invalidate=False)
+    print(f"  memoized detections: {reads:6d} reads {elapsed:8.3f} s")
+
+
+def bench_column_projection(directory: str):
+    """Joint sky PDF workload (two sky columns of every source) on fixed
+    format and columnar chain files."""
+    make_ucb_catalog(
+        directory, nb_sources=200, nb_chains=200, nb_samples=50000
+    )
+    columns = ["coslat", "Ecliptic Longitude"]
+
+    def loop():
+        catalogs = GWCatalogs.create(
+            GWCatalogType.UCB, directory, "cat*.h5", cache=LRUCache(0)
+        )
+        catalog = catalogs.get_last_catalog()
+        start = time.perf_counter()
+        for source in catalog.get_detections():
+            catalog.get_source_samples(source, columns)
+        return time.perf_counter() - start
+
+    print(f"  fixed format  : {loop():8.3f} s")
+    convert_chains_to_columnar(
+        os.path.join(directory, "cat15728640_v2_chains_0.h5")
+    )
+    print(f"  columnar      : {loop():8.3f} s")
+
+
+def bench_parallel_metadata(directory: str):
+    """Loading of the metadata of 200 catalogs with 1 and 8 workers."""
+    make_ucb_catalogs(directory, nb_catalogs=200)
+
+    def loop(workers: int):
+        STORE_POOL.close()
+        start = time.perf_counter()
+        catalogs = GWCatalogs.create(
+            GWCatalogType.UCB, directory, "cat*.h5", workers=workers
+        )
+        elapsed = time.perf_counter() - start
+        return catalogs.metadata.index.tolist(), elapsed
+
+    sequential, elapsed = loop(workers=1)
+    print(f"  1 worker : {elapsed:8.3f} s")
+    parallel, elapsed = loop(workers=8)
+    print(f"  8 workers: {elapsed:8.3f} s")
+    assert parallel == sequential
+
+
+def bench_manifest(directory: str):
+    """Creation of a set of 200 catalogs without manifest (cold start) and
+    with an up-to-date manifest (warm start)."""
+    make_ucb_catalogs(directory, nb_catalogs=200)
+
+    def loop():
+        STORE_POOL.close()
+        start_opens = STORE_POOL.stats["opens"]
+        start = time.perf_counter()
+        catalogs = GWCatalogs.create(
+            GWCatalogType.UCB, directory, "cat*.h5", manifest=True
+        )
+        catalogs.get_last_catalog().get_attr_detections()
+        elapsed = time.perf_counter() - start
+        return STORE_POOL.stats["opens"] - start_opens, elapsed
+
+    opens, elapsed = loop()
+    print(f"  cold start: {opens:6d} opens {elapsed:8.3f} s")
+    opens, elapsed = loop()
+    print(f"  warm start: {opens:6d} opens {elapsed:8.3f} s")
+
+
+def bench_arrow(directory: str):
+    """Per-source read latency of two columns on HDF5, Parquet and Feather
+    catalogs."""
+    make_ucb_catalog(
+        directory, nb_sources=200, nb_chains=200, nb_samples=50000
+    )
+    columns = ["coslat", "Ecliptic Longitude"]
+
+    def loop(catalog_type, path, pattern):
+        catalogs = GWCatalogs.create(
+            catalog_type, path, pattern, cache=LRUCache(0)
+        )
+        catalog = catalogs.get_last_catalog()
+        sources = catalog.get_detections()
+        start = time.perf_counter()
+        for source in sources:
+            catalog.get_source_samples(source, columns)
+        return 1000 * (time.perf_counter() - start) / len(sources)
+
+    hdf5 = loop(GWCatalogType.UCB, directory, "cat*.h5")
+    print(f"  hdf5    : {hdf5:8.3f} ms/source")
+    catalogs = GWCatalogs.create(GWCatalogType.UCB, directory, "cat*.h5")
+    for format in ("parquet", "feather"):
+        output = os.path.join(directory, format)
+        convert_to_arrow(catalogs, output, format)
+        latency = loop(GWCatalogType.ARROW, output, f"*.{format}")
+        print(f"  {format:8s}: {latency:8.3f} ms/source")
+
+
+def bench_memmap(directory: str):
+    """Per-source read latency of all the columns from the HDF5 files and
+    from the packed files mapped in memory."""
+    make_ucb_catalog(
+        directory, nb_sources=200, nb_chains=200, nb_samples=50000
+    )
+
+    def loop(memmap: bool):
+        catalogs = GWCatalogs.create(
+            GWCatalogType.UCB,
+            directory,
+            "cat*.h5",
+            cache=LRUCache(0),
+            read_only=True,
+            memmap=memmap,
+        )
+        catalog = catalogs.get_last_catalog()
+        sources = catalog.get_detections()
+        start = time.perf_counter()
+        for source in sources:
+            catalog.get_source_samples(source)
+        return 1000 * (time.perf_counter() - start) / len(sources)
+
+    print(f"  hdf5   : {loop(memmap=False):8.3f} ms/source")
+    convert_chains_to_packed(
+        os.path.join(directory, "cat15728640_v2_chains_0.h5")
+    )
+    print(f"  memmap : {loop(memmap=True):8.3f} ms/source")
+
+
+def bench_dtypes(directory: str):
+    """Memory of the posterior samples of all the sources with the original
+    dtypes and with the compact dtypes."""
+    make_ucb_catalog(
+        directory, nb_sources=200, nb_chains=200, nb_samples=50000
+    )
+    policy = DtypePolicy()
+    catalog = GWCatalogs.create(
+        GWCatalogType.UCB, directory, "cat*.h5", dtype_policy=policy
+    ).get_last_catalog()
+    start = time.perf_counter()
+    for source in catalog.get_detections():
+        catalog.get_source_samples(source)
+    elapsed = time.perf_counter() - start
+    stats = {key: value / 1024**2 for key, value in policy.stats.items()}
+    print(f"  float64: {stats['before']:8.1f} MiB")
+    print(f"  compact: {stats['after']:8.1f} MiB {elapsed:8.3f} s")
+
+
+def bench_thinning(directory: str):
+    """Per-source read latency of the whole chains, of 1000 evenly spaced
+    samples and of 1000 random samples, on fixed format and columnar chain
+    files."""
+    make_ucb_catalog(
+        directory, nb_sources=200, nb_chains=200, nb_samples=50000
+    )
+    catalog = GWCatalogs.create(
+        GWCatalogType.UCB, directory, "cat*.h5", cache=LRUCache(0)
+    ).get_last_catalog()
+    sources = catalog.get_detections()
+
+    def loop(**kwargs):
+        start = time.perf_counter()
+        for source in sources:
+            catalog.get_source_samples(source, **kwargs)
+        return 1000 * (time.perf_counter() - start) / len(sources)
+
+    for layout in ("fixed", "columnar"):
+        if layout == "columnar":
+            convert_chains_to_columnar(
+                os.path.join(directory, "cat15728640_v2_chains_0.h5")
+            )
+        print(f"  {layout:8s} full   : {loop():8.3f} ms/source")
+        thinned = loop(max_samples=1000)
+        print(f"  {layout:8s} thinned: {thinned:8.3f} ms/source")
+        random = loop(max_samples=1000, random_state=0)
+        print(f"  {layout:8s} random : {random:8.3f} ms/source")
+
+
+def bench_bundle(directory: str):
+    """Creation of a set of 50 catalogs and reads of the 200 sources of one
+    of them, from the directory and from a bundle."""
+    make_ucb_catalogs(directory, nb_catalogs=50)
+    make_ucb_catalog(directory, nb_sources=200, nb_chains=200, nb_samples=5000)
+
+    def loop(catalog_type, path, *patterns):
+        STORE_POOL.close()
+        start_opens = STORE_POOL.stats["opens"]
+        start = time.perf_counter()
+        catalog = GWCatalogs.create(
+            catalog_type, path, *patterns, cache=LRUCache(0)
+        ).get_catalog_by("cat15728640_v2")
+        for source in catalog.get_detections():
+            catalog.get_source_samples(source)
+        elapsed = time.perf_counter() - start
+        return STORE_POOL.stats["opens"] - start_opens, elapsed
+
+    opens, elapsed = loop(GWCatalogType.UCB, directory, "cat*.h5")
+    print(f"  directory: {opens:6d} opens {elapsed:8.3f} s")
+    location = os.path.join(directory, "bundle", "ucb.h5")
+    os.makedirs(os.path.dirname(location))
+    convert_to_bundle(
+        GWCatalogs.create(GWCatalogType.UCB, directory, "cat*.h5"), location
+    )
+    opens, elapsed = loop(GWCatalogType.UCB_BUNDLE, location)
+    print(f"  bundle   : {opens:6d} opens {elapsed:8.3f} s")
+
+
+def bench_ranking(directory: str):
+    """Latency of 1000 median, 90th percentile and top-50 lookups of SNR on
+    50000 detections, with a full scan per lookup and with the ranked
+    index."""
+    make_ucb_catalog(directory, nb_sources=50000, nb_chains=0)
+    catalog = GWCatalogs.create(
+        GWCatalogType.UCB, directory, "cat*.h5"
+    ).get_last_catalog()
+    detections = catalog.get_detections(["SNR"])
+
+    def scan():
+        val = detections["SNR"]
+        for q in (0.5, 0.9):
+            np.argmin(np.abs(np.array(val) - val.quantile(q)))
+        val.nlargest(50)
+
+    def ranked():
+        catalog.get_median_source("SNR")
+        catalog.get_quantile_source("SNR", 0.9)
+        catalog.get_top_k("SNR", 50)
+
+    for label, lookup in (("scan", scan), ("ranked", ranked)):
+        start = time.perf_counter()
+        for _ in range(1000):
+            lookup()
+        elapsed = time.perf_counter() - start
+        print(f"  {label:6s}: {elapsed:8.3f} s")
+
+
+def bench_lineages(directory: str):
+    """Lineages of the 1000 sources of the last of 26 weekly MBH catalogs,
+    one get_lineage per source and with get_lineages."""
+    make_mbh_catalogs(directory, nb_catalogs=26, nb_sources=1000)
+
+    def loop():
+        catalogs = GWCatalogs.create(GWCatalogType.MBH, directory)
+        last = catalogs.get_last_catalog()
+        for source in last.get_detections():
+            catalogs.get_lineage(last.name, source)
+
+    def bulk():
+        catalogs = GWCatalogs.create(GWCatalogType.MBH, directory)
+        catalogs.get_lineages(catalogs.get_last_catalog().name)
+
+    for label, lineages in (("loop", loop), ("bulk", bulk)):
+        start = time.perf_counter()
+        lineages()
+        elapsed = time.perf_counter() - start
+        print(f"  {label:4s}: {elapsed:8.3f} s")
+        STORE_POOL.close()
+
+
+def bench_associate(directory: str):
+    """Association of two versions of a UCB catalog of 50000 sources by
+    frequency, frequency derivative and sky position, with one pandas
+    filter per source (timed on 500 sources and extrapolated) and with the
+    sorted-frequency sweep."""
+    make_ucb_catalog(directory, nb_sources=50000, nb_chains=0)
+    rng = np.random.default_rng(1)
+    previous = pd.read_hdf(
+        os.path.join(directory, "cat15728640_v2.h5"), "detections"
+    )
+    latest = previous.sample(frac=1, random_state=1)
+    latest["Frequency"] += rng.normal(0, 1e-7, len(latest))
+    latest.index = [f"LDC{idx:010d}" for idx in range(50000, 100000)]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        location = os.path.join(directory, "cat31457280_v2.h5")
+        pd.DataFrame(
+            {"Observation Time": [31457280.0], "parent": [""]},
+            index=["cat31457280_v2"],
+        ).to_hdf(location, key="metadata")
+        latest.to_hdf(location, key="detections")
+    catalogs = GWCatalogs.create(GWCatalogType.UCB, directory, "cat*.h5")
+    catalog_a = catalogs.get_first_catalog()
+    catalog_b = catalogs.get_last_catalog()
+    params = ["Frequency", "Frequency Derivative", "Ecliptic Longitude"]
+    tolerances = [1e-6, 1e-3, 1e-3]
+
+    start = time.perf_counter()
+    detections_b = catalog_b.get_detections(params)
+    for source, values in catalog_a.get_detections(params)[:500].iterrows():
+        mask = np.ones(len(detections_b), dtype=bool)
+        for param, tolerance in zip(params, tolerances):
+            mask &= (detections_b[param] - values[param]).abs() <= tolerance
+        detections_b[mask]
+    elapsed = (time.perf_counter() - start) * 100
+    print(f"  filter: {elapsed:8.3f} s (extrapolated)")
+
+    start = time.perf_counter()
+    matches = associate(catalog_a, catalog_b, params, tolerances)
+    elapsed = time.perf_counter() - start
+    print(f"  sweep : {elapsed:8.3f} s ({len(matches)} matches)")
+
+
+BENCHMARKS = {
+    "detections": bench_detections_memoization,
+    "projection": bench_column_projection,
+    "metadata": bench_parallel_metadata,
+    "manifest": bench_manifest,
+    "arrow": bench_arrow,
+    "memmap": bench_memmap,
+    "dtypes": bench_dtypes,
+    "thinning": bench_thinning,
+    "bundle": bench_bundle,
+    "ranking": bench_ranking,
+    "lineages": bench_lineages,
+    "associate": bench_associate,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*", choices=[[], *BENCHMARKS])
+    args = parser.parse_args()
+    logger.remove()
+    for name in args.benchmarks or BENCHMARKS:
+        print(f"{name}: {' '.join(BENCHMARKS[name].__doc__.split())}")
+        with tempfile.TemporaryDirectory() as directory:
+            BENCHMARKS[name](directory)
+            STORE_POOL.close()
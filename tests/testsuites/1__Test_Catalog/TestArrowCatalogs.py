@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import shutil
+import tempfile
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools.convert import convert_to_arrow
+
+
+class TestArrowCatalogs:
+    def get_equal(self, format):
+        catalogs = GWCatalogs.create(GWCatalogType.MBH, "tutorial/data/mbh")
+        directory = tempfile.mkdtemp()
+        try:
+            convert_to_arrow(catalogs, directory, format)
+            converted = GWCatalogs.create(
+                GWCatalogType.ARROW, directory, f"*.{format}"
+            )
+            if converted.get_catalogs_name() != catalogs.get_catalogs_name():
+                return False
+            catalog = catalogs.get_last_catalog()
+            other = converted.get_last_catalog()
+            columns = ["Mass 1", "Mass 2"]
+            return other.get_attr_detections() == (
+                catalog.get_attr_detections()
+            ) and all(
+                other.get_source_samples(source, columns).equals(
+                    catalog.get_source_samples(source, columns)
+                )
+                for source in catalog.get_detections()
+            )
+        finally:
+            shutil.rmtree(directory)
+
+    def get_lineage_equal(self):
+        """A converted MBH set keeps the lineages of the MBH set."""
+        catalogs = GWCatalogs.create(GWCatalogType.MBH, "tutorial/data/mbh")
+        directory = tempfile.mkdtemp()
+        try:
+            convert_to_arrow(catalogs, directory)
+            converted = GWCatalogs.create(GWCatalogType.ARROW, directory)
+            name = catalogs.get_last_catalog().name
+            columns = ["Catalog", "Observation Week", "Log Likelihood"]
+            return all(
+                converted.get_lineage(name, source)[columns].equals(
+                    catalogs.get_lineage(name, source)[columns]
+                )
+                for source in catalogs.get_last_catalog().get_detections()
+            ) and converted.get_lineages(name)[columns[::2]].equals(
+                catalogs.get_lineages(name)[columns[::2]]
+            )
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools import STORE_POOL
+from lisacattools.association import associate
+from lisacattools.plugins.ucb import UcbCatalog
+
+PARAMS = ["Frequency", "Frequency Derivative", "Ecliptic Longitude", "coslat"]
+
+
+class TestAssociation:
+    def _write(self, directory, name, detections):
+        metadata = pd.DataFrame(
+            {"Observation Time": [float(len(os.listdir(directory)))]},
+            index=[name],
+        )
+        location = os.path.join(directory, f"{name}.h5")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            metadata.to_hdf(location, key="metadata")
+            detections.to_hdf(location, key="detections")
+
+    def get_matches(self):
+        """Pairs of a catalog and of a shuffled, noisy copy with decoys,
+        compared with all the pairs of sources."""
+        rng = np.random.default_rng(0)
+        nb_sources = 2000
+        first = pd.DataFrame(
+            {
+                "Frequency": rng.uniform(1e-3, 2e-3, nb_sources),
+                "Frequency Derivative": rng.normal(0, 1e-16, nb_sources),
+                "Ecliptic Longitude": rng.uniform(0, 2 * np.pi, nb_sources),
+                "coslat": rng.uniform(-1, 1, nb_sources),
+            },
+            index=[f"A{idx:05d}" for idx in range(nb_sources)],
+        )
+        second = first.copy()
+        second["Frequency"] += rng.normal(0, 1e-9, nb_sources)
+        second["Ecliptic Longitude"] = (
+            second["Ecliptic Longitude"] + rng.normal(0, 0.01, nb_sources)
+        ) % (2 * np.pi)
+        second.index = [f"B{idx:05d}" for idx in range(nb_sources)]
+        decoys = first.iloc[:100].copy()
+        decoys["coslat"] = -decoys["coslat"] + 0.5
+        decoys.index = [f"C{idx:05d}" for idx in range(100)]
+        second = pd.concat([second, decoys]).sample(frac=1, random_state=0)
+        tolerances = [1e-8, 1e-15, 0.1, 0.1]
+
+        directory = tempfile.mkdtemp()
+        try:
+            self._write(directory, "cat1_v1", first)
+            self._write(directory, "cat2_v1", second)
+            catalogs = GWCatalogs.create(
+                GWCatalogType.UCB, directory, "cat*.h5"
+            )
+            catalog_a = catalogs.get_catalog_by("cat1_v1")
+            catalog_b = catalogs.get_catalog_by("cat2_v1")
+            matches = associate(catalog_a, catalog_b, PARAMS, tolerances)
+            pairs = associate(
+                catalog_a, catalog_b, PARAMS, tolerances, one_to_one=False
+            )
+            chunked = associate(
+                catalog_a, catalog_b, PARAMS, tolerances, chunksize=7
+            )
+        finally:
+            STORE_POOL.close()
+            shutil.rmtree(directory)
+
+        deltas = (
+            second[PARAMS].to_numpy()[None] - first[PARAMS].to_numpy()[:, None]
+        )
+        deltas[..., 2] = (deltas[..., 2] + np.pi) % (2 * np.pi) - np.pi
+        rows_a, rows_b = np.nonzero((np.abs(deltas) <= tolerances).all(-1))
+        expected = set(zip(first.index[rows_a], second.index[rows_b]))
+        return [
+            len(matches),
+            bool(
+                (
+                    matches["Source A"].str[1:] == matches["Source B"].str[1:]
+                ).all()
+            ),
+            list(matches["Source A"]) == list(first.index),
+            set(zip(pairs["Source A"], pairs["Source B"])) == expected,
+            bool((matches["Distance"] <= 2).all()),
+            chunked.equals(matches),
+        ]
+
+    def get_refined(self):
+        """Pairs of a catalog with itself kept by a tight posterior
+        refinement, and the bulk reads of the samples."""
+        catalogs = GWCatalogs.create(
+            GWCatalogType.UCB, "tutorial/data/ucb", "cat*.h5"
+        )
+        catalog = catalogs.get_catalog_by("cat7864320_v3")
+        reads = list()
+        samples_many = UcbCatalog.get_source_samples_many
+
+        def _read(catalog, source_names, *args, **kwargs):
+            reads.append(len(source_names))
+            return samples_many(catalog, source_names, *args, **kwargs)
+
+        pairs = associate(
+            catalog,
+            catalog,
+            PARAMS,
+            {param: 1.0 for param in PARAMS},
+            one_to_one=False,
+        )
+        UcbCatalog.get_source_samples_many = _read
+        try:
+            refined = associate(
+                catalog,
+                catalog,
+                PARAMS,
+                {param: 1.0 for param in PARAMS},
+                one_to_one=False,
+                refine=1e-6,
+            )
+        finally:
+            UcbCatalog.get_source_samples_many = samples_many
+        return [
+            len(pairs) > len(refined),
+            list(refined["Source A"]) == list(refined["Source B"]),
+            len(refined) == len(catalog.get_detections()),
+            reads == [len(catalog.get_detections())] * 2,
+        ]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+import pandas as pd
+
+from lisacattools import AsyncGWCatalogs
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools.aio import AsyncExecutor
+
+
+class TestAsyncCatalogs:
+    async def _collapsed(self):
+        async with await AsyncGWCatalogs.create(
+            GWCatalogType.MBH, "tutorial/data/mbh", max_workers=2
+        ) as catalogs:
+            catalog = catalogs.get_last_catalog()
+            source = (await catalog.get_detections())[0]
+            results = await asyncio.gather(
+                *[catalog.get_source_samples(source) for _ in range(8)]
+            )
+            expected = (
+                GWCatalogs.create(GWCatalogType.MBH, "tutorial/data/mbh")
+                .get_last_catalog()
+                .get_source_samples(source)
+            )
+            return [
+                all(result.equals(expected) for result in results),
+                results[0] is not results[1],
+                catalogs.executor.stats["calls"] < 8,
+            ]
+
+    async def _uncopied(self):
+        async with await AsyncGWCatalogs.create(
+            GWCatalogType.MBH, "tutorial/data/mbh"
+        ) as catalogs:
+            catalog = catalogs.get_last_catalog()
+            await catalog.get_detections()
+            copies = list()
+            copy = pd.DataFrame.copy
+
+            def counted(frame, *args, **kwargs):
+                copies.append(frame)
+                return copy(frame, *args, **kwargs)
+
+            pd.DataFrame.copy = counted
+            try:
+                catalog.catalog.get_detections(["Mass 1"])
+                expected = len(copies)
+                await catalog.get_detections(["Mass 1"])
+            finally:
+                pd.DataFrame.copy = copy
+            return len(copies) == 2 * expected
+
+    async def _iterated(self):
+        async with await AsyncGWCatalogs.create(
+            GWCatalogType.UCB, "tutorial/data/ucb", "cat*.h5"
+        ) as catalogs:
+            catalog = catalogs.get_last_catalog()
+            sources = (await catalog.get_detections())[:10]
+            names = [
+                name
+                async for name, _ in catalog.iter_source_samples(
+                    sources, "Frequency", prefetch=3
+                )
+            ]
+            return names == sources
+
+    async def _backpressure(self):
+        executor = AsyncExecutor(max_workers=1, max_pending=1, timeout=0.05)
+        slow = asyncio.ensure_future(executor.run(None, time.sleep, 0.5))
+        await asyncio.sleep(0.01)
+        try:
+            await executor.run(None, time.sleep, 0)
+            return False
+        except asyncio.TimeoutError:
+            return True
+        finally:
+            await slow
+            executor.shutdown()
+
+    def get_collapsed(self):
+        return asyncio.run(self._collapsed())
+
+    def get_uncopied(self):
+        return asyncio.run(self._uncopied())
+
+    def get_iterated(self):
+        return asyncio.run(self._iterated())
+
+    def get_backpressure(self):
+        return asyncio.run(self._backpressure())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools import STORE_POOL
+from lisacattools.convert import convert_to_bundle
+
+
+class TestBundle:
+    def get_equal(self):
+        directory = tempfile.mkdtemp()
+        try:
+            catalogs = GWCatalogs.create(
+                GWCatalogType.UCB, "tutorial/data/ucb", "cat*.h5"
+            )
+            location = convert_to_bundle(
+                catalogs, os.path.join(directory, "ucb.h5")
+            )
+            STORE_POOL.close()
+            bundle = GWCatalogs.create(GWCatalogType.UCB_BUNDLE, location)
+            if bundle.get_catalogs_name() != catalogs.get_catalogs_name():
+                return False
+            for name in catalogs.get_catalogs_name():
+                catalog = catalogs.get_catalog_by(name)
+                other = bundle.get_catalog_by(name)
+                for source in catalog.get_detections()[:20]:
+                    if not other.get_source_samples(source).equals(
+                        catalog.get_source_samples(source)
+                    ):
+                        return False
+            return location in STORE_POOL and len(STORE_POOL) == 1
+        finally:
+            STORE_POOL.close()
+            shutil.rmtree(directory)
+
+    def get_lineage_equal(self):
+        directory = tempfile.mkdtemp()
+        try:
+            catalogs = GWCatalogs.create(
+                GWCatalogType.UCB, "tutorial/data/ucb", "cat*.h5"
+            )
+            location = convert_to_bundle(
+                catalogs, os.path.join(directory, "ucb.h5")
+            )
+            STORE_POOL.close()
+            bundle = GWCatalogs.create(GWCatalogType.UCB_BUNDLE, location)
+            name = catalogs.get_last_catalog().name
+            for source in catalogs.get_catalog_by(name).get_detections()[:20]:
+                lineage = catalogs.get_lineage(name, source)
+                other = bundle.get_lineage(name, source)
+                # the bundle has no chain files
+                if not other.drop(columns="chain file").equals(
+                    lineage.drop(columns="chain file")
+                ):
+                    return False
+                if not bundle.get_lineage_data(other, max_samples=50).equals(
+                    catalogs.get_lineage_data(lineage, max_samples=50)
+                ):
+                    return False
+            return (
+                bundle.get_lineages(name)
+                .drop(columns="chain file")
+                .equals(catalogs.get_lineages(name).drop(columns="chain file"))
+            )
+        finally:
+            STORE_POOL.close()
+            shutil.rmtree(directory)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools import STORE_POOL
+from lisacattools.convert import convert_chains_to_columnar
+
+
+class TestColumnarChains:
+    def get_equal(self, *attr):
+        source = "LDC0081497609"
+        directory = tempfile.mkdtemp()
+        try:
+            for name in ["cat15728640_v2.h5", "cat15728640_v2_chains_0.h5"]:
+                shutil.copy(os.path.join("tutorial/data/ucb", name), directory)
+            convert_chains_to_columnar(
+                os.path.join(directory, "cat15728640_v2_chains_0.h5")
+            )
+            expected = (
+                GWCatalogs.create(
+                    GWCatalogType.UCB, "tutorial/data/ucb", "cat15728640_v2.h5"
+                )
+                .get_last_catalog()
+                .get_source_samples(source, list(attr))
+            )
+            result = (
+                GWCatalogs.create(
+                    GWCatalogType.UCB, directory, "cat15728640_v2.h5"
+                )
+                .get_last_catalog()
+                .get_source_samples(source, list(attr))
+            )
+            return expected.equals(result)
+        finally:
+            STORE_POOL.close()
+            shutil.rmtree(directory)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from lisacattools import DtypePolicy
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+
+
+class TestDtypePolicy:
+    def get_ucb_dtypes(self):
+        catalog = GWCatalogs.create(
+            GWCatalogType.UCB,
+            "tutorial/data/ucb",
+            "cat*.h5",
+            dtype_policy=DtypePolicy(),
+        ).get_last_catalog()
+        samples = catalog.get_source_samples(catalog.get_detections()[0])
+        return [
+            samples["Frequency"].dtype == np.float64,
+            samples["Amplitude"].dtype == np.float32,
+        ]
+
+    def get_mbh_lineage(self):
+        """Compact lineage data, compared to the float64 lineage data."""
+        policy = DtypePolicy()
+        catalogs = GWCatalogs.create(
+            GWCatalogType.MBH, "tutorial/data/mbh", dtype_policy=policy
+        )
+        reference = GWCatalogs.create(GWCatalogType.MBH, "tutorial/data/mbh")
+        catalog = catalogs.get_last_catalog()
+        source = catalog.get_detections()[0]
+        lineage = catalogs.get_lineage(catalog.name, source)
+        data = catalogs.get_lineage_data(lineage)
+        expected = reference.get_lineage_data(lineage)
+        return [
+            data["Source"].dtype == "category",
+            data["Barycenter Merge Time"].dtype == np.float64,
+            data["Mass 1"].dtype == np.float32,
+            np.allclose(data["Mass 1"], expected["Mass 1"], rtol=1e-6),
+            policy.stats["saved"] > 0,
+        ]
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+
+
+class TestIterSourceSamples:
+    def __init__(self):
+        catalogs = GWCatalogs.create(
+            GWCatalogType.UCB, "tutorial/data/ucb", "cat15728640_v2.h5"
+        )
+        self.catalog = catalogs.get_last_catalog()
+
+    def get_equal(self, chunk_sources):
+        sources = self.catalog.get_detections()
+        chunks = list(
+            self.catalog.iter_source_samples(
+                attr="Frequency", chunk_sources=int(chunk_sources)
+            )
+        )
+        assert max(len(chunk) for chunk in chunks) <= int(chunk_sources)
+        samples = {
+            name: source_samples
+            for chunk in chunks
+            for name, source_samples in chunk.items()
+        }
+        return list(samples) == sources and all(
+            samples[name].equals(
+                self.catalog.get_source_samples(name, "Frequency")
+            )
+            for name, _ in self.catalog.iter_source_samples(sources)
+        )
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools import LRUCache
+
+
+class TestLRUCache:
+    def get_evictions(self):
+        """Entries kept in a cache holding two and a half frames, followed
+        by the hits, misses and evictions and the memory used."""
+        frame = pd.DataFrame({"x": np.arange(1000, dtype=np.float64)})
+        nbytes = LRUCache.sizeof(frame)
+        cache = LRUCache(max_bytes=2 * nbytes + nbytes // 2)
+        for key in ("a", "b", "c"):
+            cache.put("ns", key, frame.copy())
+        # "b" becomes more recently used than "c", which is evicted next
+        cache.get("ns", "b")
+        cache.put("ns", "d", frame.copy())
+        kept = [cache.get("ns", key) is not None for key in "abcd"]
+        stats = cache.stats
+        return kept + [
+            stats["hits"],
+            stats["misses"],
+            stats["evictions"],
+            stats["bytes"] == 2 * nbytes,
+        ]
+
+    def get_catalog_stats(self):
+        """Misses, hits and entries of the cache of a catalog set after
+        reading the samples of a source twice."""
+        cache = LRUCache()
+        catalogs = GWCatalogs.create(
+            GWCatalogType.UCB,
+            "tutorial/data/ucb",
+            "cat15728640_v2.h5",
+            cache=cache,
+        )
+        catalog = catalogs.get_last_catalog()
+        first = catalog.get_source_samples("LDC0081497609")
+        second = catalog.get_source_samples("LDC0081497609")
+        assert first.equals(second)
+        stats = cache.stats
+        return [stats["misses"], stats["hits"], stats["entries"]]
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools import MetadataManifest
+from lisacattools import STORE_POOL
+
+
+class TestManifest:
+    def _create(self, directory):
+        STORE_POOL.close()
+        opens = STORE_POOL.stats["opens"]
+        catalogs = GWCatalogs.create(
+            GWCatalogType.MBH, directory, "*.h5", manifest=True
+        )
+        catalog = catalogs.get_last_catalog()
+        catalog.datasets
+        catalog.get_attr_detections()
+        return catalogs, STORE_POOL.stats["opens"] - opens
+
+    def get_opens(self):
+        """Opens of the cold start, of the warm start and after touching
+        a file."""
+        directory = tempfile.mkdtemp()
+        try:
+            for name in ("MBH_wk001C.h5", "MBH_wk003C.h5", "MBH_wk004C.h5"):
+                shutil.copy(os.path.join("tutorial/data/mbh", name), directory)
+            cold, cold_opens = self._create(directory)
+            warm, warm_opens = self._create(directory)
+            assert cold.metadata.equals(warm.metadata)
+            path = os.path.join(directory, "MBH_wk003C.h5")
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            _, stale_opens = self._create(directory)
+            manifest = MetadataManifest(directory)
+        finally:
+            STORE_POOL.close()
+            shutil.rmtree(directory)
+        return [cold_opens, warm_opens, stale_opens, len(manifest)]
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+
+
+def frequency_interval(samples):
+    low, high = np.quantile(samples["Frequency"], [0.05, 0.95])
+    return {"low": low, "high": high}
+
+
+def sample_count(samples):
+    return len(samples)
+
+
+class TestMapSources:
+    def __init__(self):
+        catalogs = GWCatalogs.create(
+            GWCatalogType.UCB, "tutorial/data/ucb", "cat*.h5"
+        )
+        self.catalog = catalogs.get_last_catalog()
+        self.sources = self.catalog.get_detections()[:12]
+
+    def get_equal(self):
+        expected = pd.DataFrame.from_dict(
+            {
+                source: frequency_interval(
+                    self.catalog.get_source_samples(source, ["Frequency"])
+                )
+                for source in self.sources
+            },
+            orient="index",
+        )
+        done = list()
+        timings = list()
+        results = self.catalog.map_sources(
+            frequency_interval,
+            self.sources,
+            ["Frequency"],
+            workers=2,
+            chunksize=5,
+            progress=lambda count, total: done.append((count, total)),
+            timing=timings.append,
+        )
+        return [
+            np.allclose(results.values, expected.values),
+            list(results.index) == self.sources,
+            done[-1] == (12, 12) and len(done) == 3,
+            timings[0]["chunks"] == 3 and timings[0]["elapsed"] > 0,
+        ]
+
+    def get_scalar(self):
+        results = self.catalog.map_sources(
+            sample_count, self.sources[:3], workers=1
+        )
+        expected = [
+            len(self.catalog.get_source_samples(source))
+            for source in self.sources[:3]
+        ]
+        return [
+            list(results.columns),
+            results.index.name,
+            list(results["sample_count"]) == expected,
+        ]
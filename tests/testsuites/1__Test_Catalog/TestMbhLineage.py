@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools.lineage import LineageGraph
+from lisacattools.plugins.mbh import MbhCatalog
+
+
+class TestMbhLineage:
+    def __init__(self):
+        self.catalogs = GWCatalogs.create(
+            GWCatalogType.MBH, "tutorial/data/mbh"
+        )
+
+    def get_lineage(self):
+        """Lineage of a source of the last catalog, then the number of
+        detections datasets read by a second lineage."""
+        last = self.catalogs.get_last_catalog()
+        lineage = self.catalogs.get_lineage(last.name, "MBH005546845")
+        source = last.get_detections()[1]
+        reads = list()
+        detections = MbhCatalog._get_detections_dataset
+
+        def _read(catalog):
+            reads.append(catalog.name)
+            return detections(catalog)
+
+        MbhCatalog._get_detections_dataset = _read
+        try:
+            self.catalogs.get_lineage(last.name, source)
+        finally:
+            MbhCatalog._get_detections_dataset = detections
+        return [
+            list(lineage["Observation Week"]),
+            lineage.index[-1],
+            list(lineage.columns[:2]),
+            len(reads),
+        ]
+
+    def get_extended(self):
+        """Parents of a graph extended week after week, and in the reverse
+        order, compared with the graph of the whole set."""
+        links = [
+            self.catalogs._lineage_links(idx)[0]
+            for idx in range(self.catalogs.count)
+        ]
+        graph = LineageGraph(links)
+        weekly = LineageGraph(links[:5])
+        for link in links[5:]:
+            weekly.extend([link])
+        reverse = LineageGraph()
+        for link in reversed(links):
+            reverse.extend([link])
+        walks = [(link.name, src) for link in links for src in link.sources]
+        return [
+            np.array_equal(graph.parents, weekly.parents),
+            all(graph.walk(*walk) == reverse.walk(*walk) for walk in walks),
+        ]
+
+    def get_lineages(self):
+        """Detections datasets read by the lineages of all the sources of the
+        last catalog, compared with the lineage of each source and with the
+        default looping over get_lineage."""
+        catalogs = GWCatalogs.create(GWCatalogType.MBH, "tutorial/data/mbh")
+        reads = list()
+        detections = MbhCatalog._get_detections_dataset
+
+        def _read(catalog):
+            reads.append(catalog.name)
+            return detections(catalog)
+
+        MbhCatalog._get_detections_dataset = _read
+        try:
+            lineages = catalogs.get_lineages("MBHcatalog_week015")
+        finally:
+            MbhCatalog._get_detections_dataset = detections
+        sources = catalogs.get_last_catalog().get_detections()
+        same = all(
+            lineages.loc[source]
+            .drop(columns="Epoch Source")
+            .equals(
+                catalogs.get_lineage("MBHcatalog_week015", source).set_index(
+                    "Observation Week"
+                )
+            )
+            for source in sources
+        )
+        return [
+            list(lineages.index.names),
+            len(reads) == len(set(reads)) == catalogs.count,
+            same,
+            GWCatalogs.get_lineages(catalogs, "MBHcatalog_week015").equals(
+                lineages
+            ),
+        ]
+
+    def get_lineage_data(self):
+        """Attributes read for each epoch, and the samples read by one and by
+        four threads."""
+        lineage = self.catalogs.get_lineage(
+            "MBHcatalog_week015", "MBH005546845"
+        )
+        attributes = list()
+        samples = MbhCatalog.get_source_samples
+
+        def _read(catalog, source_name, attr=None, **kwargs):
+            attributes.append(tuple(attr))
+            return samples(catalog, source_name, attr, **kwargs)
+
+        MbhCatalog.get_source_samples = _read
+        try:
+            data = self.catalogs.get_lineage_data(
+                lineage, max_samples=20, columns=["Mass 1", "Mass 2"]
+            )
+        finally:
+            MbhCatalog.get_source_samples = samples
+        threads = GWCatalogs.create(
+            GWCatalogType.MBH, "tutorial/data/mbh", workers=4
+        )
+        return [
+            sorted(set(attributes)),
+            list(data.columns),
+            len(data) == 20 * len(lineage),
+            threads.get_lineage_data(lineage).equals(
+                self.catalogs.get_lineage_data(lineage)
+            ),
+        ]
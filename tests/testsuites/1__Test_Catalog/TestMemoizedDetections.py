@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+
+from lisacattools import STORE_POOL
+from lisacattools.plugins.mbh import MbhCatalog
+
+
+class TestMemoizedDetections:
+    def _reads(self, catalog):
+        reads = STORE_POOL.stats["reads"]
+        catalog.get_detections(["Mass 1", "Mass 2"])
+        catalog.get_attr_detections()
+        return STORE_POOL.stats["reads"] - reads
+
+    def get_reads(self):
+        """Reads of the detections on the first call, on the next call and
+        after the modification time of the file changes."""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "MBH_wk001C.h5")
+            shutil.copy("tutorial/data/mbh/MBH_wk001C.h5", path)
+            catalog = MbhCatalog("MBHcatalog_week001", path)
+            first = self._reads(catalog)
+            memoized = self._reads(catalog)
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            touched = self._reads(catalog)
+            STORE_POOL.close(path)
+            return [first, memoized, touched]
+        finally:
+            shutil.rmtree(directory)
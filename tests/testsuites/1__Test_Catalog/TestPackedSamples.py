@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import glob
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools.convert import convert_chains_to_packed
+
+
+class TestPackedSamples:
+    def _copy(self, pattern):
+        directory = tempfile.mkdtemp()
+        for path in glob.glob(pattern):
+            shutil.copy(path, directory)
+        return directory
+
+    def _equal(self, catalog_type, directory, pattern, packed_files):
+        for path in glob.glob(os.path.join(directory, packed_files)):
+            convert_chains_to_packed(path)
+        catalogs = GWCatalogs.create(catalog_type, directory, pattern)
+        packed = GWCatalogs.create(
+            catalog_type, directory, pattern, memmap=True, read_only=True
+        )
+        for name in catalogs.get_catalogs_name():
+            catalog = catalogs.get_catalog_by(name)
+            other = packed.get_catalog_by(name)
+            for source in catalog.get_detections():
+                if not other.get_source_samples(source).equals(
+                    catalog.get_source_samples(source)
+                ):
+                    return False
+        return True
+
+    def get_equal_ucb(self):
+        directory = self._copy("tutorial/data/ucb/*.h5")
+        try:
+            return self._equal(
+                GWCatalogType.UCB, directory, "cat*.h5", "*chains*.h5"
+            )
+        finally:
+            shutil.rmtree(directory)
+
+    def get_equal_mbh(self):
+        directory = self._copy("tutorial/data/mbh/MBH_wk01*C.h5")
+        try:
+            return self._equal(
+                GWCatalogType.MBH, directory, "MBH_wk*C.h5", "*.h5"
+            )
+        finally:
+            shutil.rmtree(directory)
+
+    def get_shared(self):
+        """Samples mapped in memory, then read from the HDF5 file after it
+        changed."""
+        directory = self._copy("tutorial/data/ucb/cat15728640_v2*.h5")
+        try:
+            chain_file = os.path.join(directory, "cat15728640_v2_chains_0.h5")
+            convert_chains_to_packed(chain_file)
+            catalog = GWCatalogs.create(
+                GWCatalogType.UCB,
+                directory,
+                "cat*.h5",
+                memmap=True,
+                read_only=True,
+            ).get_last_catalog()
+            source = catalog.get_detections()[0]
+            result = [
+                np.shares_memory(
+                    catalog.get_source_samples(source, "Frequency").values,
+                    catalog.get_source_samples(source)["Frequency"].values,
+                )
+            ]
+            stat = os.stat(chain_file)
+            os.utime(
+                chain_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9)
+            )
+            result.append(
+                isinstance(
+                    catalog.get_source_samples(source, "Frequency").values,
+                    np.memmap,
+                )
+            )
+            return result
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+
+
+class TestParallelMetadata:
+    def get_equal(self, workers):
+        sequential = GWCatalogs.create(
+            GWCatalogType.MBH, "tutorial/data/mbh", "*.h5"
+        )
+        parallel = GWCatalogs.create(
+            GWCatalogType.MBH,
+            "tutorial/data/mbh",
+            "*.h5",
+            workers=int(workers),
+        )
+        return sequential.metadata.equals(parallel.metadata)
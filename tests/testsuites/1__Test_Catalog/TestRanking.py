@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+
+
+class TestRanking:
+    def __init__(self):
+        catalogs = GWCatalogs.create(GWCatalogType.MBH, "tutorial/data/mbh")
+        self.catalog = catalogs.get_last_catalog()
+        self.detections = self.catalog.get_detections(
+            self.catalog.get_attr_detections()
+        )
+
+    def get_median(self):
+        """Median sources of the ranked index and of a full scan."""
+        return all(
+            self.catalog.get_median_source(attr).index[0]
+            == self.detections.index[
+                np.argmin(
+                    np.abs(
+                        np.array(self.detections[attr])
+                        - self.detections[attr].median()
+                    )
+                )
+            ]
+            for attr in self.detections.select_dtypes("number").columns
+        )
+
+    def get_lookups(self):
+        values = self.detections["Mass 1"]
+        low, high = values.quantile([0.2, 0.6])
+        ranged = self.catalog.get_range_sources("Mass 1", low, high)
+        quantile = self.catalog.get_quantile_source("Mass 1", 0.9)
+        return [
+            list(self.catalog.get_top_k("Mass 1", 5).index)
+            == list(values.nlargest(5).index),
+            list(self.catalog.get_top_k("Mass 1", 5, largest=False).index)
+            == list(values.nsmallest(5).index),
+            sorted(ranged.index)
+            == sorted(values[(values >= low) & (values <= high)].index),
+            ranged["Mass 1"].is_monotonic_increasing,
+            quantile.index[0]
+            == (values - values.quantile(0.9)).abs().idxmin(),
+        ]
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools.utils import read_only_view
+
+
+class TestReadOnly:
+    def __init__(self):
+        catalogs = GWCatalogs.create(
+            GWCatalogType.UCB,
+            "tutorial/data/ucb",
+            "cat15728640_v2.h5",
+            read_only=True,
+        )
+        catalog = catalogs.get_last_catalog()
+        self.c1 = catalog.get_source_samples("LDC0081497609")
+        self.c2 = catalog.get_source_samples("LDC0081497609")
+
+    def get_shared(self):
+        return np.shares_memory(
+            self.c1["Frequency"].to_numpy(), self.c2["Frequency"].to_numpy()
+        )
+
+    def get_write_fails(self):
+        try:
+            self.c1.iloc[0, 0] = 0.0
+        except ValueError:
+            return True
+        return bool(self.c2.iloc[0, 0] != 0.0)
+
+    def get_mixed_write_fails(self):
+        """Writes in the view of a frame with several dtypes, whose float
+        columns share one block."""
+        data = pd.DataFrame(
+            {"x": np.zeros(3), "y": np.zeros(3), "name": ["a", "b", "c"]}
+        )
+        view = read_only_view(data)
+        try:
+            view.iloc[0, 1] = 1.0
+        except ValueError:
+            pass
+        unchanged = bool(data.iloc[0, 1] == 0.0)
+        # the original frame stays writable
+        data.iloc[0, 1] = 2.0
+        return unchanged
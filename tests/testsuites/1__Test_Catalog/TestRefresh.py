@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools import LRUCache
+from lisacattools import STORE_POOL
+
+MBH_DIR = "tutorial/data/mbh"
+
+
+class TestRefresh:
+    def __init__(self):
+        self.files = sorted(os.listdir(MBH_DIR))
+
+    def _copy(self, directory, files):
+        for name in files:
+            shutil.copy(os.path.join(MBH_DIR, name), directory)
+
+    def get_refresh(self):
+        """New weeks, the cached samples and the lineage after a refresh,
+        then the catalogs refreshed after a change and a removal."""
+        directory = tempfile.mkdtemp()
+        try:
+            self._copy(directory, self.files[:-2])
+            cache = LRUCache()
+            catalogs = GWCatalogs.create(
+                GWCatalogType.MBH, directory, cache=cache
+            )
+            first = catalogs.get_first_catalog()
+            first.get_source_samples(first.get_detections()[0])
+            catalogs.get_lineage(
+                "MBHcatalog_week013",
+                catalogs.get_last_catalog().get_detections()[0],
+            )
+            unchanged = catalogs.refresh()
+            self._copy(directory, self.files[-2:])
+            new = catalogs.refresh()
+            kept = catalogs.get_first_catalog() is first and len(cache) == 1
+            lineage = catalogs.get_lineage(
+                "MBHcatalog_week015", "MBH005546845"
+            )
+            path = os.path.join(directory, self.files[0])
+            later = time.time() + 10
+            os.utime(path, (later, later))
+            changed = catalogs.refresh()
+            os.remove(os.path.join(directory, self.files[-1]))
+            removed = catalogs.refresh()
+            return [
+                unchanged,
+                new,
+                kept,
+                len(lineage),
+                changed,
+                len(cache),
+                removed,
+                catalogs.get_last_catalog().name,
+            ]
+        finally:
+            STORE_POOL.close()
+            shutil.rmtree(directory)
+
+    def get_watched(self):
+        """Catalogs given to the callback of a watcher."""
+        directory = tempfile.mkdtemp()
+        try:
+            self._copy(directory, self.files[:1])
+            catalogs = GWCatalogs.create(GWCatalogType.MBH, directory)
+            names = list()
+            done = threading.Event()
+
+            def _on_catalog(catalog):
+                names.append(catalog.name)
+                done.set()
+
+            with catalogs.watch(_on_catalog, interval=0.05) as watcher:
+                # moved in place so that it is not read while written
+                path = os.path.join(directory, self.files[1])
+                shutil.copy(
+                    os.path.join(MBH_DIR, self.files[1]), path + ".tmp"
+                )
+                os.replace(path + ".tmp", path)
+                done.wait(10)
+            return [names, watcher.running, catalogs.count]
+        finally:
+            STORE_POOL.close()
+            shutil.rmtree(directory)
+
+    def get_failing_callback(self):
+        """Catalogs given to a callback raising on the first one, and the
+        catalogs returned by the poll."""
+        directory = tempfile.mkdtemp()
+        try:
+            self._copy(directory, self.files[:1])
+            catalogs = GWCatalogs.create(GWCatalogType.MBH, directory)
+            names = list()
+
+            def _on_catalog(catalog):
+                names.append(catalog.name)
+                if len(names) == 1:
+                    raise RuntimeError(f"cannot handle {catalog.name}")
+
+            self._copy(directory, self.files[1:3])
+            polled = catalogs.watch(_on_catalog).poll()
+            return [names, polled]
+        finally:
+            STORE_POOL.close()
+            shutil.rmtree(directory)
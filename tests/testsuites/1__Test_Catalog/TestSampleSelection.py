@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import glob
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import tables
+
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools.convert import convert_chains_to_packed
+from lisacattools.storage import read_dataset
+from lisacattools.storage import SampleSelection
+
+
+class TestSampleSelection:
+    def _catalog(self, **kwargs):
+        return GWCatalogs.create(
+            GWCatalogType.UCB, "tutorial/data/ucb", "cat*.h5", **kwargs
+        ).get_last_catalog()
+
+    def _equal(self, catalog):
+        source = catalog.get_detections()[0]
+        samples = catalog.get_source_samples(source)
+        return [
+            catalog.get_source_samples(
+                source, ["Frequency"], start=10, stop=100, stride=7
+            ).equals(samples[["Frequency"]].iloc[10:100:7]),
+            catalog.get_source_samples(source, start=-5).equals(
+                samples.iloc[-5:]
+            ),
+            len(catalog.get_source_samples(source, max_samples=30)) <= 30,
+        ]
+
+    def get_window(self):
+        return self._equal(self._catalog())
+
+    def get_packed_window(self):
+        directory = tempfile.mkdtemp()
+        try:
+            shutil.copytree("tutorial/data/ucb", directory, dirs_exist_ok=True)
+            for path in glob.glob(os.path.join(directory, "*chains*.h5")):
+                convert_chains_to_packed(path)
+            catalog = GWCatalogs.create(
+                GWCatalogType.UCB,
+                directory,
+                "cat*.h5",
+                memmap=True,
+                read_only=True,
+            ).get_last_catalog()
+            return self._equal(catalog)
+        finally:
+            shutil.rmtree(directory)
+
+    def get_random(self):
+        catalog = self._catalog()
+        source = catalog.get_detections()[0]
+        first = catalog.get_source_samples(
+            source, max_samples=50, random_state=1
+        )
+        return [
+            len(first),
+            first.equals(
+                catalog.get_source_samples(
+                    source, max_samples=50, random_state=1
+                )
+            ),
+            first.index.equals(
+                catalog.get_source_samples(
+                    source, max_samples=50, random_state=2
+                ).index
+            ),
+            bool(np.all(np.diff(first.index) > 0)),
+        ]
+
+    def get_lineage_sizes(self):
+        catalogs = GWCatalogs.create(GWCatalogType.MBH, "tutorial/data/mbh")
+        catalog = catalogs.get_last_catalog()
+        lineage = catalogs.get_lineage(
+            catalog.name, catalog.get_detections()[0]
+        )
+        data = catalogs.get_lineage_data(lineage, max_samples=20)
+        return (
+            bool((data.groupby("Observation Week").size() <= 20).all())
+            and len(data) > 0
+        )
+
+    def get_rows_read(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "samples.h5")
+        samples = pd.DataFrame(
+            np.random.default_rng(0).random((1000, 3)), columns=list("abc")
+        )
+        samples.to_hdf(path, key="fixed")
+        samples.to_hdf(path, key="table", format="table")
+        rows = list()
+        getitem = tables.Array.__getitem__
+        read = tables.Table.read
+        read_coordinates = tables.Table.read_coordinates
+
+        def count(func):
+            def wrapper(node, *args, **kwargs):
+                result = func(node, *args, **kwargs)
+                if node.name in ("block0_values", "table"):
+                    rows.append(len(result))
+                return result
+
+            return wrapper
+
+        tables.Array.__getitem__ = count(getitem)
+        tables.Table.read = count(read)
+        tables.Table.read_coordinates = count(read_coordinates)
+        try:
+            sizes = list()
+            with pd.HDFStore(path, "r") as store:
+                for key in ("fixed", "table"):
+                    for selection in (
+                        SampleSelection(stride=10),
+                        SampleSelection(max_samples=50),
+                    ):
+                        rows.clear()
+                        data = read_dataset(store, key, None, selection)
+                        expected = samples.iloc[:: selection.stride or 20]
+                        sizes.extend([sum(rows), data.equals(expected)])
+            return sizes
+        finally:
+            tables.Array.__getitem__ = getitem
+            tables.Table.read = read
+            tables.Table.read_coordinates = read_coordinates
+            shutil.rmtree(directory)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import warnings
+
+from lisacattools import LRUCache
+from lisacattools import STORE_POOL
+from lisacattools.plugins.ucb import UcbCatalog
+
+UCB_DIR = "tutorial/data/ucb"
+CATALOG = "cat15728640_v2"
+
+
+class TestSourceSamplesMany:
+    def _write_catalog(self, directory, nb_sources):
+        """Copies the first sources of a UCB catalog, their posterior
+        samples alternating between two chain files."""
+        source = UcbCatalog(CATALOG, os.path.join(UCB_DIR, f"{CATALOG}.h5"))
+        detections = source.get_detections(source.get_attr_detections())
+        detections = detections.iloc[:nb_sources].copy()
+        chain_files = [f"{CATALOG}_chains_{idx}.h5" for idx in range(2)]
+        detections["chain file"] = [
+            chain_files[idx % 2] for idx in range(nb_sources)
+        ]
+        location = os.path.join(directory, f"{CATALOG}.h5")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            source.get_dataset("metadata").to_hdf(location, key="metadata")
+            detections.to_hdf(location, key="detections")
+            for name, chain_file in detections["chain file"].items():
+                source.get_source_samples(name).to_hdf(
+                    os.path.join(directory, chain_file), key=f"{name}_chain"
+                )
+        return location, list(detections.index)
+
+    def _opens(self, location, read):
+        """Opens of the chain files by a read, with one store open at most
+        and an empty cache."""
+        catalog = UcbCatalog(CATALOG, location, LRUCache())
+        catalog.get_detections()
+        STORE_POOL.close()
+        opens = STORE_POOL.stats["opens"]
+        samples = read(catalog)
+        return STORE_POOL.stats["opens"] - opens, samples
+
+    def get_opens(self):
+        """Opens of get_source_samples_many, opens of the per-source reads
+        and the equality of their samples."""
+        directory = tempfile.mkdtemp()
+        max_size = STORE_POOL.max_size
+        try:
+            location, sources = self._write_catalog(directory, 6)
+            STORE_POOL.max_size = 1
+            many_opens, many = self._opens(
+                location,
+                lambda catalog: catalog.get_source_samples_many(sources),
+            )
+            single_opens, single = self._opens(
+                location,
+                lambda catalog: {
+                    name: catalog.get_source_samples(name)
+                    for name in sources
+                },
+            )
+            frame = UcbCatalog(
+                CATALOG, location, LRUCache()
+            ).get_source_samples_many(sources, as_frame=True)
+            equal = list(many) == sources and all(
+                many[name].equals(single[name])
+                and frame.loc[name].equals(single[name])
+                for name in sources
+            )
+            return [many_opens, single_opens, equal]
+        finally:
+            STORE_POOL.max_size = max_size
+            STORE_POOL.close()
+            shutil.rmtree(directory)
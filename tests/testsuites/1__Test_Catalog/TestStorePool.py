@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import glob
+
+from lisacattools import HDFStorePool
+from lisacattools import STORE_POOL
+from lisacattools.plugins.mbh import MbhCatalog
+
+
+class TestStorePool:
+    def __init__(self):
+        self.files = sorted(glob.glob("tutorial/data/mbh/MBH_wk*C.h5"))[:3]
+
+    def get_open_stores(self, max_size):
+        with HDFStorePool(max_size=int(max_size)) as pool:
+            for cat_file in self.files:
+                pool.read(cat_file, "metadata")
+            return len(pool)
+
+    def get_open_stores_after_exit(self):
+        with HDFStorePool() as pool:
+            for cat_file in self.files:
+                pool.read(cat_file, "metadata")
+        return len(pool)
+
+    def get_lazy_datasets(self):
+        """Opens when creating a catalog, listing its datasets, and listing
+        them again after closing the store."""
+        STORE_POOL.close()
+        opens = STORE_POOL.stats["opens"]
+        catalog = MbhCatalog("MBHcatalog_week001", self.files[0])
+        result = [STORE_POOL.stats["opens"] - opens]
+        datasets = catalog.datasets
+        result.append(STORE_POOL.stats["opens"] - opens)
+        STORE_POOL.close()
+        other = MbhCatalog("MBHcatalog_week001", self.files[0])
+        assert other.datasets == datasets
+        result.append(STORE_POOL.stats["opens"] - opens)
+        return result
+
+    def get_stores_after_catalog_exit(self):
+        """Exits the context of a catalog while another catalog keeps its
+        store open."""
+        first = MbhCatalog("MBHcatalog_week001", self.files[0])
+        other = MbhCatalog("MBHcatalog_week002", self.files[1])
+        other.get_detections()
+        with first:
+            first.get_detections()
+        return [self.files[0] in STORE_POOL, self.files[1] in STORE_POOL]
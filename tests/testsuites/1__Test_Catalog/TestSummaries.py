@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import lisacattools.catalog as catalog_module
+from lisacattools import DtypePolicy
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+from lisacattools import STORE_POOL
+
+
+class TestSummaries:
+    def __init__(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ("cat15728640_v2.h5", "cat15728640_v2_chains_0.h5"):
+            shutil.copy(
+                os.path.join("tutorial/data/ucb", name), self.directory
+            )
+        self.summarized = list()
+
+    def _catalog(self):
+        return GWCatalogs.create(
+            GWCatalogType.UCB, self.directory, "cat*.h5"
+        ).get_last_catalog()
+
+    def _touch(self, name):
+        path = os.path.join(self.directory, name)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def _summarize(self, catalog, sources, *args, **kwargs):
+        self.summarized.append(len(sources))
+        return self.summarize(catalog, sources, *args, **kwargs)
+
+    def get_described(self):
+        """The summaries describe the samples, also from the summary file
+        and without reading the samples."""
+        catalog = self._catalog()
+        first, second = catalog.get_detections()[:2]
+        expected = catalog.get_source_samples(second).describe()
+        catalog.get_summaries()
+        catalog = self._catalog()
+        catalog.describe_source_samples(first)
+        reads = STORE_POOL.stats["reads"]
+        described = catalog.describe_source_samples(second)
+        return [
+            bool((described - expected).abs().max().max() < 1e-9),
+            STORE_POOL.stats["reads"] - reads,
+        ]
+
+    def get_compact_summarized(self):
+        """The summaries of a catalog with a dtype policy are computed on
+        the original dtypes of the samples."""
+        catalog = GWCatalogs.create(
+            GWCatalogType.UCB,
+            self.directory,
+            "cat*.h5",
+            dtype_policy=DtypePolicy(),
+        ).get_last_catalog()
+        first, second = catalog.get_detections()[:2]
+        expected = self._catalog().get_source_samples(first).describe()
+        summaries = catalog.get_summaries().loc[first]
+        described = catalog.describe_source_samples(second)
+        return [
+            bool(
+                np.allclose(
+                    summaries.loc[expected.index, expected.columns],
+                    expected,
+                    rtol=1e-12,
+                    atol=0,
+                )
+            ),
+            str(described.dtypes.iloc[0]),
+        ]
+
+    def get_summarized(self):
+        """Sources summarized for new quantiles, when nothing has changed,
+        after touching the catalog and after touching the chain file."""
+        self.summarize, catalog_module.summarize_sources = (
+            catalog_module.summarize_sources,
+            self._summarize,
+        )
+        try:
+            catalog = self._catalog()
+            catalog.get_summaries(quantiles=(0.1, 0.9))
+            catalog.get_summaries()
+            self._touch("cat15728640_v2.h5")
+            catalog.get_summaries()
+            self._touch("cat15728640_v2_chains_0.h5")
+            summaries = catalog.get_summaries()
+            source = catalog.get_detections()[0]
+        finally:
+            catalog_module.summarize_sources = self.summarize
+            STORE_POOL.close()
+            shutil.rmtree(self.directory)
+        return [
+            self.summarized,
+            list(summaries.loc[source].index),
+        ]
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from lisacattools import GWCatalogs
+from lisacattools import GWCatalogType
+
+
+class TestUcbLineage:
+    def __init__(self):
+        self.catalogs = GWCatalogs.create(
+            GWCatalogType.UCB, "tutorial/data/ucb", "cat*.h5"
+        )
+
+    def get_lineage(self):
+        """Weeks and first columns of the lineage of a source whose parent
+        is in the previous catalog."""
+        lineage = self.catalogs.get_lineage("cat15728640_v2", "LDC0081497609")
+        return [
+            list(lineage.index),
+            [int(week) for week in lineage["Observation Week"]],
+            list(lineage.columns[:2]),
+        ]
+
+    def get_lineage_data(self):
+        lineage = self.catalogs.get_lineage("cat15728640_v2", "LDC0081497609")
+        data = self.catalogs.get_lineage_data(lineage, max_samples=10)
+        return sorted(
+            data.groupby("Source")["Observation Week"]
+            .count()
+            .to_dict()
+            .items()
+        )